@@ -0,0 +1,387 @@
+"""
+@file benchmark_suite.py
+@brief Headless benchmark suite, needs no window nor GPU. Times the chunk
+       generation, the meshing with a cold and a warm JIT, the block raycast and
+       the frustum culling on the fixed world size and seeded cameras, writes
+       the results to a JSON file and compares them against a baseline.
+       Run from the src folder with: python -m benchmarks.benchmark_suite
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-14
+"""
+
+# Libraries
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import glm
+import numba
+import numpy as np
+
+# Project files
+from benchmarks.mesh_memory_benchmark import get_peak_rss
+from benchmarks.terrain_benchmark import get_chunk_positions
+from camera.camera import Camera
+from core.constants.settings import (
+    CHUNK_SIZE,
+    CHUNK_VOLUME,
+    WORLD_DEPTH,
+    WORLD_HEIGHT,
+    WORLD_VOLUME,
+    WORLD_WIDTH,
+)
+from render.world_objects.chunk import Chunk
+from utils.block_handler.block_handler import BlockHandler
+from utils.chunk_builder.chunk_mesh_builder import (
+    build_chunk_mesh,
+    get_mesh_buffer,
+    get_padded_blocks,
+)
+
+# Whether a higher value of each metric is better, the metrics left out are
+# informative and never flagged as regressions
+METRICS = {
+    "ms_per_chunk": False,
+    "chunks_per_second": True,
+    "cold_ms": False,
+    "warm_ms_per_chunk": False,
+    "vertices_per_second": True,
+    "us_per_ray": False,
+    "rays_per_second": True,
+    "batch_us_per_ray": False,
+    "us_per_chunk": False,
+    "batch_us_per_chunk": False,
+    "peak_rss_mb": False,
+}
+
+
+def get_world(seed) -> SimpleNamespace:
+    """
+    Gets a headless world, the chunks and the world blocks without meshes, seen
+    by a camera at the start position.
+    :param seed: The seed of the cameras.
+    :return: The world.
+    """
+    camera = Camera(glm.vec3(0.0, CHUNK_SIZE, 0.0), -90, 0)
+    app = SimpleNamespace(player=camera, rng=np.random.default_rng(seed))
+    world = SimpleNamespace(
+        app=app,
+        blocks=np.zeros([WORLD_VOLUME, CHUNK_VOLUME], dtype=np.uint8),
+        chunk_positions=get_chunk_positions(),
+        solid_counts=np.zeros(WORLD_VOLUME, dtype=np.int64),
+        is_compact=np.zeros(WORLD_VOLUME, dtype=np.bool_),
+        block_version=0,
+        storage=None,
+        cache=None,
+    )
+    world.chunks = [
+        Chunk(world, tuple(position.tolist())) for position in world.chunk_positions
+    ]
+
+    return world
+
+
+def set_random_camera(camera, rng) -> None:
+    """
+    Moves the camera to a random position over the world, looking at a random
+    direction towards the ground.
+    :param camera: The camera.
+    :param rng: The random generator.
+    """
+    camera.position = glm.vec3(
+        rng.uniform(0, WORLD_WIDTH * CHUNK_SIZE),
+        rng.uniform(CHUNK_SIZE / 2, WORLD_HEIGHT * CHUNK_SIZE),
+        rng.uniform(0, WORLD_DEPTH * CHUNK_SIZE),
+    )
+    camera.yaw = rng.uniform(-np.pi, np.pi)
+    camera.pitch = rng.uniform(-np.pi / 3, 0)
+    camera.update()
+
+
+def benchmark_generation(world) -> dict:
+    """
+    Times Chunk.build_blocks for every chunk, once the generator is compiled,
+    then counts the solid blocks of each chunk as the world does.
+    :param world: The headless world.
+    :return: The metrics.
+    """
+    world.chunks[0].build_blocks()
+
+    start = time.perf_counter()
+
+    for chunk in world.chunks:
+        chunk.build_blocks()
+
+    elapsed = time.perf_counter() - start
+    world.solid_counts[:] = np.count_nonzero(world.blocks, axis=1)
+
+    return {
+        "chunks": WORLD_VOLUME,
+        "ms_per_chunk": elapsed * 1000 / WORLD_VOLUME,
+        "chunks_per_second": WORLD_VOLUME / elapsed,
+        "world_blocks_mb": world.blocks.nbytes / 2**20,
+    }
+
+
+def time_cold_mesh() -> float:
+    """
+    Times the first mesh of a fresh process, the JIT compilation included.
+    :return: The time, in milliseconds.
+    """
+    chunk_positions = get_chunk_positions()
+    world_blocks = np.ones([WORLD_VOLUME, CHUNK_VOLUME], dtype=np.uint8)
+
+    start = time.perf_counter()
+    padded_blocks = get_padded_blocks(
+        tuple(chunk_positions[0]), world_blocks, chunk_positions
+    )
+    build_chunk_mesh(padded_blocks, 1, get_mesh_buffer(1), False)
+
+    return (time.perf_counter() - start) * 1000
+
+
+def benchmark_meshing(world) -> dict:
+    """
+    Times build_chunk_mesh on every chunk with a warm JIT, and on a single chunk
+    with a cold one in a fresh process.
+    :param world: The headless world, with its blocks built.
+    :return: The metrics.
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.benchmark_suite", "--cold"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    cold_ms = float(result.stdout.split()[-1])
+
+    vertex_data = get_mesh_buffer(1)
+    padded_blocks = get_padded_blocks(
+        tuple(world.chunk_positions[0]), world.blocks, world.chunk_positions
+    )
+    build_chunk_mesh(padded_blocks, 1, vertex_data, False)
+
+    vertices = 0
+    mesh_bytes = 0
+    start = time.perf_counter()
+
+    for chunk_index in range(WORLD_VOLUME):
+        padded_blocks = get_padded_blocks(
+            tuple(world.chunk_positions[chunk_index]),
+            world.blocks,
+            world.chunk_positions,
+        )
+        mesh = build_chunk_mesh(padded_blocks, 1, vertex_data, False)
+        vertices += len(mesh)
+        mesh_bytes += mesh.nbytes
+
+    elapsed = time.perf_counter() - start
+
+    return {
+        "cold_ms": cold_ms,
+        "warm_ms_per_chunk": elapsed * 1000 / WORLD_VOLUME,
+        "chunks_per_second": WORLD_VOLUME / elapsed,
+        "vertices_per_chunk": vertices / WORLD_VOLUME,
+        "vertices_per_second": vertices / elapsed,
+        "mesh_mb": mesh_bytes / 2**20,
+    }
+
+
+def benchmark_raycast(world, rays) -> dict:
+    """
+    Times BlockHandler.raycast from seeded random cameras, and
+    BlockHandler.cast_rays on the rays of all the cameras at once.
+    :param world: The headless world, with its blocks built.
+    :param rays: The number of rays.
+    :return: The metrics.
+    """
+    block_handler = BlockHandler(world)
+    camera = world.app.player
+    origins = np.empty([rays, 3], dtype=np.float64)
+    directions = np.empty([rays, 3], dtype=np.float64)
+    hits = 0
+    elapsed = 0.0
+
+    # Compile the raycasts so the compiler is not part of the measure
+    block_handler.raycast()
+    block_handler.cast_rays(origins[:1], directions[:1])
+
+    for ray in range(rays):
+        set_random_camera(camera, world.app.rng)
+        origins[ray] = camera.position
+        directions[ray] = camera.forward
+
+        start = time.perf_counter()
+        hits += block_handler.raycast()
+        elapsed += time.perf_counter() - start
+
+    start = time.perf_counter()
+    block_handler.cast_rays(origins, directions)
+    batch_elapsed = time.perf_counter() - start
+
+    return {
+        "rays": rays,
+        "hit_rate": hits / rays,
+        "us_per_ray": elapsed * 1e6 / rays,
+        "rays_per_second": rays / elapsed,
+        "batch_us_per_ray": batch_elapsed * 1e6 / rays,
+    }
+
+
+def benchmark_culling(world, views) -> dict:
+    """
+    Times Frustum.is_on_frustum on every chunk, and the batch
+    Frustum.get_on_frustum the world uses, from seeded random cameras.
+    :param world: The headless world.
+    :param views: The number of camera views.
+    :return: The metrics.
+    """
+    camera = world.app.player
+    centers = np.array([chunk.center for chunk in world.chunks], dtype=np.float32)
+    on_frustum = 0
+    elapsed = 0.0
+    batch_elapsed = 0.0
+
+    for _ in range(views):
+        set_random_camera(camera, world.app.rng)
+
+        start = time.perf_counter()
+
+        for chunk in world.chunks:
+            on_frustum += camera.frustum.is_on_frustum(chunk)
+
+        elapsed += time.perf_counter() - start
+
+        start = time.perf_counter()
+        camera.frustum.get_on_frustum(centers)
+        batch_elapsed += time.perf_counter() - start
+
+    checks = views * WORLD_VOLUME
+
+    return {
+        "views": views,
+        "on_frustum_rate": on_frustum / checks,
+        "us_per_chunk": elapsed * 1e6 / checks,
+        "batch_us_per_chunk": batch_elapsed * 1e6 / checks,
+        "chunks_per_second": checks / elapsed,
+    }
+
+
+def run_suite(seed, rays, views) -> dict:
+    """
+    Runs every benchmark of the suite.
+    :param seed: The seed of the cameras.
+    :param rays: The number of rays of the raycast benchmark.
+    :param views: The number of camera views of the culling benchmark.
+    :return: The settings and the metrics of each benchmark.
+    """
+    world = get_world(seed)
+
+    benchmarks = {
+        "generation": benchmark_generation(world),
+        "meshing": benchmark_meshing(world),
+        "raycast": benchmark_raycast(world, rays),
+        "culling": benchmark_culling(world, views),
+        "memory": {"peak_rss_mb": get_peak_rss()},
+    }
+
+    return {
+        "settings": {
+            "seed": seed,
+            "chunk_size": CHUNK_SIZE,
+            "world_size": [WORLD_WIDTH, WORLD_HEIGHT, WORLD_DEPTH],
+            "python": platform.python_version(),
+            "numba": numba.__version__,
+            "numpy": np.__version__,
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def compare_results(results, baseline, tolerance) -> list:
+    """
+    Compares the metrics of the results against the baseline.
+    :param results: The results of the suite.
+    :param baseline: The results of the suite to compare against.
+    :param tolerance: The relative change of a metric, for the worse, that is a
+                      regression.
+    :return: The regressions, the benchmark, the metric, the baseline value and
+             the value.
+    """
+    regressions = []
+
+    for name, metrics in results["benchmarks"].items():
+        for metric, value in metrics.items():
+            base = baseline["benchmarks"].get(name, {}).get(metric)
+
+            if base is None or metric not in METRICS or not base:
+                continue
+
+            change = (value - base) / base
+
+            if METRICS[metric]:
+                change = -change
+
+            is_regression = change > tolerance
+
+            print(
+                f"{name:10s} {metric:20s} {base:14.3f} -> {value:14.3f}  "
+                f"{change * 100:+7.1f}% {'REGRESSION' if is_regression else ''}"
+            )
+
+            if is_regression:
+                regressions.append((name, metric, base, value))
+
+    return regressions
+
+
+def main() -> None:
+    """
+    Runs the suite, writes the results and compares them against the baseline,
+    exiting with an error if a metric regressed.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="Baseline results")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rays", type=int, default=500)
+    parser.add_argument("--views", type=int, default=100)
+    parser.add_argument("--cold", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold:
+        print(time_cold_mesh())
+        return
+
+    results = run_suite(args.seed, args.rays, args.views)
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+
+    for name, metrics in results["benchmarks"].items():
+        print(
+            f"{name:10s} "
+            + "  ".join(f"{metric}: {value:.3f}" for metric, value in metrics.items())
+        )
+
+    if args.compare is None:
+        return
+
+    with open(args.compare, "r") as file:
+        baseline = json.load(file)
+
+    regressions = compare_results(results, baseline, args.tolerance)
+
+    if regressions:
+        print(f"{len(regressions)} regressions over {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+@file binary_mesh_benchmark.py
+@brief Compares the per chunk meshing time of the binary mesher against the
+       default one on the generated terrain and on dense and sparse random
+       blocks, and checks both build the same vertices with each vertex format.
+       Run from the src folder with: python -m benchmarks.binary_mesh_benchmark
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-14
+"""
+
+# Libraries
+import argparse
+import time
+
+import numpy as np
+
+# Project files
+from benchmarks.terrain_benchmark import get_chunk_positions
+from core.constants.settings import CHUNK_VOLUME, WORLD_VOLUME
+from utils.chunk_builder.binary_mesh_builder import build_binary_chunk_mesh
+from utils.chunk_builder.chunk_mesh_builder import (
+    build_chunk_mesh,
+    get_mesh_buffer,
+    get_padded_blocks,
+)
+from utils.chunk_builder.chunk_terrain_builder import build_world_blocks
+
+
+def get_random_blocks(density, seed=0) -> np.array:
+    """
+    Gets world blocks with random block ids, each block solid with the given
+    probability.
+    :param density: The probability of a block being solid.
+    :param seed: The seed of the random blocks.
+    :return: The world blocks.
+    """
+    rng = np.random.default_rng(seed)
+    world_blocks = rng.integers(1, 9, (WORLD_VOLUME, CHUNK_VOLUME), dtype=np.uint8)
+    world_blocks[rng.random((WORLD_VOLUME, CHUNK_VOLUME)) >= density] = 0
+
+    return world_blocks
+
+
+def compare_meshers(world_blocks, chunk_positions, per_face) -> tuple:
+    """
+    Meshes every chunk with both meshers from the same padded blocks.
+    :param world_blocks: The world blocks.
+    :param chunk_positions: The chunk positions in chunk index order.
+    :param per_face: Whether to build face records instead of vertices.
+    :return: The meshing time of the default and binary meshers, in seconds, the
+             number of faces built and the number of chunks with other vertices.
+    """
+    format_size = 2 if per_face else 1
+    vertex_data = get_mesh_buffer(format_size)
+    default_time = 0.0
+    binary_time = 0.0
+    faces = 0
+    mismatches = 0
+
+    for chunk_index in range(WORLD_VOLUME):
+        padded_blocks = get_padded_blocks(
+            tuple(chunk_positions[chunk_index]), world_blocks, chunk_positions
+        )
+
+        start = time.perf_counter()
+        reference = build_chunk_mesh(padded_blocks, format_size, vertex_data, per_face)
+        default_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        mesh = build_binary_chunk_mesh(
+            padded_blocks, format_size, vertex_data, per_face
+        )
+        binary_time += time.perf_counter() - start
+
+        faces += len(reference) // (2 if per_face else 6)
+        mismatches += not np.array_equal(mesh, reference)
+
+    return default_time, binary_time, faces, mismatches
+
+
+def main() -> None:
+    """
+    Meshes every chunk of each world with both meshers and vertex formats and
+    reports the mean time per chunk and the chunks the meshers disagree on.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dense", type=float, default=0.99, help="Dense fill")
+    parser.add_argument("--sparse", type=float, default=0.01, help="Sparse fill")
+    args = parser.parse_args()
+
+    chunk_positions = get_chunk_positions()
+    terrain_blocks = np.empty([WORLD_VOLUME, CHUNK_VOLUME], dtype=np.uint8)
+    is_empty = np.empty(WORLD_VOLUME, dtype=np.bool_)
+    build_world_blocks(terrain_blocks, chunk_positions, is_empty)
+
+    worlds = {
+        "terrain": terrain_blocks,
+        "dense": get_random_blocks(args.dense),
+        "sparse": get_random_blocks(args.sparse),
+    }
+
+    # Warm up the JIT so the compiler is not part of the measure
+    for per_face in (False, True):
+        padded_blocks = get_padded_blocks(
+            tuple(chunk_positions[0]), terrain_blocks, chunk_positions
+        )
+        vertex_data = get_mesh_buffer(1 + per_face)
+        build_chunk_mesh(padded_blocks, 1 + per_face, vertex_data, per_face)
+        build_binary_chunk_mesh(padded_blocks, 1 + per_face, vertex_data, per_face)
+
+    for name, world_blocks in worlds.items():
+        for per_face in (False, True):
+            default_time, binary_time, faces, mismatches = compare_meshers(
+                world_blocks, chunk_positions, per_face
+            )
+
+            print(
+                f"{name:8s} {'face' if per_face else 'vertex':6s}  "
+                f"faces: {faces:9d}  "
+                f"default: {default_time * 1000 / WORLD_VOLUME:6.3f} ms per chunk  "
+                f"binary: {binary_time * 1000 / WORLD_VOLUME:6.3f} ms per chunk  "
+                f"speedup: {default_time / binary_time:5.2f}x  "
+                f"mismatches: {mismatches}"
+            )
+
+
+if __name__ == "__main__":
+    main()
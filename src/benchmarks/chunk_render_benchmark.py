@@ -0,0 +1,188 @@
+"""
+@file chunk_render_benchmark.py
+@brief Compares drawing the chunk meshes with a draw call and a model matrix
+       per chunk against a single indirect draw from the chunk arena, with each
+       chunk vertex format.
+       Run from the src folder with: python -m benchmarks.chunk_render_benchmark
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-14
+"""
+
+# Libraries
+import argparse
+import time
+from types import SimpleNamespace
+
+import glm
+import numpy as np
+
+# Project files
+from benchmarks.mesher_benchmark import (
+    VERTEX_FORMATS,
+    build_meshes,
+    get_render_context,
+)
+from benchmarks.terrain_benchmark import get_chunk_positions
+from core.constants.settings import (
+    CENTER_XZ,
+    CHUNK_FORMATS,
+    CHUNK_SIZE,
+    CHUNK_VOLUME,
+    WORLD_VOLUME,
+)
+from graphics.meshes.chunk_arena import ChunkArena
+from graphics.meshes.chunk_mesh import get_mesher
+from utils.chunk_builder.chunk_terrain_builder import build_world_blocks
+
+
+def time_frames(ctx, render, frames) -> tuple:
+    """
+    Renders the given number of frames and times them.
+    :param ctx: The context.
+    :param render: The function that draws the chunks of a frame.
+    :param frames: The number of frames to render.
+    :return: The mean time to issue the draws of a frame and the mean time to
+             render a frame, in seconds.
+    """
+    # The first frame is left out, it includes the upload of the buffers
+    render()
+    ctx.finish()
+
+    submit_time = 0.0
+    start = time.perf_counter()
+
+    for _ in range(frames):
+        ctx.clear()
+        submit_start = time.perf_counter()
+        render()
+        submit_time += time.perf_counter() - submit_start
+
+    ctx.finish()
+
+    return submit_time / frames, (time.perf_counter() - start) / frames
+
+
+def compare_renderers(
+    ctx, program, chunk_format, meshes, chunk_positions, frames
+) -> tuple:
+    """
+    Times drawing the given meshes with a draw call and a model matrix per chunk
+    and with a single indirect draw from the chunk arena.
+    :param ctx: The context.
+    :param program: The chunk shader program of the vertex format.
+    :param chunk_format: The vertex format of the meshes.
+    :param meshes: The vertex data of each chunk.
+    :param chunk_positions: The chunk positions in chunk index order.
+    :param frames: The number of frames to render.
+    :return: The name, the draw calls and the times of each renderer.
+    """
+    vbo_format, attribute, _ = VERTEX_FORMATS[chunk_format]
+    per_face = chunk_format == "face"
+    chunk_indices = np.array(
+        [chunk_index for chunk_index in range(WORLD_VOLUME) if len(meshes[chunk_index])]
+    )
+
+    # A buffer, a vertex array and a model matrix per chunk
+    chunks = []
+
+    for chunk_index in chunk_indices:
+        data = meshes[chunk_index]
+        vao = ctx.vertex_array(program, [(ctx.buffer(data), vbo_format, attribute)])
+
+        if per_face:
+            vao.vertices = 6
+            vao.instances = len(data) // 2
+
+        m_model = glm.translate(
+            glm.mat4(), glm.vec3(*chunk_positions[chunk_index]) * CHUNK_SIZE
+        )
+        chunks.append((vao, m_model))
+
+    def render_chunks() -> None:
+        for vao, m_model in chunks:
+            program["m_model"].write(m_model)
+            vao.render()
+
+    chunks_times = time_frames(ctx, render_chunks, frames)
+
+    for vao, _ in chunks:
+        vao.release()
+
+    # Every mesh in a single arena
+    program["m_model"].write(glm.mat4(1.0))
+    arena = ChunkArena(
+        SimpleNamespace(
+            ctx=ctx,
+            shader_program=SimpleNamespace(chunk=program),
+            chunk_format=chunk_format,
+        )
+    )
+
+    for chunk_index in chunk_indices:
+        arena.write(
+            chunk_index, tuple(chunk_positions[chunk_index]), meshes[chunk_index]
+        )
+
+    arena_times = time_frames(ctx, lambda: arena.render(chunk_indices), frames)
+    arena.release()
+
+    return (
+        ("chunks", len(chunk_indices), chunks_times),
+        ("arena", 1, arena_times),
+    )
+
+
+def main() -> None:
+    """
+    Meshes the world and draws it from above the border of the world with each
+    renderer and vertex format, reporting the draw calls and the time per frame.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=5)
+    parser.add_argument("--resolution", type=int, nargs=2, default=(160, 90))
+    parser.add_argument("--backend", help="Context backend, such as egl")
+    args = parser.parse_args()
+
+    chunk_positions = get_chunk_positions()
+    world_blocks = np.empty([WORLD_VOLUME, CHUNK_VOLUME], dtype=np.uint8)
+    is_empty = np.empty(WORLD_VOLUME, dtype=np.bool_)
+    build_world_blocks(world_blocks, chunk_positions, is_empty)
+
+    ctx, programs = get_render_context(tuple(args.resolution), args.backend)
+
+    if ctx.version_code < 430:
+        print(f"the arena needs OpenGL 4.3, the context has {ctx.version_code}")
+        return
+
+    eye = glm.vec3(CENTER_XZ, 3 * CHUNK_SIZE, -CHUNK_SIZE)
+    m_view = glm.lookAt(eye, glm.vec3(CENTER_XZ, 0, CENTER_XZ), glm.vec3(0, 1, 0))
+
+    for chunk_format in CHUNK_FORMATS:
+        per_face = chunk_format == "face"
+        program = programs[chunk_format]
+        program["m_view"].write(m_view)
+
+        meshes = build_meshes(
+            get_mesher("default"), world_blocks, chunk_positions, per_face
+        )
+
+        # A single face per chunk leaves little work to the GPU, so the frame time
+        # is mostly the cost of issuing the draws
+        face_size = 2 if per_face else 6
+        single_faces = [data[:face_size] for data in meshes]
+
+        for name, chunk_meshes in (("world", meshes), ("1 face", single_faces)):
+            for renderer, draw_calls, (submit_time, frame_time) in compare_renderers(
+                ctx, program, chunk_format, chunk_meshes, chunk_positions, args.frames
+            ):
+                print(
+                    f"{name:6s} {renderer:6s} {chunk_format:6s}  "
+                    f"draw calls: {draw_calls:4d}  "
+                    f"submit: {submit_time * 1000:8.3f} ms  "
+                    f"frame: {frame_time * 1000:8.3f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+@file chunk_storage_benchmark.py
+@brief Compares the memory of the world blocks stored dense and compact, as
+       packed sizes and as measured resident memory, times packing and
+       unpacking the chunks, and checks they round trip.
+       Run from the src folder with: python -m benchmarks.chunk_storage_benchmark
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-12
+"""
+
+# Libraries
+import time
+
+import numpy as np
+
+# Project files
+from benchmarks.mesh_memory_benchmark import get_rss
+from benchmarks.terrain_benchmark import get_chunk_positions
+from core.constants.settings import CHUNK_VOLUME, WORLD_VOLUME
+from utils.chunk_builder.chunk_terrain_builder import build_world_blocks
+from utils.chunk_storage.chunk_storage import (
+    get_block_memory,
+    get_index_bits,
+    get_palette,
+    pack_blocks,
+    release_row,
+    unpack_blocks,
+)
+
+
+def main() -> None:
+    """
+    Generates the world in the memory the world uses, then packs every chunk
+    with few enough block ids and releases its row like the world does,
+    reporting how many chunks of each index size there are, the bytes kept and
+    the resident memory of the process before and after.
+    """
+    chunk_positions = get_chunk_positions()
+    is_empty = np.empty(WORLD_VOLUME, dtype=np.bool_)
+    unpacked_blocks = np.empty(CHUNK_VOLUME, dtype=np.uint8)
+
+    # Warm up the JIT so neither the compilation nor its memory is measured
+    scratch_blocks = np.empty([1, CHUNK_VOLUME], dtype=np.uint8)
+    build_world_blocks(scratch_blocks, chunk_positions[-1:], is_empty[-1:])
+    palette = get_palette(scratch_blocks[0])
+    unpack_blocks(pack_blocks(scratch_blocks[0], palette), palette, unpacked_blocks)
+
+    start_rss = get_rss()
+    block_memory, world_blocks = get_block_memory(WORLD_VOLUME, CHUNK_VOLUME)
+    build_world_blocks(world_blocks, chunk_positions, is_empty)
+    dense_rss = get_rss()
+
+    chunk_bits = {}
+    compact_bytes = 0
+    pack_time = 0.0
+    unpack_time = 0.0
+    is_equal = True
+    packed_chunks = []
+
+    for chunk_index, chunk_blocks in enumerate(world_blocks):
+        start = time.perf_counter()
+        palette = get_palette(chunk_blocks)
+        bits = get_index_bits(palette)
+
+        if bits is None:
+            chunk_bits["dense"] = chunk_bits.get("dense", 0) + 1
+            compact_bytes += chunk_blocks.nbytes
+            continue
+
+        packed_blocks = pack_blocks(chunk_blocks, palette)
+        pack_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        unpack_blocks(packed_blocks, palette, unpacked_blocks)
+        unpack_time += time.perf_counter() - start
+
+        chunk_bits[f"{bits} bit"] = chunk_bits.get(f"{bits} bit", 0) + 1
+        compact_bytes += packed_blocks.nbytes + palette.nbytes
+        is_equal = is_equal and np.array_equal(unpacked_blocks, chunk_blocks)
+
+        release_row(block_memory, world_blocks, chunk_index)
+        packed_chunks.append((chunk_index, packed_blocks, palette))
+
+    compact_rss = get_rss()
+    compact_chunks = len(packed_chunks)
+
+    # Released rows must read as air, the chunks expand over them
+    is_released = not any(world_blocks[index].any() for index, _, _ in packed_chunks)
+
+    print(
+        f"chunks: {WORLD_VOLUME}  "
+        + "  ".join(f"{name}: {count}" for name, count in sorted(chunk_bits.items()))
+    )
+    print(
+        f"dense: {world_blocks.nbytes / 2**20:6.2f} MB  "
+        f"compact: {compact_bytes / 2**20:6.2f} MB "
+        f"({world_blocks.nbytes / compact_bytes:4.1f}x smaller)  "
+        f"pack: {pack_time * 1000 / max(compact_chunks, 1):5.3f} ms per chunk  "
+        f"unpack: {unpack_time * 1000 / max(compact_chunks, 1):5.3f} ms per chunk  "
+        f"equal: {is_equal}"
+    )
+    print(
+        f"measured rss  dense: {dense_rss - start_rss:6.2f} MB  "
+        f"compact: {compact_rss - start_rss:6.2f} MB "
+        f"({(dense_rss - start_rss) / max(compact_rss - start_rss, 0.01):4.1f}x smaller)  "
+        f"released rows read as air: {is_released}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+@file lod_benchmark.py
+@brief Compares the faces and the per chunk meshing time of each level of
+       detail, and the faces of the whole world with the levels of detail seen
+       from a corner of the world against the world at full detail.
+       Run from the src folder with: python -m benchmarks.lod_benchmark
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-14
+"""
+
+# Libraries
+import argparse
+import time
+
+import numpy as np
+
+# Project files
+from benchmarks.terrain_benchmark import get_chunk_positions
+from core.constants.settings import (
+    CHUNK_SIZE,
+    CHUNK_VOLUME,
+    H_CHUNK_SIZE,
+    LOD_DISTANCES,
+    WORLD_VOLUME,
+)
+from utils.chunk_builder.chunk_mesh_builder import (
+    build_chunk_mesh,
+    get_chunk_neighbors,
+    get_mesh_buffer,
+    get_padded_blocks,
+)
+from utils.chunk_builder.chunk_terrain_builder import build_world_blocks
+from utils.chunk_builder.lod_mesh_builder import (
+    FACE_NEIGHBORS,
+    build_lod_chunk_mesh,
+    clear_padded_faces,
+    get_lod_blocks,
+)
+
+
+def build_lod_mesh(world_blocks, chunk_positions, chunk_index, lods) -> np.array:
+    """
+    Builds the face records of a chunk at its level of detail, with the border
+    against neighbors at another level void, as the world does.
+    :param world_blocks: The world blocks.
+    :param chunk_positions: The chunk positions in chunk index order.
+    :param chunk_index: The chunk index.
+    :param lods: The level of detail of each chunk.
+    :return: The face records.
+    """
+    chunk_position = tuple(chunk_positions[chunk_index])
+    lod = lods[chunk_index]
+    vertex_data = get_mesh_buffer(2)
+
+    if lod:
+        padded_blocks = get_lod_blocks(
+            chunk_position, world_blocks, chunk_positions, 2**lod
+        )
+
+    else:
+        padded_blocks = get_padded_blocks(chunk_position, world_blocks, chunk_positions)
+
+    chunk_neighbors = get_chunk_neighbors(chunk_position, chunk_positions)
+    clear_padded_faces(
+        padded_blocks,
+        [
+            face_id
+            for face_id, neighbor in enumerate(FACE_NEIGHBORS)
+            if chunk_neighbors[neighbor] != -1
+            and lods[chunk_neighbors[neighbor]] != lod
+        ],
+        CHUNK_SIZE // 2**lod + 2,
+    )
+
+    if lod:
+        return build_lod_chunk_mesh(padded_blocks, 2**lod, 2, vertex_data, True)
+
+    return build_chunk_mesh(padded_blocks, 2, vertex_data, True)
+
+
+def time_world(world_blocks, chunk_positions, lods) -> tuple:
+    """
+    Meshes every chunk of the world at its level of detail.
+    :param world_blocks: The world blocks.
+    :param chunk_positions: The chunk positions in chunk index order.
+    :param lods: The level of detail of each chunk.
+    :return: The number of faces built and the meshing time, in seconds.
+    """
+    faces = 0
+    start = time.perf_counter()
+
+    for chunk_index in range(WORLD_VOLUME):
+        faces += len(build_lod_mesh(world_blocks, chunk_positions, chunk_index, lods))
+
+    return faces // 2, time.perf_counter() - start
+
+
+def main() -> None:
+    """
+    Meshes the world at each level of detail, and with the levels of detail of
+    a player on a corner of the world, and reports the faces and the mean time
+    per chunk.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--levels", type=int, default=len(LOD_DISTANCES) + 1)
+    args = parser.parse_args()
+
+    chunk_positions = get_chunk_positions()
+    world_blocks = np.empty([WORLD_VOLUME, CHUNK_VOLUME], dtype=np.uint8)
+    is_empty = np.empty(WORLD_VOLUME, dtype=np.bool_)
+    build_world_blocks(world_blocks, chunk_positions, is_empty)
+
+    # Warm up the JIT so the compiler is not part of the measure
+    for lod in range(args.levels):
+        build_lod_mesh(world_blocks, chunk_positions, 0, np.full(WORLD_VOLUME, lod))
+
+    full_faces, _ = time_world(
+        world_blocks, chunk_positions, np.zeros(WORLD_VOLUME, dtype=np.int64)
+    )
+
+    for lod in range(args.levels):
+        faces, mesh_time = time_world(
+            world_blocks, chunk_positions, np.full(WORLD_VOLUME, lod)
+        )
+
+        print(
+            f"level {lod}  scale: {2**lod:2d}  faces: {faces:8d}  "
+            f"ratio: {faces / full_faces:6.3f}  "
+            f"{mesh_time * 1000 / WORLD_VOLUME:6.3f} ms per chunk"
+        )
+
+    # The levels of a player on the ground of the first chunk column
+    player_position = np.array([H_CHUNK_SIZE, CHUNK_SIZE, H_CHUNK_SIZE])
+    centers = chunk_positions * CHUNK_SIZE + H_CHUNK_SIZE
+    distances = np.linalg.norm(centers - player_position, axis=1) / CHUNK_SIZE
+    lods = np.count_nonzero(distances[:, None] > np.array(LOD_DISTANCES), 1)
+    faces, mesh_time = time_world(world_blocks, chunk_positions, lods)
+
+    print(
+        f"corner   levels: {np.bincount(lods).tolist()}  faces: {faces:8d}  "
+        f"ratio: {faces / full_faces:6.3f}  "
+        f"{mesh_time * 1000 / WORLD_VOLUME:6.3f} ms per chunk"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+@file mesh_memory_benchmark.py
+@brief Measures the memory used to mesh the world and to keep its meshes.
+       Run from the src folder with: python -m benchmarks.mesh_memory_benchmark
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-04
+"""
+
+# Libraries
+import argparse
+import resource
+import time
+
+import numpy as np
+
+# Project files
+from benchmarks.terrain_benchmark import get_chunk_positions
+from core.constants.settings import CHUNK_MESHER, CHUNK_VOLUME, MESHERS, WORLD_VOLUME
+from graphics.meshes.chunk_mesh import get_mesher
+from utils.chunk_builder.chunk_mesh_builder import (
+    get_mesh_buffer,
+    get_padded_blocks,
+    get_padded_buffer,
+)
+from utils.chunk_builder.chunk_terrain_builder import build_world_blocks
+
+
+def get_rss() -> float:
+    """
+    Gets the resident set size of the process.
+    :return: The resident set size, in MB.
+    """
+    with open("/proc/self/statm", "r") as file:
+        resident_pages = int(file.read().split()[1])
+
+    return resident_pages * resource.getpagesize() / 2**20
+
+
+def get_peak_rss() -> float:
+    """
+    Gets the peak resident set size of the process.
+    :return: The peak resident set size, in MB.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def main() -> None:
+    """
+    Meshes the world several times, keeping the meshes of the last pass like the
+    world does, and reports the resident memory and the time per pass.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mesher", choices=MESHERS, default=CHUNK_MESHER)
+    parser.add_argument("--passes", type=int, default=5)
+    args = parser.parse_args()
+
+    mesher = get_mesher(args.mesher)
+    chunk_positions = get_chunk_positions()
+    world_blocks = np.empty([WORLD_VOLUME, CHUNK_VOLUME], dtype=np.uint8)
+    is_empty = np.empty(WORLD_VOLUME, dtype=np.bool_)
+    build_world_blocks(world_blocks, chunk_positions, is_empty)
+
+    # Warm up the JIT so the compiler is not part of the measure
+    mesher(
+        padded_blocks=get_padded_blocks(
+            tuple(chunk_positions[0]),
+            world_blocks,
+            chunk_positions,
+            get_padded_buffer(),
+        ),
+        format_size=1,
+        vertex_data=get_mesh_buffer(format_size=1),
+    )
+
+    print(f"start  rss: {get_rss():8.1f} MB  peak: {get_peak_rss():8.1f} MB")
+    meshes = []
+
+    for mesh_pass in range(args.passes):
+        meshes.clear()
+        start = time.perf_counter()
+
+        for chunk_index in range(WORLD_VOLUME):
+            meshes.append(
+                mesher(
+                    padded_blocks=get_padded_blocks(
+                        tuple(chunk_positions[chunk_index]),
+                        world_blocks,
+                        chunk_positions,
+                        get_padded_buffer(),
+                    ),
+                    format_size=1,
+                    vertex_data=get_mesh_buffer(format_size=1),
+                )
+            )
+
+        pass_time = time.perf_counter() - start
+        mesh_size = sum(data.nbytes for data in meshes) / 2**20
+
+        print(
+            f"pass {mesh_pass}  rss: {get_rss():8.1f} MB  peak: {get_peak_rss():8.1f} MB  "
+            f"meshes: {mesh_size:6.1f} MB  time: {pass_time * 1000:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
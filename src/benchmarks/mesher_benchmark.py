@@ -0,0 +1,233 @@
+"""
+@file mesher_benchmark.py
+@brief Compares the vertex count, buffer size, meshing time and frame time of
+       the meshers with each chunk vertex format.
+       Run from the src folder with: python -m benchmarks.mesher_benchmark
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-04
+"""
+
+# Libraries
+import argparse
+import time
+from types import SimpleNamespace
+
+import glm
+import moderngl as mg
+import numpy as np
+
+# Project files
+from benchmarks.terrain_benchmark import get_chunk_positions
+from core.constants.settings import (
+    ASPECT_RATIO,
+    CENTER_XZ,
+    CHUNK_FORMATS,
+    CHUNK_SIZE,
+    CHUNK_VOLUME,
+    FAR,
+    MESHERS,
+    NEAR,
+    SHADERS_PATH,
+    V_FOV,
+    WORLD_VOLUME,
+)
+from graphics.meshes.chunk_mesh import get_mesher
+from graphics.texture.texture import Texture
+from utils.chunk_builder.chunk_mesh_builder import (
+    get_mesh_buffer,
+    get_padded_blocks,
+    get_padded_buffer,
+)
+from utils.chunk_builder.chunk_terrain_builder import build_world_blocks
+
+# Buffer format, attributes and vertex shader of each chunk vertex format
+VERTEX_FORMATS = {
+    "vertex": ("1u4", "packed_data", "chunk"),
+    "face": ("2u4/i", "packed_face", "chunk_face"),
+}
+
+
+def build_meshes(mesher, world_blocks, chunk_positions, per_face=False) -> list:
+    """
+    Builds the vertex data of every chunk with the given mesher.
+    :param mesher: The mesher.
+    :param world_blocks: The world blocks.
+    :param chunk_positions: The chunk positions in chunk index order.
+    :param per_face: Whether to build face records instead of vertices.
+    :return: The vertex data of each chunk.
+    """
+    format_size = 2 if per_face else 1
+
+    return [
+        mesher(
+            padded_blocks=get_padded_blocks(
+                tuple(chunk_positions[chunk_index]),
+                world_blocks,
+                chunk_positions,
+                get_padded_buffer(),
+            ),
+            format_size=format_size,
+            vertex_data=get_mesh_buffer(format_size),
+            per_face=per_face,
+        )
+        for chunk_index in range(WORLD_VOLUME)
+    ]
+
+
+def get_frame_time(ctx, programs, meshes, chunk_format, frames) -> float:
+    """
+    Renders the whole world from above the border of the world and gets the
+    mean time to render a frame.
+    :param ctx: The context.
+    :param programs: The chunk shader program of each vertex format.
+    :param meshes: The vertex data of each chunk.
+    :param chunk_format: The vertex format of the vertex data.
+    :param frames: The number of frames to render.
+    :return: The mean frame time, in seconds.
+    """
+    vbo_format, attribute, _ = VERTEX_FORMATS[chunk_format]
+    program = programs[chunk_format]
+    vaos = []
+
+    for data in meshes:
+        if not len(data):
+            continue
+
+        vao = ctx.vertex_array(program, [(ctx.buffer(data), vbo_format, attribute)])
+
+        # Face records are instances of the six vertices of the face
+        if chunk_format == "face":
+            vao.vertices = 6
+            vao.instances = len(data) // 2
+
+        vaos.append(vao)
+
+    eye = glm.vec3(CENTER_XZ, 3 * CHUNK_SIZE, -CHUNK_SIZE)
+    program["m_view"].write(
+        glm.lookAt(eye, glm.vec3(CENTER_XZ, 0, CENTER_XZ), glm.vec3(0, 1, 0))
+    )
+
+    # The first frame is left out, it includes the upload of the buffers
+    for frame in range(frames + 1):
+        if frame == 1:
+            ctx.finish()
+            start = time.perf_counter()
+
+        ctx.clear()
+
+        for vao in vaos:
+            vao.render()
+
+    ctx.finish()
+    frame_time = (time.perf_counter() - start) / frames
+
+    for vao in vaos:
+        vao.release()
+
+    return frame_time
+
+
+def get_render_context(resolution, backend=None) -> tuple:
+    """
+    Creates a standalone context with the chunk shader program of each vertex
+    format, drawing to an offscreen framebuffer.
+    :param resolution: The size of the framebuffer.
+    :param backend: The context backend, such as "egl" on machines without a
+                    display. The platform default if None.
+    :return: The context and the programs by vertex format.
+    """
+    settings = {"backend": backend} if backend else {}
+    ctx = mg.create_standalone_context(require=330, **settings)
+    ctx.enable(flags=mg.DEPTH_TEST | mg.BLEND | mg.CULL_FACE)
+    ctx.simple_framebuffer(resolution).use()
+    Texture(app=SimpleNamespace(ctx=ctx))
+
+    with open(f"{SHADERS_PATH}/chunk.frag", "r") as file:
+        fragment_shader = file.read()
+
+    programs = {}
+
+    for chunk_format, (_, _, shader_name) in VERTEX_FORMATS.items():
+        with open(f"{SHADERS_PATH}/{shader_name}.vert", "r") as file:
+            vertex_shader = file.read()
+
+        program = ctx.program(
+            vertex_shader=vertex_shader, fragment_shader=fragment_shader
+        )
+        program["m_proj"].write(glm.perspective(V_FOV, ASPECT_RATIO, NEAR, FAR))
+        program["m_model"].write(glm.mat4(1.0))
+        program["u_texture_array_0"].value = 1
+        programs[chunk_format] = program
+
+    return ctx, programs
+
+
+def main() -> None:
+    """
+    Meshes the world with each mesher and vertex format and reports the vertex
+    count, the buffer size, the meshing time and, with --render, the frame time.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--render", action="store_true", help="Also time frames")
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--resolution", type=int, nargs=2, default=(800, 450))
+    parser.add_argument("--backend", help="Context backend, such as egl")
+    args = parser.parse_args()
+
+    chunk_positions = get_chunk_positions()
+    world_blocks = np.empty([WORLD_VOLUME, CHUNK_VOLUME], dtype=np.uint8)
+    is_empty = np.empty(WORLD_VOLUME, dtype=np.bool_)
+    build_world_blocks(world_blocks, chunk_positions, is_empty)
+
+    if args.render:
+        ctx, programs = get_render_context(tuple(args.resolution), args.backend)
+
+    baseline = None
+
+    # A face record is two uint32 words, the packed vertex word plus the AO and
+    # quad size, against six one word vertices
+    print("face format: 2 words per face against 6, buffers 3x smaller, not 6x")
+
+    for name in MESHERS:
+        mesher = get_mesher(name)
+
+        for chunk_format in CHUNK_FORMATS:
+            per_face = chunk_format == "face"
+
+            # Warm up the JIT so only the meshing itself is timed
+            build_meshes(mesher, world_blocks, chunk_positions, per_face)
+
+            start = time.perf_counter()
+            meshes = build_meshes(mesher, world_blocks, chunk_positions, per_face)
+            meshing_time = time.perf_counter() - start
+
+            # Each face record stands for the six vertices of its two triangles
+            vertex_count = sum(len(data) for data in meshes) * (3 if per_face else 1)
+            buffer_size = sum(data.nbytes for data in meshes)
+            baseline = baseline or vertex_count
+
+            report = (
+                f"{name:8s} {chunk_format:6s}  vertices: {vertex_count:9d} "
+                f"({baseline / vertex_count:4.2f}x fewer)  "
+                f"buffers: {buffer_size / 2**20:6.2f} MB  "
+                f"meshing: {meshing_time * 1000:8.2f} ms"
+            )
+
+            if per_face:
+                report += f"  ({vertex_buffer_size / buffer_size:4.2f}x smaller)"
+
+            else:
+                vertex_buffer_size = buffer_size
+
+            if args.render:
+                frame_time = get_frame_time(
+                    ctx, programs, meshes, chunk_format, args.frames
+                )
+                report += f"  frame: {frame_time * 1000:8.2f} ms"
+
+            print(report)
+
+
+if __name__ == "__main__":
+    main()
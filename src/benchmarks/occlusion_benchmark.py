@@ -0,0 +1,119 @@
+"""
+@file occlusion_benchmark.py
+@brief Times finding the faces of each chunk joined through air, and reports the
+       chunks the occlusion culling keeps from cameras on the surface, under
+       the ground and above the world, without frustum culling.
+       Run from the src folder with: python -m benchmarks.occlusion_benchmark
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-14
+"""
+
+# Libraries
+import argparse
+import time
+
+import numpy as np
+
+# Project files
+from benchmarks.terrain_benchmark import get_chunk_positions
+from core.constants.settings import (
+    CENTER_XZ,
+    CHUNK_SIZE,
+    CHUNK_VOLUME,
+    WORLD_HEIGHT,
+    WORLD_VOLUME,
+)
+from utils.chunk_builder.chunk_terrain_builder import build_world_blocks
+from utils.chunk_storage.chunk_visibility import (
+    ALL_CONNECTIONS,
+    get_face_connections,
+    get_visible_chunks,
+)
+
+
+def get_connections(world_blocks) -> tuple:
+    """
+    Finds the faces of each chunk joined through air, flood filling only the
+    chunks that are neither empty nor full, as the world does.
+    :param world_blocks: The world blocks.
+    :return: The connections of each chunk, the number of chunks flood filled and
+             the time spent, in seconds.
+    """
+    connections = np.zeros(WORLD_VOLUME, dtype=np.int64)
+    solid_counts = np.count_nonzero(world_blocks, axis=1)
+    filled = 0
+    start = time.perf_counter()
+
+    for chunk_index in range(WORLD_VOLUME):
+        if not solid_counts[chunk_index]:
+            connections[chunk_index] = ALL_CONNECTIONS
+
+        elif solid_counts[chunk_index] < CHUNK_VOLUME:
+            connections[chunk_index] = get_face_connections(world_blocks[chunk_index])
+            filled += 1
+
+    return connections, filled, time.perf_counter() - start
+
+
+def main() -> None:
+    """
+    Finds the connections of every chunk of the generated world, then the
+    visible chunks from each camera, and reports the times and the chunk counts.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=100)
+    args = parser.parse_args()
+
+    chunk_positions = get_chunk_positions()
+    world_blocks = np.empty([WORLD_VOLUME, CHUNK_VOLUME], dtype=np.uint8)
+    is_empty = np.empty(WORLD_VOLUME, dtype=np.bool_)
+    build_world_blocks(world_blocks, chunk_positions, is_empty)
+
+    # Warm up the JIT so the compiler is not part of the measure
+    on_frustum = np.ones(WORLD_VOLUME, dtype=np.bool_)
+    get_face_connections(world_blocks[0])
+    get_visible_chunks(
+        chunk_positions, np.zeros(WORLD_VOLUME, dtype=np.int64), on_frustum, np.zeros(3)
+    )
+
+    connections, filled, fill_time = get_connections(world_blocks)
+    print(
+        f"connections  chunks filled: {filled:4d}  "
+        f"{fill_time * 1000 / max(filled, 1):6.3f} ms per chunk  "
+        f"all faces joined: {np.count_nonzero(connections == ALL_CONNECTIONS):4d}"
+    )
+
+    cameras = {
+        "surface": (CENTER_XZ, WORLD_HEIGHT * CHUNK_SIZE - 30, CENTER_XZ),
+        "underground": (CENTER_XZ, 10, CENTER_XZ),
+        "above": (CENTER_XZ, WORLD_HEIGHT * CHUNK_SIZE + 50, CENTER_XZ),
+    }
+
+    for name, camera_position in cameras.items():
+        camera_position = np.array(camera_position, dtype=np.float64)
+        start = time.perf_counter()
+
+        for _ in range(args.repeats):
+            is_visible = get_visible_chunks(
+                chunk_positions, connections, on_frustum, camera_position
+            )
+
+        search_time = (time.perf_counter() - start) / args.repeats
+
+        print(
+            f"{name:12s} visible: {np.count_nonzero(is_visible):4d} of {WORLD_VOLUME}  "
+            f"search: {search_time * 1000:6.3f} ms"
+        )
+
+    # Caves and the surface join the faces of most chunks of the generated
+    # terrain, so the search finds a path of air to nearly every chunk
+    print(
+        "note: air joins the faces of most chunks of this terrain, so even "
+        "underground few chunks are culled. The culling pays off only with solid "
+        "rock or closed caves between the camera and the chunks"
+    )
+
+
+if __name__ == "__main__":
+    main()
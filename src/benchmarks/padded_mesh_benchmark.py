@@ -0,0 +1,332 @@
+"""
+@file padded_mesh_benchmark.py
+@brief Compares the per chunk meshing time of the mesher reading the padded
+       blocks against the mesher it replaced, which looked up every neighbor
+       block in the world blocks, and checks both build the same vertices.
+       Run from the src folder with: python -m benchmarks.padded_mesh_benchmark
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-13
+"""
+
+# Libraries
+import time
+
+import numpy as np
+from numba import njit
+
+# Project files
+from benchmarks.terrain_benchmark import get_chunk_positions
+from core.constants.settings import CHUNK_AREA, CHUNK_SIZE, CHUNK_VOLUME, WORLD_VOLUME
+from utils.chunk_builder.chunk_mesh_builder import (
+    add_quad,
+    build_chunk_mesh,
+    get_chunk_neighbors,
+    get_mesh_buffer,
+    get_padded_blocks,
+    get_padded_buffer,
+)
+from utils.chunk_builder.chunk_terrain_builder import build_world_blocks
+
+
+@njit
+def is_void_reference(local_position, world_blocks, chunk_neighbors) -> bool:
+    """
+    Void check of the mesher the padded one replaced, the block looked up in the
+    world blocks. Kept as reference.
+    :param local_position: The local position of the block, up to one block outside.
+    :param world_blocks: The world blocks.
+    :param chunk_neighbors: The world blocks rows of the chunk and its neighbors.
+    :return: True if the block is void.
+    :return: False if the block is not void.
+    """
+
+    # Neighbor offset plus one, the position is at most one block outside
+    x, y, z = local_position
+    dx = (x >= 0) + (x >= CHUNK_SIZE)
+    dy = (y >= 0) + (y >= CHUNK_SIZE)
+    dz = (z >= 0) + (z >= CHUNK_SIZE)
+    chunk_index = chunk_neighbors[dx + 3 * dz + 9 * dy]
+
+    if chunk_index == -1:
+        return False
+
+    chunk_blocks = world_blocks[chunk_index]
+    x -= (dx - 1) * CHUNK_SIZE
+    y -= (dy - 1) * CHUNK_SIZE
+    z -= (dz - 1) * CHUNK_SIZE
+    block_index = x + z * CHUNK_SIZE + y * CHUNK_AREA
+
+    return not chunk_blocks[block_index]
+
+
+@njit
+def get_ao_reference(local_position, world_blocks, chunk_neighbors, plane) -> tuple:
+    """
+    Ambient occlusion of the mesher the padded one replaced, each corner block
+    looked up in the world blocks. Kept as reference.
+    :param local_position: The local position of the void block in front of the face.
+    :param world_blocks: The world blocks.
+    :param chunk_neighbors: The world blocks rows of the chunk and its neighbors.
+    :param plane: The plane of the face, "Y", "X" or "Z".
+    :return: The ambient occlusion of the four corners.
+    """
+    x, y, z = local_position
+
+    if plane == "Y":
+        a = is_void_reference((x, y, z - 1), world_blocks, chunk_neighbors)
+        b = is_void_reference((x - 1, y, z - 1), world_blocks, chunk_neighbors)
+        c = is_void_reference((x - 1, y, z), world_blocks, chunk_neighbors)
+        d = is_void_reference((x - 1, y, z + 1), world_blocks, chunk_neighbors)
+        e = is_void_reference((x, y, z + 1), world_blocks, chunk_neighbors)
+        f = is_void_reference((x + 1, y, z + 1), world_blocks, chunk_neighbors)
+        g = is_void_reference((x + 1, y, z), world_blocks, chunk_neighbors)
+        h = is_void_reference((x + 1, y, z - 1), world_blocks, chunk_neighbors)
+
+    elif plane == "X":
+        a = is_void_reference((x, y, z - 1), world_blocks, chunk_neighbors)
+        b = is_void_reference((x, y - 1, z - 1), world_blocks, chunk_neighbors)
+        c = is_void_reference((x, y - 1, z), world_blocks, chunk_neighbors)
+        d = is_void_reference((x, y - 1, z + 1), world_blocks, chunk_neighbors)
+        e = is_void_reference((x, y, z + 1), world_blocks, chunk_neighbors)
+        f = is_void_reference((x, y + 1, z + 1), world_blocks, chunk_neighbors)
+        g = is_void_reference((x, y + 1, z), world_blocks, chunk_neighbors)
+        h = is_void_reference((x, y + 1, z - 1), world_blocks, chunk_neighbors)
+
+    else:
+        a = is_void_reference((x - 1, y, z), world_blocks, chunk_neighbors)
+        b = is_void_reference((x - 1, y - 1, z), world_blocks, chunk_neighbors)
+        c = is_void_reference((x, y - 1, z), world_blocks, chunk_neighbors)
+        d = is_void_reference((x + 1, y - 1, z), world_blocks, chunk_neighbors)
+        e = is_void_reference((x + 1, y, z), world_blocks, chunk_neighbors)
+        f = is_void_reference((x + 1, y + 1, z), world_blocks, chunk_neighbors)
+        g = is_void_reference((x, y + 1, z), world_blocks, chunk_neighbors)
+        h = is_void_reference((x - 1, y + 1, z), world_blocks, chunk_neighbors)
+
+    return ((a + b + c), (g + h + a), (e + f + g), (c + d + e))
+
+
+@njit(nogil=True)
+def build_chunk_mesh_reference(
+    chunk_blocks,
+    format_size,
+    chunk_position,
+    world_blocks,
+    chunk_positions,
+    vertex_data=None,
+    per_face=False,
+) -> np.array:
+    """
+    Mesher the padded one replaced, every neighbor block looked up in the world
+    blocks through the rows of the neighbor chunks. Kept as reference.
+    :param chunk_blocks: The chunk blocks.
+    :param format_size: The format size.
+    :param chunk_position: The chunk position.
+    :param world_blocks: The world blocks.
+    :param chunk_positions: The chunk position stored in each row of the world blocks.
+    :param vertex_data: Scratch vertex data to build the mesh in, see get_mesh_buffer.
+                        A new one is allocated if None.
+    :param per_face: Whether to build a face record per face, see add_quad, instead
+                     of six vertices.
+    :return: The mesh, a copy with exactly the vertices built.
+    """
+    if vertex_data is None:
+        vertex_data = np.empty(CHUNK_VOLUME * 18 * format_size, dtype="uint32")
+
+    index = 0
+
+    chunk_neighbors = get_chunk_neighbors(chunk_position, chunk_positions)
+
+    for x in range(CHUNK_SIZE):
+        for y in range(CHUNK_SIZE):
+            for z in range(CHUNK_SIZE):
+                block_id = chunk_blocks[x + CHUNK_SIZE * z + CHUNK_AREA * y]
+
+                if not block_id:
+                    continue
+
+                # Top face
+                if is_void_reference((x, y + 1, z), world_blocks, chunk_neighbors):
+                    ao = get_ao_reference(
+                        (x, y + 1, z), world_blocks, chunk_neighbors, plane="Y"
+                    )
+                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
+
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        (x, y, z),
+                        1,
+                        1,
+                        block_id,
+                        0,
+                        ao,
+                        flip_id,
+                        per_face,
+                    )
+
+                # Bottom face
+                if is_void_reference((x, y - 1, z), world_blocks, chunk_neighbors):
+                    ao = get_ao_reference(
+                        (x, y - 1, z), world_blocks, chunk_neighbors, plane="Y"
+                    )
+                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
+
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        (x, y, z),
+                        1,
+                        1,
+                        block_id,
+                        1,
+                        ao,
+                        flip_id,
+                        per_face,
+                    )
+
+                # Right face
+                if is_void_reference((x + 1, y, z), world_blocks, chunk_neighbors):
+                    ao = get_ao_reference(
+                        (x + 1, y, z), world_blocks, chunk_neighbors, plane="X"
+                    )
+                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
+
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        (x, y, z),
+                        1,
+                        1,
+                        block_id,
+                        2,
+                        ao,
+                        flip_id,
+                        per_face,
+                    )
+
+                # Left face
+                if is_void_reference((x - 1, y, z), world_blocks, chunk_neighbors):
+                    ao = get_ao_reference(
+                        (x - 1, y, z), world_blocks, chunk_neighbors, plane="X"
+                    )
+                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
+
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        (x, y, z),
+                        1,
+                        1,
+                        block_id,
+                        3,
+                        ao,
+                        flip_id,
+                        per_face,
+                    )
+
+                # Back face
+                if is_void_reference((x, y, z - 1), world_blocks, chunk_neighbors):
+                    ao = get_ao_reference(
+                        (x, y, z - 1), world_blocks, chunk_neighbors, plane="Z"
+                    )
+                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
+
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        (x, y, z),
+                        1,
+                        1,
+                        block_id,
+                        4,
+                        ao,
+                        flip_id,
+                        per_face,
+                    )
+
+                # Front face
+                if is_void_reference((x, y, z + 1), world_blocks, chunk_neighbors):
+                    ao = get_ao_reference(
+                        (x, y, z + 1), world_blocks, chunk_neighbors, plane="Z"
+                    )
+                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
+
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        (x, y, z),
+                        1,
+                        1,
+                        block_id,
+                        5,
+                        ao,
+                        flip_id,
+                        per_face,
+                    )
+
+    return vertex_data[:index].copy()
+
+
+def main() -> None:
+    """
+    Meshes every chunk of the world with both meshers and reports the mean time
+    per chunk, with the time to gather the padded blocks apart.
+    """
+    chunk_positions = get_chunk_positions()
+    world_blocks = np.empty([WORLD_VOLUME, CHUNK_VOLUME], dtype=np.uint8)
+    is_empty = np.empty(WORLD_VOLUME, dtype=np.bool_)
+    build_world_blocks(world_blocks, chunk_positions, is_empty)
+
+    vertex_data = get_mesh_buffer(format_size=1)
+    padded_blocks = get_padded_buffer()
+    reference_time = 0.0
+    gather_time = 0.0
+    meshing_time = 0.0
+    mismatches = 0
+
+    # Warm up the JIT so the compiler is not part of the measure
+    position = tuple(chunk_positions[0])
+    build_chunk_mesh_reference(
+        world_blocks[0], 1, position, world_blocks, chunk_positions, vertex_data
+    )
+    get_padded_blocks(position, world_blocks, chunk_positions, padded_blocks)
+    build_chunk_mesh(padded_blocks, 1, vertex_data)
+
+    for chunk_index in range(WORLD_VOLUME):
+        position = tuple(chunk_positions[chunk_index])
+
+        start = time.perf_counter()
+        reference = build_chunk_mesh_reference(
+            world_blocks[chunk_index],
+            1,
+            position,
+            world_blocks,
+            chunk_positions,
+            vertex_data,
+        )
+        reference_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        get_padded_blocks(position, world_blocks, chunk_positions, padded_blocks)
+        gather_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        mesh = build_chunk_mesh(padded_blocks, 1, vertex_data)
+        meshing_time += time.perf_counter() - start
+
+        mismatches += not np.array_equal(mesh, reference)
+
+    padded_time = gather_time + meshing_time
+
+    print(
+        f"chunks: {WORLD_VOLUME}  "
+        f"reference: {reference_time * 1000 / WORLD_VOLUME:6.3f} ms per chunk  "
+        f"padded: {padded_time * 1000 / WORLD_VOLUME:6.3f} ms per chunk "
+        f"(gather {gather_time * 1000 / WORLD_VOLUME:6.3f} ms)  "
+        f"speedup: {reference_time / padded_time:5.2f}x  mismatches: {mismatches}"
+    )
+
+
+if __name__ == "__main__":
+    main()
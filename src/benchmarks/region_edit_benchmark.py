@@ -0,0 +1,135 @@
+"""
+@file region_edit_benchmark.py
+@brief Times carving a sphere out of the world and remeshing the chunks it
+       touches, and checks no chunk that sees the change is left out.
+       Run from the src folder with: python -m benchmarks.region_edit_benchmark
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-10
+"""
+
+# Libraries
+import argparse
+import time
+
+import numpy as np
+
+# Project files
+from benchmarks.terrain_benchmark import get_chunk_positions
+from core.constants.settings import (
+    CHUNK_MESHER,
+    CHUNK_SIZE,
+    CHUNK_VOLUME,
+    MESHERS,
+    WORLD_VOLUME,
+)
+from graphics.meshes.chunk_mesh import get_mesher
+from utils.block_handler.region_edit import (
+    fill_region,
+    get_region_chunks,
+    get_sphere_mask,
+)
+from utils.chunk_builder.chunk_mesh_builder import (
+    get_mesh_buffer,
+    get_padded_blocks,
+    get_padded_buffer,
+)
+from utils.chunk_builder.chunk_terrain_builder import build_world_blocks
+from utils.chunk_storage.chunk_occupancy import FACES, get_occupancy
+
+
+def build_mesh(mesher, world_blocks, chunk_positions, chunk_index) -> np.array:
+    """
+    Builds the vertex data of a chunk with the given mesher.
+    :param mesher: The mesher.
+    :param world_blocks: The world blocks.
+    :param chunk_positions: The chunk positions in chunk index order.
+    :param chunk_index: The chunk index.
+    :return: The vertex data.
+    """
+    return mesher(
+        padded_blocks=get_padded_blocks(
+            tuple(chunk_positions[chunk_index]),
+            world_blocks,
+            chunk_positions,
+            get_padded_buffer(),
+        ),
+        format_size=1,
+        vertex_data=get_mesh_buffer(format_size=1),
+    )
+
+
+def main() -> None:
+    """
+    Carves a sphere centered on the corner shared by eight chunks, then remeshes
+    the chunks the edit queues and reports the time of each step.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--radius", type=int, default=32)
+    parser.add_argument("--mesher", choices=MESHERS, default=CHUNK_MESHER)
+    args = parser.parse_args()
+
+    mesher = get_mesher(args.mesher)
+    chunk_positions = get_chunk_positions()
+    world_blocks = np.empty([WORLD_VOLUME, CHUNK_VOLUME], dtype=np.uint8)
+    is_empty = np.empty(WORLD_VOLUME, dtype=np.bool_)
+    build_world_blocks(world_blocks, chunk_positions, is_empty)
+
+    solid_counts = np.empty(WORLD_VOLUME, dtype=np.int64)
+    face_counts = np.empty([WORLD_VOLUME, FACES], dtype=np.int64)
+
+    for chunk_index in range(WORLD_VOLUME):
+        occupancy = get_occupancy(world_blocks[chunk_index])
+        solid_counts[chunk_index], face_counts[chunk_index] = occupancy
+
+    # Warm up the JIT so only the edit and the meshing are timed
+    get_region_chunks(chunk_positions, (0, 0, 0), (0, 0, 0))
+    meshes = [
+        build_mesh(mesher, world_blocks, chunk_positions, chunk_index)
+        for chunk_index in range(WORLD_VOLUME)
+    ]
+
+    center = np.array([2 * CHUNK_SIZE, CHUNK_SIZE, 2 * CHUNK_SIZE])
+    mask = get_sphere_mask(args.radius)
+
+    start = time.perf_counter()
+    _, dirty_chunks = fill_region(
+        world_blocks,
+        chunk_positions,
+        solid_counts,
+        face_counts,
+        center - args.radius,
+        mask,
+        0,
+    )
+    edit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+
+    for chunk_index in dirty_chunks:
+        build_mesh(mesher, world_blocks, chunk_positions, chunk_index)
+
+    meshing_time = time.perf_counter() - start
+
+    # Every chunk whose mesh changed must have been queued
+    missed = [
+        chunk_index
+        for chunk_index in range(WORLD_VOLUME)
+        if chunk_index not in dirty_chunks
+        and not np.array_equal(
+            meshes[chunk_index],
+            build_mesh(mesher, world_blocks, chunk_positions, chunk_index),
+        )
+    ]
+
+    print(
+        f"radius: {args.radius}  blocks: {np.count_nonzero(mask)}  "
+        f"edit: {edit_time * 1000:6.2f} ms  chunks: {len(dirty_chunks)}  "
+        f"meshing: {meshing_time * 1000:7.2f} ms "
+        f"({meshing_time * 1000 / max(len(dirty_chunks), 1):5.2f} ms per chunk)  "
+        f"missed chunks: {len(missed)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
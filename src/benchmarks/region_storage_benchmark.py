@@ -0,0 +1,87 @@
+"""
+@file region_storage_benchmark.py
+@brief Compares loading the saved world against generating it, and checks the
+       loaded blocks match the saved ones.
+       Run from the src folder with: python -m benchmarks.region_storage_benchmark
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-11
+"""
+
+# Libraries
+import argparse
+import os
+import tempfile
+import time
+
+import numba
+import numpy as np
+
+# Project files
+from benchmarks.terrain_benchmark import get_chunk_positions
+from core.constants.settings import BUILD_WORKERS, CHUNK_VOLUME, WORLD_VOLUME
+from utils.chunk_builder.chunk_terrain_builder import build_world_blocks
+from utils.region_storage.region_storage import RegionStorage
+
+
+def main() -> None:
+    """
+    Generates the world, saves every chunk and loads them back, reporting the
+    time of each step and the size of the region files.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=BUILD_WORKERS)
+    args = parser.parse_args()
+
+    numba.set_num_threads(min(args.workers, numba.config.NUMBA_NUM_THREADS))
+    chunk_positions = get_chunk_positions()
+    world_blocks = np.empty([WORLD_VOLUME, CHUNK_VOLUME], dtype=np.uint8)
+    is_empty = np.empty(WORLD_VOLUME, dtype=np.bool_)
+
+    # Warm up the JIT so only the generation itself is timed
+    build_world_blocks(world_blocks, chunk_positions, is_empty)
+
+    start = time.perf_counter()
+    build_world_blocks(world_blocks, chunk_positions, is_empty)
+    generation_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as path:
+        storage = RegionStorage(path)
+
+        # The world copies the blocks on the render thread, the rest is background
+        start = time.perf_counter()
+        storage.save_chunks(
+            [
+                (chunk_positions[chunk_index], world_blocks[chunk_index].copy())
+                for chunk_index in range(WORLD_VOLUME)
+            ]
+        )
+        queue_time = time.perf_counter() - start
+        storage.close()
+        save_time = time.perf_counter() - start
+
+        file_size = sum(
+            os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)
+        )
+
+        # Warm up the JIT of the decoder as well
+        loaded_blocks = np.empty_like(world_blocks)
+        RegionStorage(path).load_chunks(loaded_blocks, chunk_positions)
+
+        start = time.perf_counter()
+        is_loaded = RegionStorage(path).load_chunks(loaded_blocks, chunk_positions)
+        load_time = time.perf_counter() - start
+
+    is_equal = is_loaded.all() and np.array_equal(loaded_blocks, world_blocks)
+
+    print(
+        f"chunks: {WORLD_VOLUME}  generation: {generation_time * 1000:8.2f} ms  "
+        f"load: {load_time * 1000:8.2f} ms  "
+        f"save: {save_time * 1000:8.2f} ms ({queue_time * 1000:6.2f} ms blocking)  "
+        f"files: {file_size / 2**20:6.2f} MB "
+        f"({world_blocks.nbytes / file_size:5.1f}x smaller)  equal: {is_equal}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+@file terrain_benchmark.py
+@brief Startup benchmark for the terrain generation of the world.
+       Run from the src folder with: python -m benchmarks.terrain_benchmark
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-04
+"""
+
+# Libraries
+import argparse
+import time
+
+import glm
+import numpy as np
+
+# Project files
+from core.constants.settings import (
+    CHUNK_AREA,
+    CHUNK_SIZE,
+    CHUNK_VOLUME,
+    WORLD_AREA,
+    WORLD_DEPTH,
+    WORLD_HEIGHT,
+    WORLD_VOLUME,
+    WORLD_WIDTH,
+)
+from utils.chunk_builder.chunk_terrain_builder import build_world_blocks
+
+
+def build_blocks_reference(position) -> np.array:
+    """
+    Per voxel Python generator the compiled one replaced. Kept as reference.
+    :param position: The chunk position.
+    :return: The chunk blocks.
+    """
+    blocks = np.zeros(CHUNK_VOLUME, dtype=np.uint8)
+    cx, cy, cz = glm.ivec3(position) * CHUNK_SIZE
+
+    for x in range(CHUNK_SIZE):
+        wx = x + cx
+
+        for z in range(CHUNK_SIZE):
+            wz = z + cz
+
+            world_height = int(glm.simplex(glm.vec2(wx, wz) * 0.01) * 32 + 32)
+            local_height = min(world_height - cy, CHUNK_SIZE)
+
+            for y in range(local_height):
+                wy = y + cy
+                blocks[x + CHUNK_SIZE * z + CHUNK_AREA * y] = wy + 2
+
+    return blocks
+
+
+def get_chunk_positions() -> np.array:
+    """
+    Gets the chunk positions of the world in chunk index order.
+    :return: The chunk positions.
+    """
+    chunk_positions = np.empty([WORLD_VOLUME, 3], dtype=np.int64)
+
+    for x in range(WORLD_WIDTH):
+        for y in range(WORLD_HEIGHT):
+            for z in range(WORLD_DEPTH):
+                chunk_positions[x + WORLD_WIDTH * z + WORLD_AREA * y] = (x, y, z)
+
+    return chunk_positions
+
+
+def main() -> None:
+    """
+    Times the reference and the compiled generators and checks they match.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    chunk_positions = get_chunk_positions()
+    world_blocks = np.empty([WORLD_VOLUME, CHUNK_VOLUME], dtype=np.uint8)
+    is_empty = np.empty(WORLD_VOLUME, dtype=np.bool_)
+
+    start = time.perf_counter()
+    reference = np.array([build_blocks_reference(p) for p in chunk_positions])
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    build_world_blocks(world_blocks, chunk_positions, is_empty)
+    cold_time = time.perf_counter() - start
+
+    warm_time = float("inf")
+
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        build_world_blocks(world_blocks, chunk_positions, is_empty)
+        warm_time = min(warm_time, time.perf_counter() - start)
+
+    identical = np.array_equal(reference, world_blocks)
+    print(f"chunks:          {WORLD_VOLUME}")
+    print(f"identical:       {identical}")
+    print(f"reference:       {reference_time * 1000:10.2f} ms")
+    print(f"compiled (cold): {cold_time * 1000:10.2f} ms")
+    print(f"compiled (warm): {warm_time * 1000:10.2f} ms")
+    print(f"speedup (cold):  {reference_time / cold_time:10.1f}x")
+    print(f"speedup (warm):  {reference_time / warm_time:10.1f}x")
+
+    if not identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
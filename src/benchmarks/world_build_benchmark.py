@@ -0,0 +1,105 @@
+"""
+@file world_build_benchmark.py
+@brief Startup benchmark for the parallel world build (generation and meshing).
+       Run from the src folder with: python -m benchmarks.world_build_benchmark
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-04
+"""
+
+# Libraries
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numba
+import numpy as np
+
+# Project files
+from benchmarks.terrain_benchmark import get_chunk_positions
+from core.constants.settings import BUILD_WORKERS, CHUNK_VOLUME, WORLD_VOLUME
+from utils.chunk_builder.chunk_mesh_builder import (
+    build_chunk_mesh,
+    get_mesh_buffer,
+    get_padded_blocks,
+    get_padded_buffer,
+)
+from utils.chunk_builder.chunk_terrain_builder import build_world_blocks
+
+
+def build_world(chunk_positions, workers) -> tuple:
+    """
+    Builds the blocks and the vertex data of every chunk, like World does.
+    :param chunk_positions: The chunk positions in chunk index order.
+    :param workers: The number of worker threads.
+    :return: The generation time, the meshing time and the vertex count.
+    """
+    numba.set_num_threads(min(workers, numba.config.NUMBA_NUM_THREADS))
+    world_blocks = np.empty([WORLD_VOLUME, CHUNK_VOLUME], dtype=np.uint8)
+    is_empty = np.empty(WORLD_VOLUME, dtype=np.bool_)
+
+    start = time.perf_counter()
+    build_world_blocks(world_blocks, chunk_positions, is_empty)
+    generation_time = time.perf_counter() - start
+
+    def mesh(chunk_index):
+        return build_chunk_mesh(
+            padded_blocks=get_padded_blocks(
+                tuple(chunk_positions[chunk_index]),
+                world_blocks,
+                chunk_positions,
+                get_padded_buffer(),
+            ),
+            format_size=1,
+            vertex_data=get_mesh_buffer(format_size=1),
+        )
+
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        vertex_count = sum(
+            len(data) for data in executor.map(mesh, range(WORLD_VOLUME))
+        )
+
+    meshing_time = time.perf_counter() - start
+
+    return generation_time, meshing_time, vertex_count
+
+
+def main() -> None:
+    """
+    Times the world build for an increasing number of workers.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=BUILD_WORKERS)
+    args = parser.parse_args()
+
+    chunk_positions = get_chunk_positions()
+
+    # Warm up the JIT so only the build itself is timed
+    build_world(chunk_positions, workers=1)
+
+    workers = 1
+    baseline = None
+
+    while True:
+        generation_time, meshing_time, vertex_count = build_world(
+            chunk_positions, workers
+        )
+        total_time = generation_time + meshing_time
+        baseline = baseline or total_time
+
+        print(
+            f"workers: {workers:3d}  generation: {generation_time * 1000:8.2f} ms  "
+            f"meshing: {meshing_time * 1000:8.2f} ms  "
+            f"speedup: {baseline / total_time:5.2f}x  vertices: {vertex_count}"
+        )
+
+        if workers >= args.workers:
+            break
+
+        workers = min(workers * 2, args.workers)
+
+
+if __name__ == "__main__":
+    main()
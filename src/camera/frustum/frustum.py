@@ -9,6 +9,7 @@
 # Imports
 import glm
 import math
+import numpy as np
 
 # Project files
 from core.constants.settings import CHUNK_SPHERE_RADIUS, V_FOV, H_FOV, NEAR, FAR
@@ -59,3 +60,31 @@ class Frustum:
             return False
 
         return True
+
+    def get_on_frustum(self, centers) -> np.array:
+        """
+        Checks which of the given chunks are on the frustum, all in one batch.
+        :param centers: The chunk centers, one row per chunk.
+        :return: A mask, True for the chunks on the frustum.
+        """
+        sphere_vectors = centers - np.array(self.camera.position, dtype=np.float32)
+
+        axes = np.array(
+            [self.camera.forward, self.camera.right, self.camera.up], dtype=np.float32
+        )
+        sphere_z, sphere_x, sphere_y = (sphere_vectors @ axes.T).T
+
+        # Near and Far planes
+        on_frustum = (NEAR - CHUNK_SPHERE_RADIUS < sphere_z) & (
+            sphere_z < FAR + CHUNK_SPHERE_RADIUS
+        )
+
+        # Left and Right planes
+        distance = self.factor_x * CHUNK_SPHERE_RADIUS + sphere_z * self.tan_x
+        on_frustum &= np.abs(sphere_x) <= distance
+
+        # Top and Bottom planes
+        distance = self.factor_y * CHUNK_SPHERE_RADIUS + sphere_z * self.tan_y
+        on_frustum &= np.abs(sphere_y) <= distance
+
+        return on_frustum
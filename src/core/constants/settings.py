@@ -8,6 +8,7 @@
 
 import glm
 import math
+import os
 
 # Window properties
 WIN_RES = glm.vec2(1600, 900)
@@ -19,12 +20,118 @@ CHUNK_AREA = CHUNK_SIZE * CHUNK_SIZE
 CHUNK_VOLUME = CHUNK_AREA * CHUNK_SIZE
 CHUNK_SPHERE_RADIUS = H_CHUNK_SIZE * math.sqrt(3)
 
-# World properties
-WORLD_WIDTH, WORLD_HEIGHT = 10, 2
+# Streaming properties
+WORLD_STREAMING = False
+RENDER_RADIUS = 4
+STREAM_LOADS_PER_FRAME = 8
+STREAM_MESHES_PER_FRAME = 2
+
+# World properties, a streaming world keeps one ring of unmeshed chunks around the
+# render radius so the meshes on the border can see their neighbors
+WORLD_WIDTH = 2 * RENDER_RADIUS + 3 if WORLD_STREAMING else 10
+WORLD_HEIGHT = 2
 WORLD_DEPTH = WORLD_WIDTH
 WORLD_AREA = WORLD_WIDTH * WORLD_DEPTH
 WORLD_VOLUME = WORLD_AREA * WORLD_HEIGHT
 
+# Storage properties, chunks with at most MAX_PALETTE_SIZE block ids are kept as
+# packed palette indices and release their row of the world blocks. A chunk
+# stays expanded for COMPACT_DELAY seconds after it was last meshed or edited
+MAX_PALETTE_SIZE = 16
+COMPACT_DELAY = 5.0
+
+# Persistence, the chunks are saved in region files of REGION_SIZE by REGION_SIZE
+# chunk columns, as runs of blocks compressed with zlib at SAVE_COMPRESSION. Modified chunks are
+# saved every AUTOSAVE_INTERVAL seconds and on exit. A WORLD_PATH of None keeps
+# the world in memory only
+WORLD_PATH = None
+REGION_SIZE = 8
+SAVE_COMPRESSION = 1
+AUTOSAVE_INTERVAL = 30.0
+
+# Disk cache of the generated blocks and of the meshes, kept across launches and
+# invalidated when the generator or mesher code changes. None disables the cache
+CACHE_PATH = None
+
+# Build properties
+BUILD_WORKERS = os.cpu_count() or 1
+
+# Time, in milliseconds, the world spends per frame rebuilding the meshes of the
+# chunks changed by block edits. At least one queued chunk is rebuilt every frame
+REBUILD_BUDGET_MS = 4.0
+
+# Mesher used to build the chunk meshes, "default" emits a quad per visible block
+# face, "greedy" merges coplanar faces with the same block and shading and
+# "binary" builds the same quads as "default" from bit masks of the solid blocks
+MESHERS = ("default", "greedy", "binary")
+CHUNK_MESHER = "default"
+
+# Vertex format of the chunk meshes, "vertex" stores the six vertices of each face
+# and "face" a single record per face that the vertex shader expands
+CHUNK_FORMATS = ("vertex", "face")
+CHUNK_FORMAT = "vertex"
+
+# Renderer of the chunk meshes, "chunks" draws each chunk with its own buffer and
+# "arena" draws the visible chunks from one shared buffer with a single indirect
+# draw, and falls back to "chunks" without OpenGL 4.3. The arena starts with
+# ARENA_SIZE bytes, grows as needed, and gives each chunk a multiple of
+# ARENA_BLOCK_SIZE bytes so most rebuilds fit in place
+CHUNK_RENDERERS = ("chunks", "arena")
+CHUNK_RENDERER = "arena"
+ARENA_SIZE = 16 * 2**20
+ARENA_BLOCK_SIZE = 4096
+
+# Level of detail, chunks farther from the camera than each of LOD_DISTANCES, in
+# chunks, are meshed at half the resolution of the previous level. A chunk only
+# changes level once it is LOD_HYSTERESIS chunks past the distance, so it does
+# not switch back and forth on the boundary
+LOD_DISTANCES = (4, 8)
+LOD_HYSTERESIS = 0.5
+
+# Occlusion culling, only the chunks on the frustum reached from the chunk of the
+# camera through faces joined by air are drawn
+OCCLUSION_CULLING = True
+
+# Frame profiler, the time of each phase of the last PROFILER_FRAMES frames. The
+# caption and the overlay, toggled with F3, show their percentiles and are
+# refreshed every PROFILER_REPORT_INTERVAL seconds. PROFILE_PATH is the CSV or
+# JSON file the frame times are written to on exit, None to skip it
+PROFILER_PHASES = (
+    "input",
+    "player",
+    "uniforms",
+    "world",
+    "remesh",
+    "raycast",
+    "render",
+)
+PROFILER_FRAMES = 600
+PROFILER_REPORT_INTERVAL = 0.5
+PROFILER_OVERLAY = False
+PROFILER_OVERLAY_SIZE = (300, 150)
+PROFILE_PATH = None
+
+# Headless mode, renders HEADLESS_FRAMES frames to an offscreen framebuffer of
+# a standalone context, such as Mesa llvmpipe through EGL, and reports the frame
+# times, the draw calls and the vertices submitted
+HEADLESS_FRAMES = 300
+HEADLESS_BACKEND = "egl"
+
+# Input recording, the keys, mouse motion and mouse buttons of each tick are
+# written to RECORD_PATH on exit, and replayed from REPLAY_PATH
+RECORD_PATH = None
+REPLAY_PATH = None
+
+# Simulation, the player and the world are updated TICK_RATE times per second
+# whatever the frame rate, TICK_TIME milliseconds each, and the camera is
+# interpolated between the last two ticks. A frame runs at most
+# MAX_TICKS_PER_FRAME ticks, slower frames drop the time left instead of falling
+# further behind. FPS_LIMIT caps the frame rate, 0 to leave it uncapped
+TICK_RATE = 60
+TICK_TIME = 1000 / TICK_RATE
+MAX_TICKS_PER_FRAME = 5
+FPS_LIMIT = 0
+
 # Render properties
 CENTER_XZ = WORLD_WIDTH * H_CHUNK_SIZE
 CENTER_Y = WORLD_HEIGHT * H_CHUNK_SIZE
@@ -49,7 +156,8 @@ PLAYER_SPEED = 0.05
 PLAYER_ROTATION_SPEED = 0.04
 PLAYER_POSITION = glm.vec3(H_CHUNK_SIZE, CHUNK_SIZE, 1.5 * CHUNK_SIZE)
 
-MOUSE_SENSITIVITY = 0.002
+# Radians the camera turns per pixel of mouse motion
+MOUSE_SENSITIVITY = 0.033
 
 # Voxel
 MAX_RAY_DISTANCE = 6.0
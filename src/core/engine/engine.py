@@ -9,33 +9,129 @@
 
 # Libraries
 import moderngl as mg
+import numpy as np
 import pygame as pg
 
 
 # Project files
-from core.constants.settings import BG_COLOR, WIN_RES
+from core.constants.settings import (
+    BG_COLOR,
+    BUILD_WORKERS,
+    CACHE_PATH,
+    CHUNK_FORMAT,
+    CHUNK_MESHER,
+    CHUNK_RENDERER,
+    FPS_LIMIT,
+    HEADLESS_BACKEND,
+    HEADLESS_FRAMES,
+    MAX_TICKS_PER_FRAME,
+    PROFILE_PATH,
+    PROFILER_FRAMES,
+    PROFILER_OVERLAY,
+    PROFILER_PHASES,
+    PROFILER_REPORT_INTERVAL,
+    RECORD_PATH,
+    REPLAY_PATH,
+    TICK_TIME,
+    WIN_RES,
+    WORLD_PATH,
+)
 from core.window.window import Window
 from utils.shader_program.shader_program import ShaderProgram
 from render.scene.scene import Scene
 from player.player import Player
+from utils.frame_profiler.frame_profiler import FrameProfiler
+from utils.frame_profiler.profiler_overlay import ProfilerOverlay
+from utils.input_recorder.input_recorder import InputRecorder, InputReplay
 from graphics.texture.texture import Texture
 
-
 """
 @brief Main engine class for the game.
 """
 
 
 class Engine:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        workers=BUILD_WORKERS,
+        mesher=CHUNK_MESHER,
+        chunk_format=CHUNK_FORMAT,
+        chunk_renderer=CHUNK_RENDERER,
+        world_path=WORLD_PATH,
+        cache_path=CACHE_PATH,
+        profile_path=PROFILE_PATH,
+        overlay=PROFILER_OVERLAY,
+        headless=False,
+        frames=HEADLESS_FRAMES,
+        record_path=RECORD_PATH,
+        replay_path=REPLAY_PATH,
+        fps_limit=FPS_LIMIT,
+    ) -> None:
         """
         Initializes the engine.
+        :param workers: Number of worker threads used to build the world
+        :param mesher: Mesher used to build the chunk meshes
+        :param chunk_format: Vertex format of the chunk meshes
+        :param chunk_renderer: Renderer of the chunk meshes
+        :param world_path: Folder the world is saved to and loaded from, None to
+                           keep the world in memory only
+        :param cache_path: Folder of the cache of the generated blocks and of the
+                           meshes, None to build them on every launch
+        :param profile_path: CSV or JSON file the frame times are written to on
+                             exit, None to skip it
+        :param overlay: Whether the frame time overlay starts visible
+        :param headless: Whether to render offscreen, without a display, a fixed
+                         number of frames and report their times
+        :param frames: Number of frames rendered in headless mode
+        :param record_path: File the input of each frame is recorded to on exit,
+                            None to not record it
+        :param replay_path: File of recorded input replayed instead of the live
+                            input, None to play
+        :param fps_limit: Maximum frame rate, 0 to leave it uncapped
         """
         self.window = Window(resolution=WIN_RES)
+        self.workers = max(1, workers)
+        self.mesher = mesher
+        self.chunk_format = chunk_format
+        self.chunk_renderer = chunk_renderer
+        self.world_path = world_path
+        self.cache_path = cache_path
+        self.profile_path = profile_path
+        self.show_overlay = overlay
+        self.headless = headless
+        self.frames = frames
+        self.is_replay = replay_path is not None
+        self.fps_limit = fps_limit
 
-        # Clock
+        # Player input, replayed from a recording or read live and recorded
+        if self.is_replay:
+            self.input = InputReplay(replay_path)
+            self.frames = len(self.input.ticks)
+
+        else:
+            self.input = InputRecorder(record_path)
+
+        # A headless run or a replay runs a single tick per frame, so its frames
+        # are comparable whatever their times, stops after its last frame and
+        # reports the stats of every frame, draw calls, vertices and chunk rebuilds
+        self.is_benchmark = headless or self.is_replay
+        self.stats = []
+
+        # Frame profiler, keeping every frame of a benchmark
+        profiler_frames = PROFILER_FRAMES
+
+        if self.is_benchmark:
+            profiler_frames = max(profiler_frames, self.frames)
+
+        self.profiler = FrameProfiler(PROFILER_PHASES, profiler_frames)
+        self.report_time = 0.0
+
+        # Clock, the simulation advances by a fixed tick, and the time since the
+        # last tick is left in the accumulator
         self.clock = None
-        self.delta_time = 0.0
+        self.delta_time = TICK_TIME
+        self.accumulator = 0.0
+        self.time = 0.0
         self.is_running = True
 
         self.init_engine()
@@ -44,10 +140,21 @@ class Engine:
         """
         Initializes the engine
         """
-        self.window.create_window()
+        # Create the context, a standalone one drawing to a framebuffer when headless
+        if self.headless:
+            self.window.create_headless_window()
+            self.ctx = mg.create_standalone_context(
+                require=330, backend=HEADLESS_BACKEND
+            )
+            self.framebuffer = self.ctx.simple_framebuffer(
+                (int(WIN_RES.x), int(WIN_RES.y))
+            )
+            self.framebuffer.use()
+
+        else:
+            self.window.create_window()
+            self.ctx = mg.create_context()
 
-        # Create the context
-        self.ctx = mg.create_context()
         self.ctx.enable(flags=mg.DEPTH_TEST | mg.BLEND | mg.CULL_FACE)
         self.ctx.gc_mode = "auto"
 
@@ -55,58 +162,196 @@ class Engine:
         self.clock = pg.time.Clock()
 
         # Mouse overflow
-        pg.event.set_grab(True)
-        pg.mouse.set_visible(False)
+        if not self.headless:
+            pg.event.set_grab(True)
+            pg.mouse.set_visible(False)
 
         # Textures
         self.texture = Texture(app=self)
 
         # Player
         self.player = Player(app=self)
+        self.input.start(self.player)
+        self.player.set_previous_pose()
 
         # Shaders and scene
         self.shader_program = ShaderProgram(app=self)
         self.scene = Scene(app=self)
+        self.overlay = ProfilerOverlay(
+            app=self, profiler=self.profiler, is_visible=self.show_overlay
+        )
 
     def update(self) -> None:
         """
-        Updates the window and the clock
+        Runs the simulation ticks due since the last frame, then moves the camera
+        between the last two ticks and updates the window and the clock
         """
-        self.player.update()
-        self.shader_program.update()
-        self.scene.update()
-
-        self.delta_time = self.clock.tick()
+        frame_time = self.clock.tick(self.fps_limit)
         self.time = pg.time.get_ticks() * 0.001
-        pg.display.set_caption(f"FPS: {self.clock.get_fps():.2f}")
+
+        # A benchmark renders the pose of its single tick
+        if self.is_benchmark:
+            ticks = 1
+            self.accumulator = TICK_TIME
+
+        else:
+            self.accumulator += frame_time
+            ticks = min(int(self.accumulator // TICK_TIME), MAX_TICKS_PER_FRAME)
+            self.accumulator -= ticks * TICK_TIME
+
+            # Past the catch up cap the whole ticks left are dropped
+            if ticks == MAX_TICKS_PER_FRAME:
+                self.accumulator %= TICK_TIME
+
+        for _ in range(ticks):
+            self.tick()
+
+        with self.profiler.scope("player"):
+            self.player.interpolate(self.accumulator / TICK_TIME)
+
+        with self.profiler.scope("uniforms"):
+            self.shader_program.update()
+
+        if self.time - self.report_time > PROFILER_REPORT_INTERVAL:
+            self.report_time = self.time
+            self.set_caption()
+
+    def tick(self) -> None:
+        """
+        Advances the simulation by a tick, the block edits, the player and the
+        world
+        """
+        with self.profiler.scope("input"):
+            for button in self.input.get_buttons():
+                self.player.handle_button(button)
+
+        with self.profiler.scope("player"):
+            self.player.update()
+
+        with self.profiler.scope("world"):
+            self.scene.update()
+
+        self.input.end_tick()
+
+    def set_caption(self) -> None:
+        """
+        Shows the frame rate and the percentiles of the frame time on the caption
+        """
+        percentiles = self.profiler.get_percentiles().get("frame", {})
+        frame_times = " ".join(
+            f"{key}: {value:.1f}" for key, value in percentiles.items()
+        )
+        pg.display.set_caption(f"FPS: {self.clock.get_fps():.2f}  {frame_times} ms")
 
     def render(self) -> None:
         """
         Renders content to the window
         """
-        self.ctx.clear(color=BG_COLOR)
-        self.scene.render()
-        self.window.clear_window()
+        with self.profiler.scope("render"):
+            self.ctx.clear(color=BG_COLOR)
+            self.scene.render()
+            self.overlay.render()
+
+            # Nothing is shown offscreen, wait for the frame so it is timed
+            if self.headless:
+                self.ctx.finish()
+
+            else:
+                self.window.clear_window()
 
     def handle_events(self) -> None:
         """
         Handles all the game related events such as input
         """
-        for event in pg.event.get():
-            if event.type == pg.QUIT or (
-                event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE
-            ):
-                self.is_running = False
-                self.window.close_window()
+        with self.profiler.scope("input"):
+            for event in pg.event.get():
+                if event.type == pg.QUIT or (
+                    event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE
+                ):
+                    self.quit()
+
+                if event.type == pg.KEYDOWN and event.key == pg.K_F3:
+                    self.overlay.toggle()
+
+                self.input.handle_event(event)
+
+    def quit(self) -> None:
+        """
+        Saves the world, writes the frame times and the recorded input if asked
+        to and closes the window
+        """
+        self.is_running = False
+        self.scene.world.close()
+        self.input.save()
+
+        if self.profile_path is not None:
+            self.profiler.export(self.profile_path)
 
-            self.player.handle_events(event)
+        self.overlay.release()
+        self.window.close_window()
 
     def run(self) -> None:
         """
-        Main loop of the game
+        Main loop of the game. A headless run or a replay reports its stats and
+        quits after its last frame
         """
+        self.profiler.start()
 
         while self.is_running:
             self.handle_events()
             self.update()
             self.render()
+            self.profiler.end_frame()
+
+            if not self.is_benchmark:
+                continue
+
+            world = self.scene.world
+            self.stats.append(
+                (
+                    world.draw_calls,
+                    world.drawn_vertices,
+                    world.rebuilt_chunks,
+                    world.rebuild_latency,
+                )
+            )
+
+            if len(self.stats) >= self.frames:
+                self.report()
+                self.quit()
+
+    def report(self) -> None:
+        """
+        Prints the renderer, the frame rate, the percentiles of the frame and phase
+        times, the draw calls and vertices submitted per frame, and the chunk
+        rebuilds after block edits
+        """
+        draw_calls, vertices, rebuilt_chunks, latencies = np.array(self.stats).T
+        frame_times = self.profiler.get_frames()[:, -1]
+        seconds = frame_times.sum() / 1000
+
+        print(f"renderer: {self.ctx.info['GL_RENDERER']}  {self.ctx.version_code}")
+        print(
+            f"frames: {len(frame_times)}  resolution: {int(WIN_RES.x)}x{int(WIN_RES.y)}  "
+            f"fps: {len(frame_times) / seconds:.2f}"
+        )
+
+        for line in self.profiler.get_summary():
+            print(line)
+
+        print(
+            f"draw calls per frame: {draw_calls.mean():.1f}  "
+            f"vertices per frame: {vertices.mean():.0f}  "
+            f"vertices per second: {vertices.sum() / seconds:.0f}"
+        )
+
+        # Worst wait of a dirty chunk rebuilt on each frame with rebuilds
+        latencies = latencies[rebuilt_chunks > 0]
+
+        if len(latencies):
+            print(
+                f"rebuilt chunks: {int(rebuilt_chunks.sum())}  "
+                f"rebuild latency p50: {np.percentile(latencies, 50):.1f}  "
+                f"p95: {np.percentile(latencies, 95):.1f}  "
+                f"max: {latencies.max():.1f} ms"
+            )
@@ -8,6 +8,7 @@
 from core.constants.settings import BG_COLOR, WIN_RES
 import moderngl as mg
 import pygame as pg
+import os
 import sys
 
 
@@ -32,6 +33,16 @@ class Window:
 
         self.screen = pg.display.set_mode(WIN_RES, flags=pg.OPENGL | pg.DOUBLEBUF)
 
+    def create_headless_window(self) -> None:
+        """
+        Initializes pygame without a display, for the input and the clock of the
+        headless mode, which renders to an offscreen framebuffer instead
+        """
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pg.init()
+
+        self.screen = pg.display.set_mode(WIN_RES)
+
     def clear_window(self) -> None:
         """
         Clears the window
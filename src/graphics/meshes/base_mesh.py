@@ -5,8 +5,14 @@
 @version 1.0
 @date 2023-07-04
 """
+
+import re
+
 import numpy as np
 
+# Factor the vertex buffer grows by when the vertex data does not fit in it
+BUFFER_GROWTH = 2
+
 
 class BaseMesh:
     def __init__(self) -> None:
@@ -18,19 +24,81 @@ class BaseMesh:
         self.vbo_format = None
         self.attributes: tuple[str, ...] = None
         self.vao = None
+        self.vbo = None
 
-    def get_vao(self) -> np.array:
+    def get_vao(self, vertex_data=None) -> np.array:
         """
-        Gets the vertex array object.
-        :return: The vertex array object
+        Gets the vertex array object with the given vertex data. The vertex buffer
+        of the mesh is written in place while the data fits in it. Otherwise it is
+        replaced by a larger one, and the old buffer and vertex array are released.
+        :param vertex_data: Prebuilt vertex data. Built with get_vertex_data if None
+        :return: The vertex array object. None if there is nothing to draw
         """
-        vertex_data = self.get_vertex_data()
-        vbo = self.ctx.buffer(vertex_data)
-        vao = self.ctx.vertex_array(
-            self.program, [(vbo, self.vbo_format, *self.attributes)], skip_errors=True
+        if vertex_data is None:
+            vertex_data = self.get_vertex_data()
+
+        if self.vbo is not None and vertex_data.nbytes <= self.vbo.size:
+            if vertex_data.nbytes:
+                self.vbo.write(vertex_data)
+
+            self.set_vertex_count(vertex_data.nbytes // self.get_vertex_size())
+
+            return self.vao
+
+        # Buffers can not be empty, a chunk with every face hidden has no vertices
+        if not len(vertex_data):
+            return None
+
+        size = vertex_data.nbytes
+
+        if self.vbo is not None:
+            size = max(size, self.vbo.size * BUFFER_GROWTH)
+
+        self.release()
+        self.vbo = self.ctx.buffer(reserve=size)
+        self.vbo.write(vertex_data)
+        self.vao = self.ctx.vertex_array(
+            self.program,
+            [(self.vbo, self.vbo_format, *self.attributes)],
+            skip_errors=True,
         )
 
-        return vao
+        self.set_vertex_count(vertex_data.nbytes // self.get_vertex_size())
+
+        return self.vao
+
+    def get_vertex_size(self) -> int:
+        """
+        Gets the size of a vertex of the buffer format, such as "2f2 3f2".
+        :return: The size in bytes
+        """
+        size = 0
+
+        for fmt in self.vbo_format.split():
+            count, kind, kind_size = re.match(r"(\d*)(n?[fiux])(\d*)", fmt).groups()
+            size += int(count or 1) * int(kind_size or (1 if kind == "x" else 4))
+
+        return size
+
+    def set_vertex_count(self, vertex_count) -> None:
+        """
+        Sets the number of vertices in the vertex buffer, the ones the vertex array
+        draws.
+        :param vertex_count: The number of vertices
+        """
+        self.vao.vertices = vertex_count
+
+    def release(self) -> None:
+        """
+        Releases the vertex array object and the vertex buffer of the mesh.
+        """
+        if self.vao is not None:
+            self.vao.release()
+            self.vao = None
+
+        if self.vbo is not None:
+            self.vbo.release()
+            self.vbo = None
 
     def get_vertex_data(self) -> np.array:
         ...
@@ -39,4 +107,5 @@ class BaseMesh:
         """
         Renders the mesh.
         """
-        self.vao.render()
+        if self.vao is not None:
+            self.vao.render()
@@ -19,6 +19,8 @@ class BlockMesh(BaseMesh):
         Initializes the CubeMesh class.
         :param app: The application to be used.
         """
+        super().__init__()
+
         self.app = app
         self.ctx = self.app.ctx
         self.program = self.app.shader_program.block_marker
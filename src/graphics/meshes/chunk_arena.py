@@ -0,0 +1,248 @@
+"""
+@file chunk_arena.py
+@brief Contains the chunk arena class, a single vertex buffer shared by the
+       meshes of every chunk and drawn with one indirect draw.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-14
+"""
+
+# Libraries
+import bisect
+
+import numpy as np
+
+# Project files
+from core.constants.settings import (
+    ARENA_BLOCK_SIZE,
+    ARENA_SIZE,
+    CHUNK_SIZE,
+    WORLD_VOLUME,
+)
+from graphics.meshes.base_mesh import BUFFER_GROWTH
+
+
+class ChunkArena:
+    def __init__(self, app) -> None:
+        """
+        Initializes the chunk arena. The mesh of each chunk takes a range of the
+        arena, found by the chunk index, and the origin of each chunk is an
+        attribute picked by the draw record of the chunk.
+        :param app: The main application
+        """
+        self.app = app
+        self.ctx = app.ctx
+        self.program = app.shader_program.chunk
+
+        # The face format has a record of two words per face, drawn as an instance
+        # of six vertices, so its draw records pick the chunk origin by vertex
+        self.per_face = app.chunk_format == "face"
+
+        if self.per_face:
+            self.vbo_format = "2u4/i"
+            self.attributes = ("packed_face",)
+            self.origin_format = "3f"
+            self.record_size = 8
+            origin_vertices = 6
+
+        else:
+            self.vbo_format = "1u4"
+            self.attributes = ("packed_data",)
+            self.origin_format = "3f/i"
+            self.record_size = 4
+            origin_vertices = 1
+
+        # Ranges of the arena, in records, the one of each chunk and the free ones
+        # sorted by offset
+        self.block_records = ARENA_BLOCK_SIZE // self.record_size
+        self.offsets = np.zeros(WORLD_VOLUME, dtype=np.int64)
+        self.capacities = np.zeros(WORLD_VOLUME, dtype=np.int64)
+        self.counts = np.zeros(WORLD_VOLUME, dtype=np.int64)
+        self.free_ranges = [(0, ARENA_SIZE // self.record_size)]
+
+        # Origin of each chunk, written to the GPU before the next draw once it
+        # changed
+        self.origins = np.zeros([WORLD_VOLUME, origin_vertices, 3], dtype=np.float32)
+        self.is_origin_changed = False
+
+        # Draw records of the visible chunks, count, instance count, first vertex
+        # and first instance, padded to the five words moderngl reads per record
+        self.commands = np.zeros([WORLD_VOLUME, 5], dtype=np.uint32)
+        self.drawn_vertices = 0
+
+        self.vbo = self.ctx.buffer(reserve=ARENA_SIZE)
+        self.origin_buffer = self.ctx.buffer(self.origins)
+        self.indirect_buffer = self.ctx.buffer(reserve=self.commands.nbytes)
+        self.vao = self.get_vao()
+
+    def get_vao(self):
+        """
+        Gets the vertex array object of the arena and of the chunk origins
+        :return: The vertex array object
+        """
+        return self.ctx.vertex_array(
+            self.program,
+            [
+                (self.vbo, self.vbo_format, *self.attributes),
+                (self.origin_buffer, self.origin_format, "chunk_origin"),
+            ],
+            skip_errors=True,
+        )
+
+    def write(self, chunk_index, position, vertex_data) -> None:
+        """
+        Writes the mesh of the given chunk. The mesh is written in place while it
+        fits in the range of the chunk, otherwise the chunk takes a new range.
+        :param chunk_index: The chunk index
+        :param position: The chunk position
+        :param vertex_data: The vertex data
+        """
+        records = vertex_data.nbytes // self.record_size
+
+        # Chunks with every face hidden have nothing to draw
+        if not records:
+            self.free(chunk_index)
+            return
+
+        if records > self.capacities[chunk_index]:
+            self.free(chunk_index)
+            capacity = -(-records // self.block_records) * self.block_records
+            self.offsets[chunk_index] = self.allocate(capacity)
+            self.capacities[chunk_index] = capacity
+
+        self.vbo.write(
+            vertex_data, offset=int(self.offsets[chunk_index]) * self.record_size
+        )
+        self.counts[chunk_index] = records
+
+        origin = np.multiply(position, CHUNK_SIZE, dtype=np.float32)
+
+        if (self.origins[chunk_index] != origin).any():
+            self.origins[chunk_index] = origin
+            self.is_origin_changed = True
+
+    def free(self, chunk_index) -> None:
+        """
+        Frees the range of the given chunk
+        :param chunk_index: The chunk index
+        """
+        capacity = int(self.capacities[chunk_index])
+        self.capacities[chunk_index] = 0
+        self.counts[chunk_index] = 0
+
+        if capacity:
+            self.add_free_range(int(self.offsets[chunk_index]), capacity)
+
+    def allocate(self, size) -> int:
+        """
+        Takes the first free range of the given size, growing the arena if no
+        free range is large enough
+        :param size: The size, in records
+        :return: The offset of the range, in records
+        """
+        for range_index, (offset, free_size) in enumerate(self.free_ranges):
+            if free_size < size:
+                continue
+
+            if free_size == size:
+                del self.free_ranges[range_index]
+
+            else:
+                self.free_ranges[range_index] = (offset + size, free_size - size)
+
+            return offset
+
+        self.grow(size)
+
+        return self.allocate(size)
+
+    def add_free_range(self, offset, size) -> None:
+        """
+        Adds a free range, merged with the free ranges right before and after it
+        :param offset: The offset of the range, in records
+        :param size: The size of the range, in records
+        """
+        range_index = bisect.bisect(self.free_ranges, (offset,))
+
+        if range_index < len(self.free_ranges):
+            next_offset, next_size = self.free_ranges[range_index]
+
+            if offset + size == next_offset:
+                size += next_size
+                del self.free_ranges[range_index]
+
+        if range_index:
+            previous_offset, previous_size = self.free_ranges[range_index - 1]
+
+            if previous_offset + previous_size == offset:
+                offset = previous_offset
+                size += previous_size
+                range_index -= 1
+                del self.free_ranges[range_index]
+
+        self.free_ranges.insert(range_index, (offset, size))
+
+    def grow(self, size) -> None:
+        """
+        Replaces the arena by a larger one with room for at least the given size,
+        copying the meshes over on the GPU
+        :param size: The size, in records
+        """
+        records = self.vbo.size // self.record_size
+        new_records = max(records * BUFFER_GROWTH, records + size)
+
+        vbo = self.ctx.buffer(reserve=new_records * self.record_size)
+        self.ctx.copy_buffer(vbo, self.vbo)
+        self.vao.release()
+        self.vbo.release()
+        self.vbo = vbo
+        self.vao = self.get_vao()
+
+        self.add_free_range(records, new_records - records)
+
+    def render(self, chunk_indices) -> int:
+        """
+        Renders the meshes of the given chunks with a single indirect draw
+        :param chunk_indices: The chunk indices
+        :return: The number of chunks drawn
+        """
+        chunk_indices = chunk_indices[self.counts[chunk_indices] > 0]
+        chunk_count = len(chunk_indices)
+        self.drawn_vertices = 0
+
+        if not chunk_count:
+            return 0
+
+        if self.is_origin_changed:
+            self.origin_buffer.write(self.origins)
+            self.is_origin_changed = False
+
+        # Faces are instances, the chunk origin is picked by the first vertex
+        commands = self.commands[:chunk_count]
+
+        if self.per_face:
+            commands[:, 0] = 6
+            commands[:, 1] = self.counts[chunk_indices]
+            commands[:, 2] = 6 * chunk_indices
+            commands[:, 3] = self.offsets[chunk_indices]
+
+        else:
+            commands[:, 0] = self.counts[chunk_indices]
+            commands[:, 1] = 1
+            commands[:, 2] = self.offsets[chunk_indices]
+            commands[:, 3] = chunk_indices
+
+        self.indirect_buffer.write(commands)
+        self.vao.render_indirect(self.indirect_buffer, count=chunk_count)
+        self.drawn_vertices = int(commands[:, 0].astype(np.int64) @ commands[:, 1])
+
+        return chunk_count
+
+    def release(self) -> None:
+        """
+        Releases the buffers and the vertex array object of the arena
+        """
+        self.vao.release()
+        self.vbo.release()
+        self.origin_buffer.release()
+        self.indirect_buffer.release()
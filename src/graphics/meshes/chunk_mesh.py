@@ -7,18 +7,47 @@
 """
 
 # Project files
+from core.constants.settings import CHUNK_SIZE
 from graphics.meshes.base_mesh import BaseMesh
-from utils.chunk_builder.chunk_mesh_builder import build_chunk_mesh
+from utils.chunk_builder.binary_mesh_builder import build_binary_chunk_mesh
+from utils.chunk_builder.chunk_mesh_builder import (
+    build_chunk_mesh,
+    get_mesh_buffer,
+    get_padded_blocks,
+    get_padded_buffer,
+)
+from utils.chunk_builder.greedy_mesh_builder import build_greedy_chunk_mesh
+from utils.chunk_builder.lod_mesh_builder import (
+    build_lod_chunk_mesh,
+    clear_padded_faces,
+    get_lod_blocks,
+)
 
 # Libraries
 import numpy as np
 
 
+def get_mesher(name):
+    """
+    Gets the function that builds the chunk vertex data with the given mesher.
+    :param name: The mesher, "default", "greedy" or "binary".
+    :return: The mesher function
+    """
+    if name == "greedy":
+        return build_greedy_chunk_mesh
+
+    if name == "binary":
+        return build_binary_chunk_mesh
+
+    return build_chunk_mesh
+
+
 class ChunkMesh(BaseMesh):
-    def __init__(self, chunk) -> None:
+    def __init__(self, chunk, build=True) -> None:
         """
         Initializes the chunk mesh
         :param chunk: The chunk
+        :param build: Whether to build the vertex array object right away
         """
         super().__init__()
         self.app = chunk.app
@@ -26,10 +55,19 @@ class ChunkMesh(BaseMesh):
         self.ctx = self.app.ctx
         self.program = self.app.shader_program.chunk
 
-        self.vbo_format = "1u4"
+        # The face format has a record of two words per face, drawn as an instance
+        self.per_face = self.app.chunk_format == "face"
+
+        if self.per_face:
+            self.vbo_format = "2u4/i"
+            self.attributes = ("packed_face",)
+
+        else:
+            self.vbo_format = "1u4"
+            self.attributes = ("packed_data",)
+
         self.format_size = sum(int(fmt[:1]) for fmt in self.vbo_format.split())
-        self.attributes = ("packed_data",)
-        self.vao = self.get_vao()
+        self.vao = self.get_vao() if build else None
 
     def rebuild(self) -> None:
         """
@@ -37,15 +75,115 @@ class ChunkMesh(BaseMesh):
         """
         self.vao = self.get_vao()
 
-    def get_vertex_data(self) -> np.array:
+    def get_vao(self, vertex_data=None):
+        """
+        Gets the vertex array object with the given vertex data. With the arena
+        renderer the vertex data is written to the chunk arena instead, and the
+        chunk has no vertex array of its own.
+        :param vertex_data: Prebuilt vertex data. Built with get_vertex_data if None
+        :return: The vertex array object. None if there is nothing to draw or the
+                 chunk is drawn from the arena
+        """
+        arena = self.chunk.world.arena
+
+        if arena is None:
+            return super().get_vao(vertex_data)
+
+        if vertex_data is None:
+            vertex_data = self.get_vertex_data()
+
+        arena.write(self.chunk.index, self.chunk.position, vertex_data)
+
+        return None
+
+    def release(self) -> None:
+        """
+        Releases the GPU buffers of the chunk mesh, or its range of the arena.
         """
-        Gets the vertex data.
+        super().release()
+
+        if self.chunk.world.arena is not None:
+            self.chunk.world.arena.free(self.chunk.index)
+
+    def get_padded_blocks(self) -> np.array:
+        """
+        Gathers the chunk blocks and the border around them, everything the mesher
+        reads, in the scratch buffer of the calling thread. Chunks at a lower level
+        of detail gather their cells instead, see get_lod_blocks. The border
+        against neighbors at another level of detail is void, so the faces of the
+        chunk close the gap to their mesh.
+        :return: The padded blocks
+        """
+        lod = self.chunk.lod
+
+        if lod:
+            padded_blocks = get_lod_blocks(
+                self.chunk.position,
+                self.chunk.world.blocks,
+                self.chunk.world.chunk_positions,
+                2**lod,
+            )
+
+        else:
+            padded_blocks = get_padded_blocks(
+                self.chunk.position,
+                self.chunk.world.blocks,
+                self.chunk.world.chunk_positions,
+                get_padded_buffer(),
+            )
+
+        clear_padded_faces(
+            padded_blocks,
+            self.chunk.world.get_lod_faces(self.chunk),
+            CHUNK_SIZE // 2**lod + 2,
+        )
+
+        return padded_blocks
+
+    def get_vertex_data(self, padded_blocks=None) -> np.array:
+        """
+        Gets the vertex data, built with the mesher the engine was started with
+        in the scratch buffer of the calling thread. Chunks at a lower level of
+        detail are built with the level of detail mesher.
+        :param padded_blocks: The gathered padded blocks. Gathered if None
         :return: The vertex data
         """
+        # Empty chunks and enclosed full chunks have no visible face
+        if self.chunk.is_empty or self.chunk.is_hidden:
+            return np.empty(0, dtype=np.uint32)
 
-        return build_chunk_mesh(
-            chunk_blocks=self.chunk.blocks,
+        if padded_blocks is None:
+            padded_blocks = self.get_padded_blocks()
+
+        lod = self.chunk.lod
+
+        if lod:
+            return build_lod_chunk_mesh(
+                lod_blocks=padded_blocks,
+                scale=2**lod,
+                format_size=self.format_size,
+                vertex_data=get_mesh_buffer(self.format_size),
+                per_face=self.per_face,
+            )
+
+        mesher = get_mesher(self.app.mesher)
+
+        return mesher(
+            padded_blocks=padded_blocks,
             format_size=self.format_size,
-            chunk_position=self.chunk.position,
-            world_blocks=self.chunk.world.blocks,
+            vertex_data=get_mesh_buffer(self.format_size),
+            per_face=self.per_face,
         )
+
+    def set_vertex_count(self, vertex_count) -> None:
+        """
+        Sets the number of vertices in the vertex buffer. With the face format they
+        are face records, each drawn as an instance of six vertices.
+        :param vertex_count: The number of vertices
+        """
+        if self.per_face:
+            self.vao.vertices = 6
+            self.vao.instances = vertex_count
+
+        else:
+            self.vao.vertices = vertex_count
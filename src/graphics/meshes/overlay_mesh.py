@@ -0,0 +1,56 @@
+"""
+@file overlay_mesh.py
+@brief Contains the overlay mesh class, a textured rectangle drawn over the
+       window in pixels from its top left corner.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-14
+"""
+
+# Libraries
+import numpy as np
+
+# Project files
+from graphics.meshes.base_mesh import BaseMesh
+
+
+class OverlayMesh(BaseMesh):
+    def __init__(self, app, position, size) -> None:
+        """
+        Initializes the overlay mesh.
+        :param app: The main application
+        :param position: The position of the top left corner, in pixels
+        :param size: The size of the rectangle, in pixels
+        """
+        super().__init__()
+
+        self.app = app
+        self.ctx = app.ctx
+        self.program = app.shader_program.overlay
+        self.position = position
+        self.size = size
+
+        # Format
+        self.vbo_format = "2f 2f"
+        self.attributes = ("in_position", "in_tex_coord_0")
+        self.vao = self.get_vao()
+
+    def get_vertex_data(self) -> np.array:
+        """
+        Gets the vertex data, two triangles with the top of the texture on the
+        top of the rectangle.
+        :return: The vertex data
+        """
+        x, y = self.position
+        width, height = self.size
+
+        vertices = [
+            (x, y, 0, 1),
+            (x, y + height, 0, 0),
+            (x + width, y + height, 1, 0),
+            (x, y, 0, 1),
+            (x + width, y + height, 1, 0),
+            (x + width, y, 1, 1),
+        ]
+
+        return np.array(vertices, dtype="float32")
@@ -23,10 +23,15 @@ flat in int block_id;
  * Main fragment shader entry point.
  */
 void main() {
-    vec2 face_uv = uv;
-    face_uv.x = uv.x / 3.0 - min(face_id, 2) / 3.0;
-
-    vec3 tex_col = texture(u_texture_array_0, vec3(face_uv, block_id)).rgb;
+    vec2 face_uv = fract(uv);
+    face_uv.x = face_uv.x / 3.0 - min(face_id, 2) / 3.0;
+
+    // Gradients of the unwrapped coordinates, the wrapped ones jump on the
+    // block borders of merged faces
+    vec2 scale = vec2(1.0 / 3.0, 1.0);
+    vec3 tex_col = textureGrad(
+        u_texture_array_0, vec3(face_uv, block_id), dFdx(uv) * scale, dFdy(uv) * scale
+    ).rgb;
     tex_col = pow(tex_col, gamma);
     tex_col *= shading;
     tex_col = pow(tex_col, inv_gamma);
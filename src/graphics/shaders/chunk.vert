@@ -3,6 +3,10 @@
 // Layouts for vertex data
 layout (location = 0) in uint packed_data;
 
+// Origin of the chunk, an instance attribute when the chunks are drawn from
+// the arena and zero otherwise, with the chunk moved by m_model instead
+layout (location = 1) in vec3 chunk_origin;
+
 // Global variables
 int x, y, z;
 int ao_id;
@@ -29,18 +33,6 @@ const float face_shading[6] = float[6](
     0.5, 0.8   
 );
 
-const vec2 uv_coords[4] = vec2[4](
-    vec2(0, 0), vec2(0, 1),
-    vec2(1, 0), vec2(1, 1)
-);
-
-const int uv_indices[24] = int[24](
-    1, 0, 2, 1, 2, 3,  
-    3, 0, 2, 3, 1, 0,  
-    3, 1, 0, 3, 0, 2,  
-    1, 2, 3, 1, 0, 2   
-);
-
 // Functions
 /**
  * @brief
@@ -82,6 +74,24 @@ void unpack(uint packed_data) {
     flip_id = int(packed_data & g_mask);
 }
 
+/**
+ * @brief
+ * Gets the texture coordinates from the position on the face plane, so the
+ * texture repeats once per block on faces that span several blocks.
+ * @param position Position of the vertex.
+ * @return vec2 Texture coordinates, wrapped by the fragment shader.
+ */
+vec2 get_uv(vec3 position) {
+    switch (face_id) {
+        case 0: return vec2(position.x, -position.z);
+        case 1: return vec2(-position.x, -position.z);
+        case 2: return vec2(position.z, -position.y);
+        case 3: return vec2(-position.z, -position.y);
+        case 4: return vec2(position.x, -position.y);
+        default: return vec2(-position.x, -position.y);
+    }
+}
+
 /**
  * @brief
  * Main vertex shader function.
@@ -90,10 +100,9 @@ void main() {
     unpack(packed_data);
 
     vec3 in_position = vec3(x, y, z);
-    int uv_index = gl_VertexID % 6  + ((face_id & 1) + flip_id * 2) * 6;
 
-    uv = uv_coords[uv_indices[uv_index]];
+    uv = get_uv(in_position);
     shading = face_shading[face_id] * ao_values[ao_id];
 
-    gl_Position = m_proj * m_view * m_model * vec4(in_position, 1.0);
+    gl_Position = m_proj * m_view * m_model * vec4(in_position + chunk_origin, 1.0);
 }
@@ -0,0 +1,131 @@
+#version 330 core
+
+// Layouts for face data, one face record per instance
+layout (location = 0) in uvec2 packed_face;
+
+// Origin of the chunk, a vertex attribute repeated for the six vertices of a
+// face when the chunks are drawn from the arena and zero otherwise, with the
+// chunk moved by m_model instead
+layout (location = 1) in vec3 chunk_origin;
+
+// Global variables
+int x, y, z;
+int ao_ids[4];
+int flip_id;
+int size_a, size_b;
+
+// Uniforms
+uniform mat4 m_proj;
+uniform mat4 m_view;
+uniform mat4 m_model;
+
+// Flat outs
+flat out int block_id;
+flat out int face_id;
+
+// Outs
+out vec2 uv;
+out float shading;
+
+// Constants
+const float ao_values[4] = float[4](0.1, 0.25, 0.5, 1.0);
+const float face_shading[6] = float[6](
+    1.0, 0.5,
+    0.5, 0.8,
+    0.5, 0.8
+);
+
+// Face corner of each vertex of the two triangles, without and with the
+// triangles flipped, for the top, bottom, right and back, left and front faces
+const int corner_indices[48] = int[48](
+    0, 3, 2, 0, 2, 1, 1, 0, 3, 1, 3, 2,
+    0, 2, 3, 0, 1, 2, 1, 3, 0, 1, 2, 3,
+    0, 1, 2, 0, 2, 3, 3, 0, 1, 3, 1, 2,
+    0, 2, 1, 0, 3, 2, 3, 1, 0, 3, 2, 1
+);
+
+// Position of each face corner along the two axes of the face plane
+const ivec2 corner_offsets[4] = ivec2[4](
+    ivec2(0, 0), ivec2(1, 0),
+    ivec2(1, 1), ivec2(0, 1)
+);
+
+// Functions
+/**
+ * @brief
+ * Unpacks the face record into the global variables.
+ * @param packed_face Face record to unpack.
+ */
+void unpack(uvec2 packed_face) {
+    x = int(packed_face.x >> 26u);
+    y = int((packed_face.x >> 20u) & 63u);
+    z = int((packed_face.x >> 14u) & 63u);
+    block_id = int((packed_face.x >> 6u) & 255u);
+    face_id = int((packed_face.x >> 3u) & 7u);
+    flip_id = int(packed_face.x & 1u);
+
+    for (int i = 0; i < 4; i++) {
+        ao_ids[i] = int((packed_face.y >> uint(2 * i)) & 3u);
+    }
+
+    size_a = int((packed_face.y >> 8u) & 63u);
+    size_b = int((packed_face.y >> 14u) & 63u);
+}
+
+/**
+ * @brief
+ * Gets the position of a corner of the face.
+ * @param corner Corner of the face.
+ * @return vec3 Position of the corner.
+ */
+vec3 get_position(int corner) {
+    ivec2 offset = corner_offsets[corner] * ivec2(size_a, size_b);
+
+    if (face_id < 2) {
+        return vec3(x + offset.x, y + 1 - face_id, z + offset.y);
+    }
+
+    if (face_id < 4) {
+        return vec3(x + 3 - face_id, y + offset.x, z + offset.y);
+    }
+
+    return vec3(x + offset.y, y + offset.x, z + face_id - 4);
+}
+
+/**
+ * @brief
+ * Gets the texture coordinates from the position on the face plane, so the
+ * texture repeats once per block on faces that span several blocks.
+ * @param position Position of the vertex.
+ * @return vec2 Texture coordinates, wrapped by the fragment shader.
+ */
+vec2 get_uv(vec3 position) {
+    switch (face_id) {
+        case 0: return vec2(position.x, -position.z);
+        case 1: return vec2(-position.x, -position.z);
+        case 2: return vec2(position.z, -position.y);
+        case 3: return vec2(-position.z, -position.y);
+        case 4: return vec2(position.x, -position.y);
+        default: return vec2(-position.x, -position.y);
+    }
+}
+
+/**
+ * @brief
+ * Main vertex shader function. Each instance is a face, expanded into the six
+ * vertices of its two triangles. Draws from the arena start at the vertices of
+ * the chunk origin, six per chunk, so only the vertex within the face is kept.
+ */
+void main() {
+    unpack(packed_face);
+
+    int face_group = face_id < 2 ? face_id : 2 + (face_id & 1);
+    int corner = corner_indices[(face_group * 2 + flip_id) * 6 + gl_VertexID % 6];
+
+    vec3 in_position = get_position(corner);
+
+    uv = get_uv(in_position);
+    shading = face_shading[face_id] * ao_values[ao_ids[corner]];
+
+    gl_Position = m_proj * m_view * m_model * vec4(in_position + chunk_origin, 1.0);
+}
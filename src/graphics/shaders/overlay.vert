@@ -0,0 +1,23 @@
+#version 330 core
+
+// Input vertex data, the position in pixels from the top left corner of the
+// window and the texture coordinates
+layout(location = 0) in vec2 in_position;
+layout(location = 1) in vec2 in_tex_coord_0;
+
+// Uniforms
+uniform vec2 u_resolution;
+
+// Output data ; will be interpolated for each fragment.
+out vec2 uv;
+
+/**
+ * @brief
+ * Main entry point for the vertex shader.
+ */
+void main() {
+    uv = in_tex_coord_0;
+
+    vec2 position = in_position / u_resolution * 2.0 - 1.0;
+    gl_Position = vec4(position.x, -position.y, 0.0, 1.0);
+}
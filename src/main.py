@@ -1,8 +1,116 @@
+import argparse
+
+from core.constants.settings import (
+    BUILD_WORKERS,
+    CACHE_PATH,
+    CHUNK_FORMAT,
+    CHUNK_FORMATS,
+    CHUNK_MESHER,
+    CHUNK_RENDERER,
+    CHUNK_RENDERERS,
+    FPS_LIMIT,
+    HEADLESS_FRAMES,
+    MESHERS,
+    PROFILE_PATH,
+    PROFILER_OVERLAY,
+    RECORD_PATH,
+    REPLAY_PATH,
+    WORLD_PATH,
+)
 from core.engine.engine import Engine
 
 
 def main():
-    app = Engine()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=BUILD_WORKERS,
+        help="Number of worker threads used to build the world",
+    )
+    parser.add_argument(
+        "--mesher",
+        choices=MESHERS,
+        default=CHUNK_MESHER,
+        help="Mesher used to build the chunk meshes",
+    )
+    parser.add_argument(
+        "--chunk-format",
+        choices=CHUNK_FORMATS,
+        default=CHUNK_FORMAT,
+        help="Vertex format of the chunk meshes",
+    )
+    parser.add_argument(
+        "--renderer",
+        choices=CHUNK_RENDERERS,
+        default=CHUNK_RENDERER,
+        help="Renderer of the chunk meshes",
+    )
+    parser.add_argument(
+        "--world",
+        default=WORLD_PATH,
+        help="Folder the world is saved to and loaded from",
+    )
+    parser.add_argument(
+        "--cache",
+        default=CACHE_PATH,
+        help="Folder of the cache of the generated chunks and of their meshes",
+    )
+    parser.add_argument(
+        "--profile",
+        default=PROFILE_PATH,
+        help="CSV or JSON file the frame times are written to on exit",
+    )
+    parser.add_argument(
+        "--overlay",
+        action="store_true",
+        default=PROFILER_OVERLAY,
+        help="Show the frame time overlay, toggled with F3",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Render offscreen without a display and report the frame times",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=HEADLESS_FRAMES,
+        help="Number of frames rendered in headless mode",
+    )
+    parser.add_argument(
+        "--record",
+        default=RECORD_PATH,
+        help="Compressed numpy file the input of each frame is recorded to on exit",
+    )
+    parser.add_argument(
+        "--replay",
+        default=REPLAY_PATH,
+        help="Recorded input replayed with a fixed timestep, reporting the frame times",
+    )
+    parser.add_argument(
+        "--fps-limit",
+        type=int,
+        default=FPS_LIMIT,
+        help="Maximum frame rate, 0 to leave it uncapped",
+    )
+    args = parser.parse_args()
+
+    app = Engine(
+        workers=args.workers,
+        mesher=args.mesher,
+        chunk_format=args.chunk_format,
+        chunk_renderer=args.renderer,
+        world_path=args.world,
+        cache_path=args.cache,
+        profile_path=args.profile,
+        overlay=args.overlay,
+        headless=args.headless,
+        frames=args.frames,
+        record_path=args.record,
+        replay_path=args.replay,
+        fps_limit=args.fps_limit,
+    )
     app.run()
 
 
@@ -7,7 +7,7 @@
 """
 
 # Libraries
-import pygame as pg
+import glm
 
 # Project files
 from camera.camera import Camera
@@ -17,6 +17,12 @@ from core.constants.settings import (
     PITCH_MAX,
     MOUSE_SENSITIVITY,
 )
+from utils.input_recorder.input_recorder import (
+    KEY_BACKWARD,
+    KEY_FORWARD,
+    KEY_LEFT,
+    KEY_RIGHT,
+)
 
 
 class Player(Camera):
@@ -31,58 +37,80 @@ class Player(Camera):
         self.app = app
         super().__init__(position, yaw, pitch)
 
+        # Pose of the previous tick, and the camera rendered between the two ticks
+        self.previous_position = glm.vec3(self.position)
+        self.previous_yaw = self.yaw
+        self.previous_pitch = self.pitch
+        self.render_camera = Camera(position, yaw, pitch)
+
     def update(self) -> None:
         """
-        Update the player.
+        Update the player with the input of the tick, live or replayed.
         """
-        self.mouse_control()
-        self.keyboard_control()
+        self.set_previous_pose()
+
+        keys, mouse_delta = self.app.input.get_state()
+        self.mouse_control(mouse_delta)
+        self.keyboard_control(keys)
         super().update()
 
-    def keyboard_control(self) -> None:
+    def set_previous_pose(self) -> None:
+        """
+        Keep the current pose as the one the render camera moves from.
+        """
+        self.previous_position = glm.vec3(self.position)
+        self.previous_yaw = self.yaw
+        self.previous_pitch = self.pitch
+
+    def interpolate(self, alpha) -> None:
+        """
+        Move the render camera between the poses of the previous and the last tick.
+        :param alpha: The fraction of a tick since the last one, from 0 to 1.
+        """
+        camera = self.render_camera
+        camera.position = glm.mix(self.previous_position, self.position, alpha)
+        camera.yaw = self.previous_yaw + (self.yaw - self.previous_yaw) * alpha
+        camera.pitch = self.previous_pitch + (self.pitch - self.previous_pitch) * alpha
+        camera.update()
+
+    def keyboard_control(self, keys) -> None:
         """
         Control the player with the keyboard.
+        :param keys: The movement keys held, see KEY_FORWARD
         """
-        key_state = pg.key.get_pressed()
         velocity = PLAYER_SPEED * self.app.delta_time
 
-        if key_state[pg.K_w]:
+        if keys & KEY_FORWARD:
             self.move_forward(velocity)
 
-        if key_state[pg.K_s]:
+        if keys & KEY_BACKWARD:
             self.move_backward(velocity)
 
-        if key_state[pg.K_a]:
+        if keys & KEY_LEFT:
             self.move_left(velocity)
 
-        if key_state[pg.K_d]:
+        if keys & KEY_RIGHT:
             self.move_right(velocity)
 
-    def mouse_control(self) -> None:
+    def mouse_control(self, mouse_delta) -> None:
         """
         Control the player with the mouse.
+        :param mouse_delta: The mouse motion, in pixels
         """
-        mouse_delta = pg.mouse.get_rel()
-        mouse_delta = (
-            mouse_delta[0] * self.app.delta_time,
-            mouse_delta[1] * self.app.delta_time,
-        )
-
         self.yaw += mouse_delta[0] * MOUSE_SENSITIVITY
         self.pitch += mouse_delta[1] * MOUSE_SENSITIVITY
 
         self.pitch = max(min(self.pitch, PITCH_MAX), -PITCH_MAX)
 
-    def handle_events(self, event) -> None:
+    def handle_button(self, button) -> None:
         """
         Allows the user to add or remove blocks.
-        :param event: The event to be handled.
+        :param button: The mouse button pressed.
         """
-        if event.type == pg.MOUSEBUTTONDOWN:
-            block_handler = self.app.scene.world.block_handler
+        block_handler = self.app.scene.world.block_handler
 
-            if event.button == 1:
-                block_handler.set_block()
+        if button == 1:
+            block_handler.set_block()
 
-            elif event.button == 3:
-                block_handler.switch_mode()
+        elif button == 3:
+            block_handler.switch_mode()
@@ -6,19 +6,65 @@
 @date 2023-07-06
 """
 
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import glm
+import numba
 import numpy as np
 
 from core.constants.settings import (
     WORLD_VOLUME,
+    CHUNK_SIZE,
     CHUNK_VOLUME,
     WORLD_WIDTH,
     WORLD_HEIGHT,
     WORLD_DEPTH,
-    WORLD_AREA,
+    WORLD_STREAMING,
+    AUTOSAVE_INTERVAL,
+    COMPACT_DELAY,
+    LOD_DISTANCES,
+    LOD_HYSTERESIS,
+    OCCLUSION_CULLING,
+    RENDER_RADIUS,
+    REBUILD_BUDGET_MS,
+    STREAM_LOADS_PER_FRAME,
+    STREAM_MESHES_PER_FRAME,
 )
 
+from graphics.meshes.chunk_arena import ChunkArena
+from graphics.meshes.chunk_mesh import ChunkMesh, get_mesher
 from render.world_objects.chunk import Chunk
 from utils.block_handler.block_handler import BlockHandler
+from utils.chunk_cache.chunk_cache import ChunkCache
+from utils.chunk_storage.chunk_occupancy import FACES, get_hidden_chunks, get_occupancy
+from utils.chunk_storage.chunk_storage import get_block_memory, release_row
+from utils.chunk_storage.chunk_visibility import (
+    ALL_CONNECTIONS,
+    get_face_connections,
+    get_visible_chunks,
+)
+from utils.chunk_builder.chunk_mesh_builder import (
+    get_chunk_neighbors,
+    get_chunk_slot,
+    get_mesh_buffer,
+    get_padded_blocks,
+    get_padded_buffer,
+)
+from utils.chunk_builder.chunk_terrain_builder import (
+    build_chunk_blocks,
+    build_world_blocks,
+)
+from utils.chunk_builder.lod_mesh_builder import (
+    FACE_NEIGHBORS,
+    build_lod_chunk_mesh,
+    get_lod_blocks,
+)
+from utils.region_storage.region_storage import RegionStorage
+
+# Chunk position stored in the rows of the world blocks that hold no chunk
+UNLOADED_POSITION = np.iinfo(np.int64).min
 
 
 class World:
@@ -28,43 +74,686 @@ class World:
         """
         self.app = app
         self.chunks = [None for _ in range(WORLD_VOLUME)]
-        self.blocks = np.empty([WORLD_VOLUME, CHUNK_VOLUME], dtype=np.uint8)
+
+        # The world blocks live in anonymous memory, so the rows of compact chunks
+        # can be given back to the system
+        self.block_memory, self.blocks = get_block_memory(WORLD_VOLUME, CHUNK_VOLUME)
+        self.chunk_positions = np.full(
+            [WORLD_VOLUME, 3], UNLOADED_POSITION, dtype=np.int64
+        )
+
+        # Chunks whose blocks are compact, their row reads as air, and a version
+        # of the world blocks bumped whenever chunks are loaded, unloaded or edited
+        self.is_compact = np.zeros(WORLD_VOLUME, dtype=np.bool_)
+        self.block_version = 0
+
+        # Occupancy, the solid blocks of each chunk and of each of its faces, and
+        # the full chunks enclosed by full faces
+        self.solid_counts = np.zeros(WORLD_VOLUME, dtype=np.int64)
+        self.face_counts = np.zeros([WORLD_VOLUME, FACES], dtype=np.int64)
+        self.is_hidden = np.zeros(WORLD_VOLUME, dtype=np.bool_)
+
+        # Faces of each chunk joined through air, see get_face_connections, and the
+        # chunks whose blocks changed since they were last found
+        self.connections = np.zeros(WORLD_VOLUME, dtype=np.int64)
+        self.stale_connections = np.zeros(WORLD_VOLUME, dtype=np.bool_)
+
+        # Level of detail of each chunk, the mesh of level n is downsampled by 2^n
+        self.lods = np.zeros(WORLD_VOLUME, dtype=np.int64)
+
+        # Frustum culling, and the chunks on the frustum with nothing to draw
+        self.chunk_centers = np.zeros([WORLD_VOLUME, 3], dtype=np.float32)
+        self.visible_chunks = 0
+        self.culled_chunks = 0
+        self.skipped_chunks = 0
+        self.occluded_chunks = 0
+        self.draw_calls = 0
+        self.drawn_vertices = 0
+
+        # Streaming
+        self.origin = self.get_origin()
+        self.load_queue = deque()
+        self.mesh_queue = deque()
+
+        # Mesh rebuilds, the time each dirty chunk was queued and the metrics of
+        # the last frame, times in milliseconds
+        self.dirty_chunks = {}
+        self.rebuild_cost = 0.0
+        self.rebuild_time = 0.0
+        self.rebuild_latency = 0.0
+        self.rebuilt_chunks = 0
+        self.rebuild_queue_depth = 0
+
+        # Chunks with dense blocks and the last time each one was needed dense
+        self.expanded_chunks = {}
+
+        # Persistence, chunks changed since their last save are modified
+        self.storage = RegionStorage(app.world_path) if app.world_path else None
+        self.save_time = time.perf_counter()
+
+        # Cache of the generated blocks and of the meshes
+        self.cache = None
+
+        if app.cache_path:
+            self.cache = ChunkCache(app.cache_path, app.mesher, app.chunk_format)
+
+        # Arena the chunk meshes are drawn from, indirect draws need OpenGL 4.3
+        self.arena = None
+
+        if app.chunk_renderer == "arena" and app.ctx.version_code >= 430:
+            self.arena = ChunkArena(app)
+
         self.build_chunks()
+        self.update_lods()
         self.build_chunk_mesh()
+        self.compact_chunks(force=True)
+        self.compile_kernels()
 
         self.block_handler = BlockHandler(self)
 
+    def compile_kernels(self) -> None:
+        """
+        Compiles the terrain, meshing and occlusion kernels before the first tick,
+        with a call on the first chunk each. Streamed chunks are generated one at
+        a time, and the meshers have not run yet if the meshes came from the cache
+        or no chunk is at a lower level of detail. The kernels are not cached on
+        disk, see get_chunk_index.
+        """
+        chunk = self.chunks[0]
+        build_chunk_blocks(np.empty(CHUNK_VOLUME, dtype=np.uint8), chunk.position)
+
+        per_face = self.app.chunk_format == "face"
+        format_size = 2 if per_face else 1
+
+        padded_blocks = get_padded_blocks(
+            chunk.position, self.blocks, self.chunk_positions, get_padded_buffer()
+        )
+        get_mesher(self.app.mesher)(
+            padded_blocks=padded_blocks,
+            format_size=format_size,
+            vertex_data=get_mesh_buffer(format_size),
+            per_face=per_face,
+        )
+
+        if LOD_DISTANCES:
+            build_lod_chunk_mesh(
+                lod_blocks=get_lod_blocks(
+                    chunk.position, self.blocks, self.chunk_positions, 2
+                ),
+                scale=2,
+                format_size=format_size,
+                vertex_data=get_mesh_buffer(format_size),
+                per_face=per_face,
+            )
+
+        if OCCLUSION_CULLING:
+            get_visible_chunks(
+                self.chunk_positions,
+                self.connections,
+                np.zeros(WORLD_VOLUME, dtype=np.bool_),
+                np.zeros(3, dtype=np.float64),
+            )
+
+    def get_origin(self) -> tuple:
+        """
+        Gets the chunk position of the corner of the loaded area. The area follows
+        the player on a streaming world and stays at the origin otherwise.
+        :return: The x and z chunk positions of the corner
+        """
+        if not WORLD_STREAMING:
+            return 0, 0
+
+        position = self.app.player.position
+
+        return (
+            int(position.x // CHUNK_SIZE) - RENDER_RADIUS - 1,
+            int(position.z // CHUNK_SIZE) - RENDER_RADIUS - 1,
+        )
+
+    def get_area_positions(self) -> list:
+        """
+        Gets the positions of the chunks in the loaded area
+        :return: The chunk positions
+        """
+        ox, oz = self.origin
+
+        return [
+            (ox + x, y, oz + z)
+            for x in range(WORLD_WIDTH)
+            for y in range(WORLD_HEIGHT)
+            for z in range(WORLD_DEPTH)
+        ]
+
+    def get_distance(self, chunk) -> int:
+        """
+        Gets the distance, in chunks, from the given chunk to the center of the
+        loaded area
+        :param chunk: The chunk
+        :return: The distance
+        """
+        ox, oz = self.origin
+        x, _, z = chunk.position
+
+        return max(abs(x - ox - RENDER_RADIUS - 1), abs(z - oz - RENDER_RADIUS - 1))
+
+    def is_in_render_range(self, chunk) -> bool:
+        """
+        Checks if the given chunk should have a mesh
+        :param chunk: The chunk
+        :return: True if the chunk is within the render radius
+        """
+        return not WORLD_STREAMING or self.get_distance(chunk) <= RENDER_RADIUS
+
     def build_chunks(self) -> None:
         """
         Builds the chunks in the world
         """
-        for x in range(WORLD_WIDTH):
-            for y in range(WORLD_HEIGHT):
-                for z in range(WORLD_DEPTH):
-                    chunk = Chunk(self, position=(x, y, z))
-                    chunk_index = x + WORLD_WIDTH * z + WORLD_AREA * y
-                    self.chunks[chunk_index] = chunk
+        for position in self.get_area_positions():
+            chunk = Chunk(self, position=position)
+            self.chunks[chunk.index] = chunk
+            self.chunk_positions[chunk.index] = position
+            self.chunk_centers[chunk.index] = chunk.center
+
+        # Saved chunk blocks, loaded from their region files, then the ones in the
+        # cache
+        is_loaded = np.zeros(WORLD_VOLUME, dtype=np.bool_)
+
+        if self.storage is not None:
+            is_loaded = self.storage.load_chunks(self.blocks, self.chunk_positions)
+
+        if self.cache is not None:
+            for chunk_index in np.flatnonzero(~is_loaded):
+                is_loaded[chunk_index] = self.cache.load_blocks(
+                    self.chunk_positions[chunk_index], self.blocks[chunk_index]
+                )
+
+        # Other chunk blocks, generated in a single parallel batch
+        numba.set_num_threads(min(self.app.workers, numba.config.NUMBA_NUM_THREADS))
+        # The emptiness flags are left unused, the blocks are counted below
+        missing = np.flatnonzero(~is_loaded)
+        is_empty = np.empty(len(missing), dtype=np.bool_)
+
+        if len(missing) == WORLD_VOLUME:
+            build_world_blocks(self.blocks, self.chunk_positions, is_empty)
+
+        elif len(missing):
+            blocks = np.empty([len(missing), CHUNK_VOLUME], dtype=np.uint8)
+            build_world_blocks(blocks, self.chunk_positions[missing], is_empty)
+            self.blocks[missing] = blocks
+
+        if self.cache is not None:
+            for chunk_index in missing:
+                self.cache.save_blocks(
+                    self.chunk_positions[chunk_index], self.blocks[chunk_index]
+                )
+
+        for chunk in self.chunks:
+            chunk.blocks = self.blocks[chunk.index]
+            self.count_blocks(chunk.index)
+            self.expanded_chunks[chunk] = time.perf_counter()
+
+        self.update_hidden_chunks()
+
+    def count_blocks(self, chunk_index) -> None:
+        """
+        Counts the solid blocks of the given chunk, once its blocks are built.
+        Block edits keep the counts up to date afterwards.
+        :param chunk_index: The chunk index
+        """
+        solid_count, face_counts = get_occupancy(self.blocks[chunk_index])
+        self.solid_counts[chunk_index] = solid_count
+        self.face_counts[chunk_index] = face_counts
+        self.invalidate_connections([chunk_index])
+        self.block_version += 1
 
-                    # Chunk blocks
-                    self.blocks[chunk_index] = chunk.build_blocks()
-                    chunk.blocks = self.blocks[chunk_index]
+    def invalidate_connections(self, chunk_indices) -> None:
+        """
+        Marks the faces of the given chunks as all joined through air, after their
+        blocks were built or edited, until the chunks are meshed and the faces
+        found again, see update_connections. Nothing behind them is culled in
+        between.
+        :param chunk_indices: The chunk indices
+        """
+        for chunk_index in chunk_indices:
+            self.connections[chunk_index] = ALL_CONNECTIONS
+            self.stale_connections[chunk_index] = True
+
+    def update_connections(self, chunk_index) -> None:
+        """
+        Finds the faces of the given chunk joined through air, when it is meshed
+        and its blocks changed since they were last found. Empty and full chunks
+        are not flood filled.
+        :param chunk_index: The chunk index
+        """
+        if not self.stale_connections[chunk_index]:
+            return
+
+        self.stale_connections[chunk_index] = False
+        solid_count = self.solid_counts[chunk_index]
+
+        if not solid_count:
+            self.connections[chunk_index] = ALL_CONNECTIONS
+
+        elif solid_count == CHUNK_VOLUME:
+            self.connections[chunk_index] = 0
+
+        else:
+            self.connections[chunk_index] = get_face_connections(
+                self.blocks[chunk_index]
+            )
+
+    def update_hidden_chunks(self) -> None:
+        """
+        Finds the full chunks enclosed by full faces again, after chunks were
+        built, edited or unloaded
+        """
+        self.is_hidden = get_hidden_chunks(
+            self.chunk_positions, self.solid_counts, self.face_counts
+        )
+
+    def update_lods(self) -> None:
+        """
+        Updates the level of detail of each chunk from its distance to the player
+        and queues the rebuild of the chunks whose level changed.
+        """
+        position = np.array(self.app.player.position, dtype=np.float32)
+        distances = np.linalg.norm(self.chunk_centers - position, axis=1) / CHUNK_SIZE
+
+        # The level is raised once past a distance and lowered once back before it
+        thresholds = np.array(LOD_DISTANCES)
+        lowest = np.count_nonzero(distances[:, None] > thresholds + LOD_HYSTERESIS, 1)
+        highest = np.count_nonzero(distances[:, None] > thresholds - LOD_HYSTERESIS, 1)
+        lods = np.clip(self.lods, lowest, highest)
+
+        changed = np.flatnonzero(lods != self.lods)
+
+        if not len(changed):
+            return
+
+        self.lods = lods
+
+        # The faces of a chunk against a neighbor at another level are built, so
+        # the neighbors of the chunks whose level changed are rebuilt as well
+        for chunk_index in changed:
+            self.queue_rebuild(self.chunks[chunk_index])
+
+            chunk_neighbors = get_chunk_neighbors(
+                self.chunks[chunk_index].position, self.chunk_positions
+            )
+
+            for neighbor_index in chunk_neighbors[list(FACE_NEIGHBORS)]:
+                if neighbor_index != -1:
+                    self.queue_rebuild(self.chunks[neighbor_index])
+
+    def get_lod_faces(self, chunk) -> list:
+        """
+        Gets the faces of the given chunk against neighbors at another level of
+        detail. The chunk builds all its border faces on them, so no gap opens
+        between the meshes of both levels
+        :param chunk: The chunk
+        :return: The face ids
+        """
+        chunk_neighbors = get_chunk_neighbors(chunk.position, self.chunk_positions)
+        lod = self.lods[chunk.index]
+
+        return [
+            face_id
+            for face_id, neighbor in enumerate(FACE_NEIGHBORS)
+            if chunk_neighbors[neighbor] != -1
+            and self.lods[chunk_neighbors[neighbor]] != lod
+        ]
 
     def build_chunk_mesh(self) -> None:
         """
-        Builds the mesh for each chunk
+        Builds the mesh for each chunk. The vertex data is built on a pool of
+        worker threads, only the upload to the GPU happens on this thread.
+        """
+        chunks = [chunk for chunk in self.chunks if self.is_in_render_range(chunk)]
+
+        if self.app.workers == 1:
+            for chunk in chunks:
+                chunk.build_mesh()
+
+            return
+
+        for chunk in chunks:
+            chunk.mesh = ChunkMesh(chunk, build=False)
+
+        with ThreadPoolExecutor(max_workers=self.app.workers) as executor:
+            vertex_data = executor.map(self.get_vertex_data, chunks)
+
+            for chunk, chunk_vertex_data in zip(chunks, vertex_data):
+                chunk.mesh.vao = chunk.mesh.get_vao(chunk_vertex_data)
+
+    def get_vertex_data(self, chunk) -> np.array:
+        """
+        Gets the vertex data of the mesh of the given chunk, from the cache if the
+        chunk was meshed before with the same blocks and surroundings
+        :param chunk: The chunk
+        :return: The vertex data
+        """
+        self.update_connections(chunk.index)
+
+        if self.cache is None or chunk.is_empty or chunk.is_hidden:
+            return chunk.mesh.get_vertex_data()
+
+        padded_blocks = chunk.mesh.get_padded_blocks()
+        key = self.cache.get_mesh_key(padded_blocks, chunk.lod)
+        vertex_data = self.cache.load_mesh(key)
+
+        if vertex_data is None:
+            vertex_data = chunk.mesh.get_vertex_data(padded_blocks)
+            self.cache.save_mesh(key, vertex_data)
+
+        return vertex_data
+
+    def stream_chunks(self) -> None:
+        """
+        Moves the loaded area with the player, then loads and meshes the queued
+        chunks within the per frame budget
+        """
+        origin = self.get_origin()
+
+        if origin != self.origin:
+            self.origin = origin
+            self.queue_chunks()
+
+        self.load_chunks()
+        self.mesh_chunks()
+
+    def queue_chunks(self) -> None:
+        """
+        Replaces the chunks that left the loaded area with the ones that entered
+        it, and queues the chunks to load and mesh, nearest first
+        """
+        for position in self.get_area_positions():
+            index = get_chunk_slot(position)
+            chunk = self.chunks[index]
+
+            if chunk.position != position:
+                self.save_chunks([chunk])
+                self.expanded_chunks.pop(chunk, None)
+                chunk.release_mesh()
+                chunk = self.chunks[index] = Chunk(self, position=position)
+                self.chunk_positions[index] = UNLOADED_POSITION
+                self.solid_counts[index] = 0
+                self.face_counts[index] = 0
+                self.connections[index] = 0
+                self.stale_connections[index] = False
+                self.is_compact[index] = False
+                self.chunk_centers[index] = chunk.center
+                self.block_version += 1
+
+            if not self.is_in_render_range(chunk):
+                chunk.release_mesh()
+
+        self.update_hidden_chunks()
+
+        self.load_queue = deque(
+            sorted(
+                (chunk for chunk in self.chunks if chunk.blocks is None),
+                key=self.get_distance,
+            )
+        )
+
+        self.mesh_queue = deque(
+            sorted(
+                (
+                    chunk
+                    for chunk in self.chunks
+                    if chunk.mesh is None and self.is_in_render_range(chunk)
+                ),
+                key=self.get_distance,
+            )
+        )
+
+    def load_chunks(self) -> None:
+        """
+        Builds the blocks of the nearest queued chunks
+        """
+        if not self.load_queue:
+            return
+
+        for _ in range(min(STREAM_LOADS_PER_FRAME, len(self.load_queue))):
+            chunk = self.load_queue.popleft()
+            chunk.build_blocks()
+            self.chunk_positions[chunk.index] = chunk.position
+            self.count_blocks(chunk.index)
+            self.expanded_chunks[chunk] = time.perf_counter()
+
+        self.update_hidden_chunks()
+
+    def mesh_chunks(self) -> None:
+        """
+        Builds the mesh of the nearest queued chunks. Chunks are loaded nearest
+        first, so a chunk is ready once every chunk up to one step further than
+        it has been loaded.
+        """
+        if self.load_queue:
+            loaded_distance = self.get_distance(self.load_queue[0])
+
+        else:
+            loaded_distance = WORLD_WIDTH
+
+        for _ in range(STREAM_MESHES_PER_FRAME):
+            if not self.mesh_queue:
+                break
+
+            if self.get_distance(self.mesh_queue[0]) + 1 >= loaded_distance:
+                break
+
+            self.mesh_queue.popleft().build_mesh()
+
+    def queue_rebuild(self, chunk) -> None:
+        """
+        Marks the mesh of the given chunk to be rebuilt. A chunk queued several
+        times is rebuilt once. Chunks on the border of a streaming world have no
+        mesh yet and are skipped.
+        :param chunk: The chunk
+        """
+        if chunk.mesh is not None and chunk not in self.dirty_chunks:
+            self.dirty_chunks[chunk] = time.perf_counter()
+
+    def rebuild_chunks(self) -> None:
+        """
+        Rebuilds the meshes of the dirty chunks nearest the player first, as many
+        as fit in the per frame budget, and updates the rebuild metrics
+        """
+        start = time.perf_counter()
+        self.rebuild_latency = 0.0
+        self.rebuilt_chunks = 0
+
+        position = self.app.player.position
+        queue = sorted(
+            self.dirty_chunks, key=lambda chunk: glm.distance2(chunk.center, position)
+        )
+
+        for chunk in queue:
+            elapsed = (time.perf_counter() - start) * 1000
+
+            if self.rebuilt_chunks and elapsed + self.rebuild_cost > REBUILD_BUDGET_MS:
+                break
+
+            queued_time = self.dirty_chunks.pop(chunk)
+
+            # The mesh is released if the chunk left the render range
+            if chunk.mesh is None:
+                continue
+
+            rebuild_start = time.perf_counter()
+            self.expand_neighborhood(chunk)
+            self.update_connections(chunk.index)
+            chunk.mesh.rebuild()
+            end = time.perf_counter()
+
+            # Moving average of the cost of a rebuild, to know if another one fits
+            cost = (end - rebuild_start) * 1000
+            if self.rebuild_cost:
+                cost = 0.8 * self.rebuild_cost + 0.2 * cost
+
+            self.rebuild_cost = cost
+
+            self.rebuild_latency = max(self.rebuild_latency, (end - queued_time) * 1000)
+            self.rebuilt_chunks += 1
+
+        self.rebuild_time = (time.perf_counter() - start) * 1000
+        self.rebuild_queue_depth = len(self.dirty_chunks)
+
+    def release_blocks(self, chunk_index) -> None:
+        """
+        Gives the memory of the given row of the world blocks back to the system.
+        The row reads as air afterwards.
+        :param chunk_index: The chunk index
+        """
+        release_row(self.block_memory, self.blocks, chunk_index)
+
+    def expand_chunks(self, chunk_indices) -> None:
+        """
+        Makes the blocks of the given chunks dense, for the code that reads the
+        world blocks directly, the meshers and the block edits
+        :param chunk_indices: The chunk indices
+        """
+        now = time.perf_counter()
+
+        for chunk_index in chunk_indices:
+            chunk = self.chunks[chunk_index]
+            chunk.expand()
+
+            # Reinserted so the chunks stay in the order they were last needed
+            self.expanded_chunks.pop(chunk, None)
+            self.expanded_chunks[chunk] = now
+
+    def expand_neighborhood(self, chunk) -> None:
+        """
+        Makes the blocks of the given chunk and of its loaded neighbors dense,
+        everything the meshers read to mesh the chunk
+        :param chunk: The chunk
         """
+        chunk_neighbors = get_chunk_neighbors(chunk.position, self.chunk_positions)
+        self.expand_chunks(chunk_neighbors[chunk_neighbors != -1])
+
+    def compact_chunks(self, force=False) -> None:
+        """
+        Compacts the chunks that have not been needed dense for a while. Chunks
+        waiting for a rebuild are kept dense.
+        :param force: Whether to compact every chunk right away
+        """
+        now = time.perf_counter()
+
+        for chunk, expanded_time in list(self.expanded_chunks.items()):
+            if not force and now - expanded_time < COMPACT_DELAY:
+                break
+
+            if chunk in self.dirty_chunks:
+                continue
+
+            del self.expanded_chunks[chunk]
+            chunk.compact()
+
+    def save_chunks(self, chunks) -> None:
+        """
+        Saves the modified chunks among the given ones in the background. Only
+        the copy of their blocks happens on this thread.
+        :param chunks: The chunks
+        """
+        if self.storage is None:
+            return
+
+        modified_chunks = [chunk for chunk in chunks if chunk.is_modified]
+
+        for chunk in modified_chunks:
+            chunk.is_modified = False
+
+        self.storage.save_chunks(
+            [(chunk.position, chunk.copy_blocks()) for chunk in modified_chunks]
+        )
+
+    def save(self) -> None:
+        """
+        Saves the chunks modified since the last save
+        """
+        self.save_chunks(self.chunks)
+        self.save_time = time.perf_counter()
+
+    def close(self) -> None:
+        """
+        Saves the modified chunks, waits for every save to be written and
+        releases the GPU buffers of the chunk meshes and of the arena
+        """
+        if self.storage is not None:
+            self.save()
+            self.storage.close()
+
         for chunk in self.chunks:
-            chunk.build_mesh()
+            chunk.release_mesh()
+
+        if self.arena is not None:
+            self.arena.release()
 
     def update(self) -> None:
         """
         Updates the world
         """
-        self.block_handler.update()
+        if WORLD_STREAMING:
+            self.stream_chunks()
+
+        self.update_lods()
+
+        with self.app.profiler.scope("remesh"):
+            self.rebuild_chunks()
+
+        if time.perf_counter() - self.save_time > AUTOSAVE_INTERVAL:
+            self.save()
+
+        self.compact_chunks()
+
+        with self.app.profiler.scope("raycast"):
+            self.block_handler.update()
 
     def render(self) -> None:
         """
-        Renders the world
+        Renders the chunks on the frustum the camera can see through air, with a
+        single draw from the arena or a draw per chunk
         """
-        for chunk in self.chunks:
-            chunk.render()
+        camera = self.app.player.render_camera
+        on_frustum = camera.frustum.get_on_frustum(self.chunk_centers)
+
+        self.visible_chunks = int(np.count_nonzero(on_frustum))
+        self.culled_chunks = WORLD_VOLUME - self.visible_chunks
+
+        # Chunks behind terrain, with no path of air to the camera
+        if OCCLUSION_CULLING:
+            on_frustum &= get_visible_chunks(
+                self.chunk_positions,
+                self.connections,
+                on_frustum,
+                np.array(camera.position, dtype=np.float64),
+            )
+            self.occluded_chunks = self.visible_chunks - int(
+                np.count_nonzero(on_frustum)
+            )
+
+        # Empty chunks and enclosed full chunks have no face to draw
+        on_frustum &= (self.solid_counts > 0) & ~self.is_hidden
+        self.skipped_chunks = (
+            self.visible_chunks
+            - self.occluded_chunks
+            - int(np.count_nonzero(on_frustum))
+        )
+
+        if self.arena is not None:
+            self.draw_calls = int(self.arena.render(np.flatnonzero(on_frustum)) > 0)
+            self.drawn_vertices = self.arena.drawn_vertices
+            return
+
+        self.draw_calls = 0
+        self.drawn_vertices = 0
+
+        for chunk_index in np.flatnonzero(on_frustum):
+            chunk = self.chunks[chunk_index]
+
+            if chunk.render():
+                self.draw_calls += 1
+                self.drawn_vertices += (
+                    chunk.mesh.vao.vertices * chunk.mesh.vao.instances
+                )
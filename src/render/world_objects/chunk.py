@@ -10,11 +10,19 @@
 # Libraries
 import numpy as np
 import glm
-import random
 
 # Project files
-from core.constants.settings import CHUNK_VOLUME, CHUNK_SIZE, CHUNK_AREA
+from core.constants.settings import CHUNK_SIZE
 from graphics.meshes.chunk_mesh import ChunkMesh
+from utils.chunk_builder.chunk_mesh_builder import get_chunk_slot
+from utils.chunk_builder.chunk_terrain_builder import build_chunk_blocks
+from utils.chunk_storage.chunk_storage import (
+    get_index_bits,
+    get_packed_block,
+    get_palette,
+    pack_blocks,
+    unpack_blocks,
+)
 
 
 class Chunk:
@@ -27,14 +35,44 @@ class Chunk:
         self.app = world.app
         self.world = world
         self.position = position
+        self.index = get_chunk_slot(position)
         self.m_model = self.get_model_matrix()
         self.blocks: np.array = None
         self.mesh: ChunkMesh = None
-        self.is_empty = True
+        self.is_modified = False
+
+        # Compact storage, the blocks of chunks with few block ids are kept as
+        # palette indices and their row of the world blocks is released
+        self.palette: np.array = None
+        self.packed_blocks: np.array = None
 
         # Frustum culling
         self.center = (glm.vec3(self.position) + 0.5) * CHUNK_SIZE
-        self.is_on_frustum = self.app.player.frustum.is_on_frustum
+
+    @property
+    def is_empty(self) -> bool:
+        """
+        Checks if the chunk has no solid blocks, from the counts of the world
+        :return: True if the chunk is empty
+        """
+        return self.world.solid_counts[self.index] == 0
+
+    @property
+    def is_hidden(self) -> bool:
+        """
+        Checks if the chunk is full and enclosed by full faces, so none of its
+        faces is visible
+        :return: True if the chunk is hidden
+        """
+        return self.world.is_hidden[self.index]
+
+    @property
+    def lod(self) -> int:
+        """
+        Gets the level of detail of the chunk, from the levels of the world
+        :return: The level of detail, 0 for full detail
+        """
+        return int(self.world.lods[self.index])
 
     def get_model_matrix(self) -> glm.mat4:
         """
@@ -53,37 +91,124 @@ class Chunk:
         """
         Builds the mesh for the chunk
         """
-        self.mesh = ChunkMesh(self)
+        self.world.expand_neighborhood(self)
+        self.mesh = ChunkMesh(self, build=False)
+        self.mesh.vao = self.mesh.get_vao(self.world.get_vertex_data(self))
+
+    def release_mesh(self) -> None:
+        """
+        Releases the mesh of the chunk and its GPU buffers
+        """
+        if self.mesh is not None:
+            self.mesh.release()
+            self.mesh = None
 
     def build_blocks(self) -> np.array:
         """
-        Builds the blocks for the chunk
+        Builds the blocks for the chunk in its row of the world blocks, loading
+        them if the chunk was saved or cached and generating them otherwise
+        """
+        self.blocks = self.world.blocks[self.index]
+        storage = self.world.storage
+        cache = self.world.cache
+
+        is_loaded = storage is not None and storage.load_chunk(
+            self.position, self.blocks
+        )
+
+        if not is_loaded and cache is not None:
+            is_loaded = cache.load_blocks(self.position, self.blocks)
+
+        if not is_loaded:
+            build_chunk_blocks(self.blocks, self.position)
+
+            if cache is not None:
+                cache.save_blocks(self.position, self.blocks)
+
+        return self.blocks
+
+    def is_compact(self) -> bool:
+        """
+        Checks if the blocks of the chunk are in compact storage
+        :return: True if the blocks are compact
+        """
+        return self.palette is not None
+
+    def compact(self) -> bool:
+        """
+        Packs the blocks of the chunk and releases its row of the world blocks.
+        Chunks with too many block ids stay dense.
+        :return: True if the chunk is compact
+        """
+        if self.is_compact():
+            return True
+
+        # The row belongs to another chunk once this one left the loaded area
+        if self.blocks is None or self.world.chunks[self.index] is not self:
+            return False
+
+        palette = get_palette(self.blocks)
+
+        if get_index_bits(palette) is None:
+            return False
+
+        self.packed_blocks = pack_blocks(self.blocks, palette)
+        self.palette = palette
+        self.world.release_blocks(self.index)
+        self.world.is_compact[self.index] = True
+
+        return True
+
+    def expand(self) -> None:
+        """
+        Unpacks the blocks of the chunk back into its row of the world blocks
         """
-        blocks = np.zeros(CHUNK_VOLUME, dtype=np.uint8)
-        cx, cy, cz = glm.ivec3(self.position) * CHUNK_SIZE
+        if not self.is_compact():
+            return
+
+        # Released rows read as air already
+        if len(self.palette) > 1 or self.palette[0]:
+            unpack_blocks(self.packed_blocks, self.palette, self.blocks)
 
-        for x in range(CHUNK_SIZE):
-            wx = x + cx
+        self.palette = None
+        self.packed_blocks = None
+        self.world.is_compact[self.index] = False
+
+    def get_block(self, block_index) -> int:
+        """
+        Gets a block of the chunk, compact or not
+        :param block_index: The block index
+        :return: The block id
+        """
+        if self.is_compact():
+            return get_packed_block(self.packed_blocks, self.palette, block_index)
 
-            for z in range(CHUNK_SIZE):
-                wz = z + cz
+        return self.blocks[block_index]
 
-                world_height = int(glm.simplex(glm.vec2(wx, wz) * 0.01) * 32 + 32)
-                local_height = min(world_height - cy, CHUNK_SIZE)
+    def copy_blocks(self) -> np.array:
+        """
+        Copies the blocks of the chunk, compact or not
+        :return: The dense copy of the blocks
+        """
+        blocks = np.empty_like(self.blocks)
 
-                for y in range(local_height):
-                    wy = y + cy
-                    blocks[x + CHUNK_SIZE * z + CHUNK_AREA * y] = wy + 2
+        if self.is_compact():
+            unpack_blocks(self.packed_blocks, self.palette, blocks)
 
-        if np.any(blocks):
-            self.is_empty = False
+        else:
+            blocks[:] = self.blocks
 
         return blocks
 
-    def render(self) -> None:
+    def render(self) -> bool:
         """
         Renders the chunk
+        :return: True if the chunk was drawn
         """
-        if not self.is_empty:
-            self.set_uniform()
-            self.mesh.render()
+        if self.is_empty or self.mesh is None or self.mesh.vao is None:
+            return False
+
+        self.set_uniform()
+        self.mesh.render()
+
+        return True
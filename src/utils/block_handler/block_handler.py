@@ -8,18 +8,26 @@
 
 # Imports
 import glm
+import numpy as np
 
 # Project files
 from core.constants.settings import (
     MAX_RAY_DISTANCE,
     CHUNK_SIZE,
     CHUNK_AREA,
-    WORLD_WIDTH,
-    WORLD_HEIGHT,
-    WORLD_DEPTH,
-    WORLD_AREA,
 )
 
+from utils.block_handler.region_edit import (
+    fill_region,
+    get_region_chunks,
+    get_sphere_mask,
+)
+from utils.block_handler.voxel_raycast import (
+    RAY_COMPACT,
+    RAY_RESULT_SIZE,
+    cast_ray,
+    cast_rays,
+)
 from utils.chunk_builder.chunk_mesh_builder import get_chunk_index
 
 
@@ -30,6 +38,7 @@ class BlockHandler:
         :param world: The world to be handled.
         """
         self.app = world.app
+        self.world = world
         self.chunks = world.chunks
 
         # Raycast
@@ -40,25 +49,54 @@ class BlockHandler:
         self.block_world_position = None
         self.block_normal = None
 
+        # Camera ray, its result, and the camera pose and world block version it
+        # was cast with
+        self.ray_origin = np.zeros(3, dtype=np.float64)
+        self.ray_direction = np.zeros(3, dtype=np.float64)
+        self.ray_result = np.zeros(RAY_RESULT_SIZE, dtype=np.int64)
+        self.ray_key = None
+
         self.interaction_mode = 0
         self.new_block_id = 1
 
+        self.compile_kernels()
+
+    def compile_kernels(self) -> None:
+        """
+        Compiles the raycast kernels before the first tick, with a single ray and
+        a batch of one ray of no direction, which read no block. They are not
+        cached on disk, see get_chunk_index.
+        """
+        cast_ray(
+            self.ray_origin,
+            self.ray_direction,
+            MAX_RAY_DISTANCE,
+            self.world.blocks,
+            self.world.chunk_positions,
+            self.world.is_compact,
+            self.world.solid_counts,
+            self.ray_result,
+        )
+        self.cast_rays(np.zeros([1, 3]), np.zeros([1, 3]))
+
     def get_block_id(self, position) -> tuple:
         """
         Gets the block id at the given position.
         :param position: The position to get the block id from.
         :return: The block id at the given position. If the position is out of bounds, returns 0.
         """
-        cx, cy, cz = chunk_position = position / CHUNK_SIZE
+        wx, wy, wz = position
+        chunk_index = get_chunk_index((wx, wy, wz), self.world.chunk_positions)
 
-        if 0 <= cx < WORLD_WIDTH and 0 <= cy < WORLD_HEIGHT and 0 <= cz < WORLD_DEPTH:
-            chunk_index = cx + WORLD_WIDTH * cz + WORLD_AREA * cy
+        if chunk_index != -1:
             chunk = self.chunks[chunk_index]
 
-            lx, ly, lz = position = position - chunk_position * CHUNK_SIZE
+            lx, ly, lz = position = glm.ivec3(
+                wx % CHUNK_SIZE, wy % CHUNK_SIZE, wz % CHUNK_SIZE
+            )
 
             block_index = lx + CHUNK_SIZE * lz + CHUNK_AREA * ly
-            block_id = chunk.blocks[block_index]
+            block_id = chunk.get_block(block_index)
 
             return block_id, block_index, position, chunk
 
@@ -69,15 +107,10 @@ class BlockHandler:
         Adds a voxel to the world.
         """
         if self.block_id:
-            result = self.get_block_id(self.block_world_position + self.block_normal)
-
-            if not result[0]:
-                _, block_index, _, chunk = result
-                chunk.blocks[block_index] = self.new_block_id
-                chunk.mesh.rebuild()
+            position = self.block_world_position + self.block_normal
 
-                if chunk.is_empty:
-                    chunk.is_empty = False
+            if not self.get_block_id(position)[0]:
+                self.fill_box(position, (1, 1, 1), self.new_block_id)
 
     def set_block(self) -> None:
         """
@@ -100,124 +133,148 @@ class BlockHandler:
         Removes a voxel from the world.
         """
         if self.block_id:
-            self.chunk.blocks[self.block_index] = 0
+            self.fill_box(self.block_world_position, (1, 1, 1), 0)
 
-            self.chunk.mesh.rebuild()
-            self.rebuild_adjacent_chunks()
-
-    def rebuild_adjacent_chunks(self) -> None:
+    def fill_mask(self, origin, mask, block_id) -> None:
         """
-        Rebuilds the adjacent chunks.
+        Sets the blocks of the given mask, then queues each chunk that sees the
+        change, the changed ones and their neighbors, to be remeshed once.
+        :param origin: The world position of the first block of the mask.
+        :param mask: The blocks to set, a boolean array indexed by x, y and z.
+        :param block_id: The block id, 0 clears the blocks.
         """
-        lx, ly, lz = self.block_local_position
-        wx, wy, wz = self.block_world_position
-
-        if lx == 0:
-            self.rebuild_adjacent_chunk((wx - 1, wy, wz))
-
-        elif lx == CHUNK_SIZE - 1:
-            self.rebuild_adjacent_chunk((wx + 1, wy, wz))
+        last = np.asarray(origin, dtype=np.int64) + mask.shape - 1
+        self.world.expand_chunks(
+            get_region_chunks(self.world.chunk_positions, origin, last)
+        )
 
-        if ly == 0:
-            self.rebuild_adjacent_chunk((wx, wy - 1, wz))
+        changed_chunks, dirty_chunks = fill_region(
+            self.world.blocks,
+            self.world.chunk_positions,
+            self.world.solid_counts,
+            self.world.face_counts,
+            origin,
+            mask,
+            block_id,
+        )
 
-        elif ly == CHUNK_SIZE - 1:
-            self.rebuild_adjacent_chunk((wx, wy + 1, wz))
+        for chunk_index in changed_chunks:
+            self.chunks[chunk_index].is_modified = True
 
-        if lz == 0:
-            self.rebuild_adjacent_chunk((wx, wy, wz - 1))
+        if changed_chunks:
+            self.world.block_version += 1
+            self.world.update_hidden_chunks()
+            self.world.invalidate_connections(changed_chunks)
 
-        elif lz == CHUNK_SIZE - 1:
-            self.rebuild_adjacent_chunk((wx, wy, wz + 1))
+        for chunk_index in dirty_chunks:
+            self.world.queue_rebuild(self.chunks[chunk_index])
 
-    def rebuild_adjacent_chunk(self, position) -> None:
+    def fill_box(self, position, size, block_id) -> None:
         """
-        Rebuilds the adjacent chunk at the given position.
-        :param position: The position of the adjacent chunk to rebuild.
+        Sets the blocks of a box.
+        :param position: The world position of the first corner of the box.
+        :param size: The size of the box, in blocks.
+        :param block_id: The block id, 0 clears the blocks.
         """
-        index = get_chunk_index(position)
-
-        if index != -1:
-            self.chunks[index].mesh.rebuild()
+        self.fill_mask(position, np.ones(tuple(size), dtype=np.bool_), block_id)
 
-    def raycast(self) -> bool:
+    def fill_sphere(self, center, radius, block_id) -> None:
         """
-        Raycasts from the camera to the world.
-        :return: True if the raycast hit a block, False otherwise.
+        Sets the blocks of a sphere.
+        :param center: The world position of the center of the sphere.
+        :param radius: The radius of the sphere, in blocks.
+        :param block_id: The block id, 0 clears the blocks.
         """
+        origin = np.asarray(center, dtype=np.int64) - radius
+        self.fill_mask(origin, get_sphere_mask(radius), block_id)
 
-        # Start and end positions
-        x1, y1, z1 = self.app.player.position
-        x2, y2, z2 = (
-            self.app.player.position + self.app.player.forward * MAX_RAY_DISTANCE
-        )
+    def cast_rays(self, origins, directions, max_distance=MAX_RAY_DISTANCE) -> np.array:
+        """
+        Casts many rays at once through the world blocks, for line of sight
+        checks, explosion shadows or tools. The compact chunks the rays reach
+        are expanded, then their rays are cast again.
+        :param origins: The world positions the rays start from, one row per ray.
+        :param directions: The directions of the rays, of unit length, one row per ray.
+        :param max_distance: The length of the rays, in blocks.
+        :return: The result of each ray, one row per ray, see RAY_RESULT_SIZE.
+        """
+        origins = np.ascontiguousarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.ascontiguousarray(directions, dtype=np.float64).reshape(-1, 3)
+        results = np.empty([len(origins), RAY_RESULT_SIZE], dtype=np.int64)
+        rays = np.arange(len(origins))
 
-        # Current position
-        current_block_position = glm.ivec3(x1, y1, z1)
-        self.block_id = 0
-        self.block_normal = glm.ivec3(0)
-        step_direction = -1
+        while len(rays):
+            ray_results = cast_rays(
+                origins[rays],
+                directions[rays],
+                float(max_distance),
+                self.world.blocks,
+                self.world.chunk_positions,
+                self.world.is_compact,
+                self.world.solid_counts,
+            )
+            results[rays] = ray_results
 
-        # Ray direction
-        dx = glm.sign(x2 - x1)
-        delta_x = min(dx / (x2 - x1), 10000000.0) if dx != 0 else 10000000.0
-        max_x = delta_x * (1.0 - glm.fract(x1)) if dx > 0 else delta_x * glm.fract(x1)
+            is_pending = ray_results[:, 0] == RAY_COMPACT
 
-        dy = glm.sign(y2 - y1)
-        delta_y = min(dy / (y2 - y1), 10000000.0) if dy != 0 else 10000000.0
-        max_y = delta_y * (1.0 - glm.fract(y1)) if dy > 0 else delta_y * glm.fract(y1)
+            if not is_pending.any():
+                break
 
-        dz = glm.sign(z2 - z1)
-        delta_z = min(dz / (z2 - z1), 10000000.0) if dz != 0 else 10000000.0
-        max_z = delta_z * (1.0 - glm.fract(z1)) if dz > 0 else delta_z * glm.fract(z1)
+            self.world.expand_chunks(np.unique(ray_results[is_pending, 7]))
+            rays = rays[is_pending]
 
-        while not (max_x > 1.0 and max_y > 1.0 and max_z > 1.0):
-            result = self.get_block_id(current_block_position)
+        return results
 
-            if result[0]:
-                (
-                    self.block_id,
-                    self.block_index,
-                    self.block_local_position,
-                    self.chunk,
-                ) = result
+    def raycast(self) -> bool:
+        """
+        Raycasts from the camera to the world. The last result is kept while
+        neither the camera nor the world blocks changed.
+        :return: True if the raycast hit a block, False otherwise.
+        """
+        camera = self.app.player
+        ray_key = (*camera.position, *camera.forward, self.world.block_version)
 
-                self.block_world_position = current_block_position
+        if ray_key == self.ray_key:
+            return bool(self.block_id)
 
-                if step_direction == 0:
-                    self.block_normal.x = -dx
+        self.ray_key = ray_key
+        self.ray_origin[:] = camera.position
+        self.ray_direction[:] = camera.forward
 
-                elif step_direction == 1:
-                    self.block_normal.y = -dy
+        while True:
+            cast_ray(
+                self.ray_origin,
+                self.ray_direction,
+                MAX_RAY_DISTANCE,
+                self.world.blocks,
+                self.world.chunk_positions,
+                self.world.is_compact,
+                self.world.solid_counts,
+                self.ray_result,
+            )
 
-                else:
-                    self.block_normal.z = -dz
+            if self.ray_result[0] != RAY_COMPACT:
+                break
 
-                return True
+            self.world.expand_chunks([self.ray_result[7]])
 
-            if max_x < max_y:
-                if max_x < max_z:
-                    current_block_position.x += dx
-                    max_x += delta_x
-                    step_direction = 0
+        block_id, x, y, z, nx, ny, nz, chunk_index = self.ray_result.tolist()
 
-                else:
-                    current_block_position.z += dz
-                    max_z += delta_z
-                    step_direction = 2
+        self.block_id = block_id
+        self.block_normal = glm.ivec3(nx, ny, nz)
 
-            else:
-                if max_y < max_z:
-                    current_block_position.y += dy
-                    max_y += delta_y
-                    step_direction = 1
+        if not block_id:
+            return False
 
-                else:
-                    current_block_position.z += dz
-                    max_z += delta_z
-                    step_direction = 2
+        self.chunk = self.chunks[chunk_index]
+        self.block_world_position = glm.ivec3(x, y, z)
+        self.block_local_position = (
+            self.block_world_position - glm.ivec3(self.chunk.position) * CHUNK_SIZE
+        )
+        lx, ly, lz = self.block_local_position
+        self.block_index = lx + CHUNK_SIZE * lz + CHUNK_AREA * ly
 
-        return False
+        return True
 
     def update(self) -> None:
         """
@@ -0,0 +1,112 @@
+"""
+@file region_edit.py
+@brief Vectorized edits of the world blocks over boxes, spheres and masks.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-10
+"""
+
+# Libraries
+import numpy as np
+
+# Project files
+from core.constants.settings import CHUNK_SIZE
+from utils.chunk_builder.chunk_mesh_builder import get_chunk_index
+from utils.chunk_storage.chunk_occupancy import update_face_counts
+
+
+def get_sphere_mask(radius) -> np.array:
+    """
+    Gets the mask of a sphere centered in its box of side 2 * radius + 1.
+    :param radius: The radius of the sphere, in blocks.
+    :return: The mask, indexed by x, y and z.
+    """
+    x, y, z = np.ogrid[-radius : radius + 1, -radius : radius + 1, -radius : radius + 1]
+
+    return x * x + y * y + z * z <= radius * radius
+
+
+def get_region_chunks(chunk_positions, first, last) -> list:
+    """
+    Gets the loaded chunks that overlap the given box of blocks.
+    :param chunk_positions: The chunk position stored in each row of the world blocks.
+    :param first: The world position of the first corner of the box.
+    :param last: The world position of the last corner of the box, included.
+    :return: The chunk indices.
+    """
+    first_chunk = np.asarray(first) // CHUNK_SIZE
+    last_chunk = np.asarray(last) // CHUNK_SIZE
+    chunk_indices = []
+
+    for cx in range(first_chunk[0], last_chunk[0] + 1):
+        for cy in range(first_chunk[1], last_chunk[1] + 1):
+            for cz in range(first_chunk[2], last_chunk[2] + 1):
+                position = (cx * CHUNK_SIZE, cy * CHUNK_SIZE, cz * CHUNK_SIZE)
+                index = get_chunk_index(position, chunk_positions)
+
+                if index != -1:
+                    chunk_indices.append(index)
+
+    return chunk_indices
+
+
+def fill_region(
+    world_blocks, chunk_positions, solid_counts, face_counts, origin, mask, block_id
+) -> tuple:
+    """
+    Sets the blocks of the given mask to the block id, one vectorized write per
+    loaded chunk the mask overlaps. Blocks of chunks that are not loaded are
+    left out. The solid block counts of the changed chunks are kept up to date.
+    :param world_blocks: The world blocks.
+    :param chunk_positions: The chunk position stored in each row of the world blocks.
+    :param solid_counts: The solid blocks of each chunk, updated in place.
+    :param face_counts: The solid blocks of each face of each chunk, updated in place.
+    :param origin: The world position of the first block of the mask.
+    :param mask: The blocks to set, indexed by x, y and z.
+    :param block_id: The block id, 0 clears the blocks.
+    :return: The indices of the changed chunks, and of the chunks to remesh: the
+             changed ones and the ones within a block of a change, which see it
+             in their faces or shading.
+    """
+    origin = np.asarray(origin, dtype=np.int64)
+    end = origin + mask.shape
+    changed_chunks = set()
+    dirty_chunks = set()
+
+    for index in get_region_chunks(chunk_positions, origin, end - 1):
+        chunk_origin = chunk_positions[index] * CHUNK_SIZE
+        first = np.maximum(origin, chunk_origin)
+        last = np.minimum(end, chunk_origin + CHUNK_SIZE)
+
+        # The chunk blocks are indexed by y, z and x
+        mx, my, mz = first - origin
+        nx, ny, nz = last - origin
+        lx, ly, lz = first - chunk_origin
+        sx, sy, sz = last - first
+
+        blocks = world_blocks[index].reshape(CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+        blocks = blocks[ly : ly + sy, lz : lz + sz, lx : lx + sx]
+        changed = mask[mx:nx, my:ny, mz:nz].transpose(1, 2, 0) & (blocks != block_id)
+
+        if not changed.any():
+            continue
+
+        replaced = blocks[changed]
+        blocks[changed] = block_id
+        changed_chunks.add(index)
+
+        solid_counts[index] += len(replaced) * bool(block_id)
+        solid_counts[index] -= np.count_nonzero(replaced)
+        update_face_counts(
+            face_counts[index], world_blocks[index], (lx, ly, lz), last - chunk_origin
+        )
+
+        # Bounds of the changed blocks, grown by a block to reach the neighbors
+        ys, zs, xs = np.nonzero(changed)
+        changed_first = first + (xs.min(), ys.min(), zs.min()) - 1
+        changed_last = first + (xs.max(), ys.max(), zs.max()) + 1
+        dirty_chunks.update(
+            get_region_chunks(chunk_positions, changed_first, changed_last)
+        )
+
+    return changed_chunks, dirty_chunks
@@ -0,0 +1,152 @@
+"""
+@file voxel_raycast.py
+@brief Compiled voxel raycast, a DDA walk over the integer block positions
+       crossed by a ray, read straight from the world blocks, for a single ray
+       or a batch of rays at once.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-14
+"""
+
+# Libraries
+import numpy as np
+from numba import njit, prange
+
+# Project files
+from core.constants.settings import CHUNK_AREA, CHUNK_SIZE
+from utils.chunk_builder.chunk_mesh_builder import get_chunk_index
+
+# Result of a ray: the block id it hit, 0 if it hit nothing, or RAY_COMPACT if it
+# reached a compact chunk, whose blocks are not in the world blocks. Then the
+# world position of the block, the normal of the face the ray entered it by, and
+# the chunk index, -1 if it hit nothing
+RAY_COMPACT = -1
+RAY_RESULT_SIZE = 8
+
+# Step along an axis the ray does not move on, longer than any ray
+NO_STEP = 10000000.0
+
+
+@njit
+def cast_ray(
+    origin,
+    direction,
+    max_distance,
+    world_blocks,
+    chunk_positions,
+    is_compact,
+    solid_counts,
+    result,
+) -> None:
+    """
+    Walks the blocks crossed by a ray, from the block of its origin, and stops
+    at the first solid one. Chunks with no solid blocks are crossed without
+    reading their blocks.
+    :param origin: The world position the ray starts from.
+    :param direction: The direction of the ray, of unit length.
+    :param max_distance: The length of the ray, in blocks.
+    :param world_blocks: The world blocks.
+    :param chunk_positions: The chunk position stored in each row of the world blocks.
+    :param is_compact: True for the chunks whose blocks are compact.
+    :param solid_counts: The number of solid blocks of each chunk.
+    :param result: The result of the ray, see RAY_RESULT_SIZE.
+    """
+    block = np.empty(3, dtype=np.int64)
+    steps = np.empty(3, dtype=np.int64)
+    deltas = np.empty(3, dtype=np.float64)
+
+    # Fraction of the ray where it crosses the next block boundary on each axis
+    limits = np.empty(3, dtype=np.float64)
+
+    for axis in range(3):
+        start = np.floor(origin[axis])
+        length = direction[axis] * max_distance
+        block[axis] = int(start)
+
+        if length > 0.0:
+            steps[axis] = 1
+            deltas[axis] = min(1.0 / length, NO_STEP)
+            limits[axis] = deltas[axis] * (1.0 - (origin[axis] - start))
+
+        elif length < 0.0:
+            steps[axis] = -1
+            deltas[axis] = min(-1.0 / length, NO_STEP)
+            limits[axis] = deltas[axis] * (origin[axis] - start)
+
+        else:
+            steps[axis] = 0
+            deltas[axis] = NO_STEP
+            limits[axis] = NO_STEP
+
+    # A hit on the block of the origin has no entry face, its normal is along z
+    axis = 2
+    result[:] = 0
+    result[7] = -1
+
+    while limits[0] <= 1.0 or limits[1] <= 1.0 or limits[2] <= 1.0:
+        chunk_index = get_chunk_index((block[0], block[1], block[2]), chunk_positions)
+
+        if chunk_index != -1 and solid_counts[chunk_index]:
+            if is_compact[chunk_index]:
+                result[0] = RAY_COMPACT
+                result[7] = chunk_index
+                return
+
+            lx = block[0] - chunk_positions[chunk_index, 0] * CHUNK_SIZE
+            ly = block[1] - chunk_positions[chunk_index, 1] * CHUNK_SIZE
+            lz = block[2] - chunk_positions[chunk_index, 2] * CHUNK_SIZE
+            block_id = world_blocks[chunk_index, lx + CHUNK_SIZE * lz + CHUNK_AREA * ly]
+
+            if block_id:
+                result[0] = block_id
+                result[1:4] = block
+                result[4 + axis] = -steps[axis]
+                result[7] = chunk_index
+                return
+
+        if limits[0] < limits[1]:
+            axis = 0 if limits[0] < limits[2] else 2
+
+        else:
+            axis = 1 if limits[1] < limits[2] else 2
+
+        block[axis] += steps[axis]
+        limits[axis] += deltas[axis]
+
+
+@njit(parallel=True)
+def cast_rays(
+    origins,
+    directions,
+    max_distance,
+    world_blocks,
+    chunk_positions,
+    is_compact,
+    solid_counts,
+) -> np.array:
+    """
+    Casts the given rays in parallel, see cast_ray.
+    :param origins: The world positions the rays start from, one row per ray.
+    :param directions: The directions of the rays, of unit length, one row per ray.
+    :param max_distance: The length of the rays, in blocks.
+    :param world_blocks: The world blocks.
+    :param chunk_positions: The chunk position stored in each row of the world blocks.
+    :param is_compact: True for the chunks whose blocks are compact.
+    :param solid_counts: The number of solid blocks of each chunk.
+    :return: The result of each ray, one row per ray, see RAY_RESULT_SIZE.
+    """
+    results = np.empty((len(origins), RAY_RESULT_SIZE), dtype=np.int64)
+
+    for ray in prange(len(origins)):
+        cast_ray(
+            origins[ray],
+            directions[ray],
+            max_distance,
+            world_blocks,
+            chunk_positions,
+            is_compact,
+            solid_counts,
+            results[ray],
+        )
+
+    return results
@@ -0,0 +1,155 @@
+"""
+@file binary_mesh_builder.py
+@brief Binary mesher, finds the visible faces of a whole column of blocks at
+       once from bit masks of the solid blocks.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-14
+"""
+
+# Project files
+from core.constants.settings import CHUNK_SIZE, CHUNK_VOLUME
+from utils.chunk_builder.chunk_mesh_builder import (
+    PADDED_AREA,
+    PADDED_SIZE,
+    add_quad,
+    get_ao,
+)
+
+# Libraries
+import numpy as np
+from numba import njit
+
+# Bits of a column mask, bit z + 1 is the block at z of the chunk and bits 0 and
+# CHUNK_SIZE + 1 the border blocks before and after it
+ONE = np.uint64(1)
+CHUNK_BITS = np.uint64(((1 << CHUNK_SIZE) - 1) << 1)
+
+# De Bruijn sequence and table to find the position of the lowest set bit of a
+# column mask with a multiply and a lookup
+DE_BRUIJN = np.uint64(0x03F79D71B4CB0A89)
+DE_BRUIJN_SHIFT = np.uint64(58)
+BIT_POSITIONS = np.zeros(64, dtype=np.int64)
+
+for bit in range(64):
+    BIT_POSITIONS[((0x03F79D71B4CB0A89 << bit) & 0xFFFFFFFFFFFFFFFF) >> 58] = bit
+
+
+@njit(nogil=True)
+def get_column_masks(padded_blocks, column_masks) -> None:
+    """
+    Gets the solid blocks of each column along z of the padded blocks as a bit
+    mask, bit z set if the block at z is solid.
+    :param padded_blocks: The padded blocks, see get_padded_blocks.
+    :param column_masks: The column masks, indexed by y and x, written in place.
+    """
+    column_masks[:] = 0
+
+    for y in range(PADDED_SIZE):
+        for z in range(PADDED_SIZE):
+            bit = np.uint64(z)
+            row = PADDED_SIZE * z + PADDED_AREA * y
+
+            for x in range(PADDED_SIZE):
+                column_masks[y, x] |= np.uint64(padded_blocks[row + x] != 0) << bit
+
+
+@njit(nogil=True)
+def build_binary_chunk_mesh(
+    padded_blocks,
+    format_size,
+    vertex_data=None,
+    per_face=False,
+) -> np.array:
+    """
+    Builds the mesh for the given chunk, culling the hidden faces of a column of
+    blocks at a time with shifts and ands of the column masks. The quads and
+    their order are the same as with build_chunk_mesh, so are the arguments and
+    the vertex format.
+    :param padded_blocks: The chunk blocks and the border around them, see
+                          get_padded_blocks.
+    :param format_size: The format size.
+    :param vertex_data: Scratch vertex data to build the mesh in, see get_mesh_buffer.
+                        A new one is allocated if None.
+    :param per_face: Whether to build a face record per face, see add_quad, instead
+                     of six vertices.
+    :return: The mesh, a copy with exactly the vertices built.
+    """
+    if vertex_data is None:
+        vertex_data = np.empty(CHUNK_VOLUME * 18 * format_size, dtype="uint32")
+
+    index = 0
+
+    column_masks = np.empty((PADDED_SIZE, PADDED_SIZE), dtype=np.uint64)
+    get_column_masks(padded_blocks, column_masks)
+
+    # Visible faces of the column, a mask per face
+    face_masks = np.empty(6, dtype=np.uint64)
+
+    for x in range(CHUNK_SIZE):
+        for y in range(CHUNK_SIZE):
+            column = column_masks[y + 1, x + 1]
+            solid = column & CHUNK_BITS
+
+            if not solid:
+                continue
+
+            # Solid blocks whose neighbor on each face is void
+            face_masks[0] = solid & ~column_masks[y + 2, x + 1]
+            face_masks[1] = solid & ~column_masks[y, x + 1]
+            face_masks[2] = solid & ~column_masks[y + 1, x + 2]
+            face_masks[3] = solid & ~column_masks[y + 1, x]
+            face_masks[4] = solid & ~(column << ONE)
+            face_masks[5] = solid & ~(column >> ONE)
+
+            visible = (
+                face_masks[0]
+                | face_masks[1]
+                | face_masks[2]
+                | face_masks[3]
+                | face_masks[4]
+                | face_masks[5]
+            )
+
+            # Blocks with a visible face, lowest z first
+            while visible:
+                low_bit = visible & (~visible + ONE)
+                visible ^= low_bit
+                z = BIT_POSITIONS[(low_bit * DE_BRUIJN) >> DE_BRUIJN_SHIFT] - 1
+
+                block_index = x + 1 + PADDED_SIZE * (z + 1) + PADDED_AREA * (y + 1)
+                block_id = padded_blocks[block_index]
+
+                for face_id in range(6):
+                    if not face_masks[face_id] & low_bit:
+                        continue
+
+                    if face_id < 2:
+                        neighbor = block_index + PADDED_AREA * (1 - 2 * face_id)
+                        step_a, step_b = 1, PADDED_SIZE
+
+                    elif face_id < 4:
+                        neighbor = block_index + 5 - 2 * face_id
+                        step_a, step_b = PADDED_AREA, PADDED_SIZE
+
+                    else:
+                        neighbor = block_index + PADDED_SIZE * (2 * face_id - 9)
+                        step_a, step_b = PADDED_AREA, 1
+
+                    ao = get_ao(padded_blocks, neighbor, step_a, step_b)
+                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
+
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        (x, y, z),
+                        1,
+                        1,
+                        block_id,
+                        face_id,
+                        ao,
+                        flip_id,
+                        per_face,
+                    )
+
+    return vertex_data[:index].copy()
@@ -18,90 +18,70 @@ from core.constants.settings import (
 )
 
 # Libraries
+import threading
+
 import numpy as np
 from numba import njit
 
+# Scratch vertex data and padded blocks of each thread that builds meshes
+mesh_buffers = threading.local()
+
+# Side, area and volume of the padded blocks the meshers read, the chunk blocks
+# with a one block border around them
+PADDED_SIZE = CHUNK_SIZE + 2
+PADDED_AREA = PADDED_SIZE * PADDED_SIZE
+PADDED_VOLUME = PADDED_AREA * PADDED_SIZE
+
 
 @njit
-def get_ao(local_position, world_position, world_blocks, plane) -> tuple:
+def get_ao(padded_blocks, index, step_a, step_b) -> tuple:
     """
-    Gets the ambient occlusion of the given block.
-    :param local_position: The local position of the block.
-    :param world_position: The world position of the block.
-    :param world_blocks: The world blocks.
-    :param plane: The plane to get the ambient occlusion from.
-    :return: The ambient occlusion of the given block.
-    :return: 0 If the block is not solid.
+    Gets the ambient occlusion of the four corners of a face, from the blocks
+    around the void block in front of it.
+    :param padded_blocks: The padded blocks, see get_padded_blocks.
+    :param index: The padded index of the void block in front of the face.
+    :param step_a: The index step along the first axis of the face plane.
+    :param step_b: The index step along the second axis of the face plane.
+    :return: The ambient occlusion of the four corners.
     """
 
-    x, y, z = local_position
-    wx, wy, wz = world_position
-
-    if plane == "Y":
-        a = is_void((x, y, z - 1), (wx, wy, wz - 1), world_blocks)
-        b = is_void((x - 1, y, z - 1), (wx - 1, wy, wz - 1), world_blocks)
-        c = is_void((x - 1, y, z), (wx - 1, wy, wz), world_blocks)
-        d = is_void((x - 1, y, z + 1), (wx - 1, wy, wz + 1), world_blocks)
-        e = is_void((x, y, z + 1), (wx, wy, wz + 1), world_blocks)
-        f = is_void((x + 1, y, z + 1), (wx + 1, wy, wz + 1), world_blocks)
-        g = is_void((x + 1, y, z), (wx + 1, wy, wz), world_blocks)
-        h = is_void((x + 1, y, z - 1), (wx + 1, wy, wz - 1), world_blocks)
-
-    elif plane == "X":
-        a = is_void((x, y, z - 1), (wx, wy, wz - 1), world_blocks)
-        b = is_void((x, y - 1, z - 1), (wx, wy - 1, wz - 1), world_blocks)
-        c = is_void((x, y - 1, z), (wx, wy - 1, wz), world_blocks)
-        d = is_void((x, y - 1, z + 1), (wx, wy - 1, wz + 1), world_blocks)
-        e = is_void((x, y, z + 1), (wx, wy, wz + 1), world_blocks)
-        f = is_void((x, y + 1, z + 1), (wx, wy + 1, wz + 1), world_blocks)
-        g = is_void((x, y + 1, z), (wx, wy + 1, wz), world_blocks)
-        h = is_void((x, y + 1, z - 1), (wx, wy + 1, wz - 1), world_blocks)
-
-    else:
-        a = is_void((x - 1, y, z), (wx - 1, wy, wz), world_blocks)
-        b = is_void((x - 1, y - 1, z), (wx - 1, wy - 1, wz), world_blocks)
-        c = is_void((x, y - 1, z), (wx, wy - 1, wz), world_blocks)
-        d = is_void((x + 1, y - 1, z), (wx + 1, wy - 1, wz), world_blocks)
-        e = is_void((x + 1, y, z), (wx + 1, wy, wz), world_blocks)
-        f = is_void((x + 1, y + 1, z), (wx + 1, wy + 1, wz), world_blocks)
-        g = is_void((x, y + 1, z), (wx, wy + 1, wz), world_blocks)
-        h = is_void((x - 1, y + 1, z), (wx - 1, wy + 1, wz), world_blocks)
+    a = not padded_blocks[index - step_b]
+    b = not padded_blocks[index - step_a - step_b]
+    c = not padded_blocks[index - step_a]
+    d = not padded_blocks[index - step_a + step_b]
+    e = not padded_blocks[index + step_b]
+    f = not padded_blocks[index + step_a + step_b]
+    g = not padded_blocks[index + step_a]
+    h = not padded_blocks[index + step_a - step_b]
 
     return ((a + b + c), (g + h + a), (e + f + g), (c + d + e))
 
 
 @njit
-def is_void(local_position, world_position, world_blocks) -> bool:
+def get_chunk_slot(chunk_position) -> int:
     """
-    Checks if the given block is void.
-    :param local_position: The local position of the block.
-    :param world_position: The world position of the block.
-    :param world_blocks: The world blocks.
-    :return: True if the block is void.
-    :return: False if the block is not void.
+    Gets the row of the world blocks that holds the given chunk. Rows wrap around
+    the world size, so a streaming world can reuse the rows of the chunks it unloads.
+    :param chunk_position: The chunk position.
+    :return: The row of the world blocks.
     """
 
-    chunk_index = get_chunk_index(world_position)
-
-    if chunk_index == -1:
-        return False
-
-    chunk_blocks = world_blocks[chunk_index]
-    x, y, z = local_position
-    block_index = (
-        x % CHUNK_SIZE + z % CHUNK_SIZE * CHUNK_SIZE + y % CHUNK_SIZE * CHUNK_AREA
-    )
-
-    return not chunk_blocks[block_index]
+    cx, cy, cz = chunk_position
+    return cx % WORLD_WIDTH + WORLD_WIDTH * (cz % WORLD_DEPTH) + WORLD_AREA * cy
 
 
+# The settings are compiled into the kernels as constants, the world size
+# through this lookup and the chunk size almost everywhere. numba does not
+# invalidate its disk cache when settings.py changes, so the kernels that read
+# them are not compiled with cache=True
 @njit
-def get_chunk_index(world_position) -> int:
+def get_chunk_index(world_position, chunk_positions) -> int:
     """
     Gets the chunk index of the given world position.
     :param world_position: The world position.
+    :param chunk_positions: The chunk position stored in each row of the world blocks.
     :return: The chunk index.
-    :return: -1 if the chunk index is out of bounds.
+    :return: -1 if the chunk is out of bounds or not loaded.
     """
 
     wx, wy, wz = world_position
@@ -109,10 +89,14 @@ def get_chunk_index(world_position) -> int:
     cy = wy // CHUNK_SIZE
     cz = wz // CHUNK_SIZE
 
-    if not (0 <= cx < WORLD_WIDTH and 0 <= cy < WORLD_HEIGHT and 0 <= cz < WORLD_DEPTH):
+    if not 0 <= cy < WORLD_HEIGHT:
+        return -1
+
+    index = get_chunk_slot((cx, cy, cz))
+
+    if chunk_positions[index, 0] != cx or chunk_positions[index, 2] != cz:
         return -1
 
-    index = cx + WORLD_WIDTH * cz + WORLD_AREA * cy
     return index
 
 
@@ -155,145 +139,407 @@ def add_data(vertex_data, index, *vertices) -> int:
 
 
 @njit
-def build_chunk_mesh(
-    chunk_blocks, format_size, chunk_position, world_blocks
+def pack_face(ao, size_a, size_b) -> np.uint32:
+    """
+    Packs the second word of a face record. A face record is the position of the
+    face block, its block id, face id and flip id packed with pack_data, followed
+    by this word: 2 bits for the ao of each of the four corners and 6 bits for the
+    size of the face along each axis of its plane.
+    :param ao: The ambient occlusion of the four corners.
+    :param size_a: The size of the face along the first axis of its plane.
+    :param size_b: The size of the face along the second axis of its plane.
+    :return: The packed data.
+    """
+    return (
+        (ao[0] & 0x3)
+        | (ao[1] & 0x3) << 2
+        | (ao[2] & 0x3) << 4
+        | (ao[3] & 0x3) << 6
+        | (size_a & 0x3F) << 8
+        | (size_b & 0x3F) << 14
+    )
+
+
+@njit
+def get_face_position(face_id, layer, a, b) -> tuple:
+    """
+    Gets the local position of a block from its position on a face layer. Faces
+    on the Y plane are indexed by (y, x, z), on the X plane by (x, y, z) and on
+    the Z plane by (z, y, x).
+    :param face_id: The face id.
+    :param layer: The position along the face normal.
+    :param a: The first position on the face plane.
+    :param b: The second position on the face plane.
+    :return: The local position of the block.
+    """
+    if face_id < 2:
+        return a, layer, b
+
+    elif face_id < 4:
+        return layer, a, b
+
+    return b, a, layer
+
+
+@njit
+def add_quad(
+    vertex_data,
+    index,
+    position,
+    size_a,
+    size_b,
+    block_id,
+    face_id,
+    ao,
+    flip_id,
+    per_face,
+) -> int:
+    """
+    Adds a quad covering size_a by size_b block faces to the vertex data, as the
+    six vertices of its two triangles or as a single face record.
+    :param vertex_data: The vertex data.
+    :param index: The index.
+    :param position: The local position of the first block of the quad.
+    :param size_a: The size of the quad along the first axis of the face plane.
+    :param size_b: The size of the quad along the second axis of the face plane.
+    :param block_id: The block id.
+    :param face_id: The face id.
+    :param ao: The ambient occlusion of the four corners.
+    :param flip_id: The flip id.
+    :param per_face: Whether to add a face record instead of the vertices.
+    :return: The new index.
+    """
+    x, y, z = position
+
+    if per_face:
+        vertex_data[index] = pack_data(x, y, z, block_id, face_id, 0, flip_id)
+        vertex_data[index + 1] = pack_face(ao, size_a, size_b)
+
+        return index + 2
+
+    if face_id < 2:
+        y += 1 - face_id
+        v0 = pack_data(x, y, z, block_id, face_id, ao[0], flip_id)
+        v1 = pack_data(x + size_a, y, z, block_id, face_id, ao[1], flip_id)
+        v2 = pack_data(x + size_a, y, z + size_b, block_id, face_id, ao[2], flip_id)
+        v3 = pack_data(x, y, z + size_b, block_id, face_id, ao[3], flip_id)
+
+    elif face_id < 4:
+        x += 3 - face_id
+        v0 = pack_data(x, y, z, block_id, face_id, ao[0], flip_id)
+        v1 = pack_data(x, y + size_a, z, block_id, face_id, ao[1], flip_id)
+        v2 = pack_data(x, y + size_a, z + size_b, block_id, face_id, ao[2], flip_id)
+        v3 = pack_data(x, y, z + size_b, block_id, face_id, ao[3], flip_id)
+
+    else:
+        z += face_id - 4
+        v0 = pack_data(x, y, z, block_id, face_id, ao[0], flip_id)
+        v1 = pack_data(x, y + size_a, z, block_id, face_id, ao[1], flip_id)
+        v2 = pack_data(x + size_b, y + size_a, z, block_id, face_id, ao[2], flip_id)
+        v3 = pack_data(x + size_b, y, z, block_id, face_id, ao[3], flip_id)
+
+    if face_id == 0 or face_id == 2 or face_id == 4:
+        if flip_id and face_id == 0:
+            return add_data(vertex_data, index, v1, v0, v3, v1, v3, v2)
+
+        elif flip_id:
+            return add_data(vertex_data, index, v3, v0, v1, v3, v1, v2)
+
+        elif face_id == 0:
+            return add_data(vertex_data, index, v0, v3, v2, v0, v2, v1)
+
+        return add_data(vertex_data, index, v0, v1, v2, v0, v2, v3)
+
+    if flip_id and face_id == 1:
+        return add_data(vertex_data, index, v1, v3, v0, v1, v2, v3)
+
+    elif flip_id:
+        return add_data(vertex_data, index, v3, v1, v0, v3, v2, v1)
+
+    elif face_id == 1:
+        return add_data(vertex_data, index, v0, v2, v3, v0, v1, v2)
+
+    return add_data(vertex_data, index, v0, v2, v1, v0, v3, v2)
+
+
+@njit
+def get_chunk_neighbors(chunk_position, chunk_positions) -> np.array:
+    """
+    Gets the world blocks rows of the given chunk and its 26 neighbors, so the
+    mesher only looks them up once per chunk.
+    :param chunk_position: The chunk position.
+    :param chunk_positions: The chunk position stored in each row of the world blocks.
+    :return: The rows indexed by (dx + 1) + 3 * (dz + 1) + 9 * (dy + 1).
+    :return: -1 for the neighbors that are out of bounds or not loaded.
+    """
+    cx, cy, cz = chunk_position
+    chunk_neighbors = np.empty(27, dtype=np.int64)
+
+    for dy in range(-1, 2):
+        for dz in range(-1, 2):
+            for dx in range(-1, 2):
+                world_position = (
+                    (cx + dx) * CHUNK_SIZE,
+                    (cy + dy) * CHUNK_SIZE,
+                    (cz + dz) * CHUNK_SIZE,
+                )
+
+                chunk_neighbors[dx + 1 + 3 * (dz + 1) + 9 * (dy + 1)] = get_chunk_index(
+                    world_position, chunk_positions
+                )
+
+    return chunk_neighbors
+
+
+@njit(nogil=True)
+def get_padded_blocks(
+    chunk_position, world_blocks, chunk_positions, padded_blocks=None
 ) -> np.array:
     """
-    Builds the mesh for the given chunk.
-    :param chunk_blocks: The chunk blocks.
-    :param format_size: The format size.
+    Gathers everything the meshers read into a single array: the chunk blocks
+    and a one block border taken from its neighbors. The meshers then find any
+    neighbor block at a fixed offset, and need nothing else from the world. The
+    border only tells void blocks, 0, from solid ones, 1.
     :param chunk_position: The chunk position.
     :param world_blocks: The world blocks.
-    :return: The mesh.
+    :param chunk_positions: The chunk position stored in each row of the world blocks.
+    :param padded_blocks: Scratch array to gather the blocks in, see get_padded_buffer.
+                          A new one is allocated if None.
+    :return: The padded blocks, indexed by x + PADDED_SIZE * z + PADDED_AREA * y
+             with the first chunk block at (1, 1, 1).
     """
-    vertex_data = np.empty(CHUNK_VOLUME * 18 * format_size, dtype="uint32")
-    index = 0
+    if padded_blocks is None:
+        padded_blocks = np.empty(PADDED_VOLUME, dtype=np.uint8)
 
-    for x in range(CHUNK_SIZE):
-        for y in range(CHUNK_SIZE):
-            for z in range(CHUNK_SIZE):
-                block_id = chunk_blocks[x + CHUNK_SIZE * z + CHUNK_AREA * y]
+    chunk_neighbors = get_chunk_neighbors(chunk_position, chunk_positions)
+    chunk_blocks = world_blocks[chunk_neighbors[13]]
 
-                if not block_id:
+    for y in range(CHUNK_SIZE):
+        for z in range(CHUNK_SIZE):
+            row = 1 + PADDED_SIZE * (z + 1) + PADDED_AREA * (y + 1)
+            source_row = CHUNK_SIZE * z + CHUNK_AREA * y
+
+            for x in range(CHUNK_SIZE):
+                padded_blocks[row + x] = chunk_blocks[source_row + x]
+
+    # The border is the part of each neighbor that falls in the padded blocks,
+    # bounded along each axis by the neighbor offset plus one
+    bounds = (0, 1, CHUNK_SIZE + 1, CHUNK_SIZE + 2)
+
+    for dy in range(3):
+        for dz in range(3):
+            for dx in range(3):
+                # The chunk itself is copied above
+                if dx == 1 and dy == 1 and dz == 1:
                     continue
 
-                # Get the world position of the block.
-                cx, cy, cz = chunk_position
-                wx, wy, wz = (
-                    cx * CHUNK_SIZE + x,
-                    cy * CHUNK_SIZE + y,
-                    cz * CHUNK_SIZE + z,
-                )
+                chunk_index = chunk_neighbors[dx + 3 * dz + 9 * dy]
 
-                # Top face
-                if is_void((x, y + 1, z), (wx, wy + 1, wz), world_blocks):
-                    ao = get_ao(
-                        (x, y + 1, z), (wx, wy + 1, wz), world_blocks, plane="Y"
-                    )
+                # Offset from a padded index to the index in the neighbor blocks
+                offset = -1 - (dx - 1) * CHUNK_SIZE
+                offset -= (1 + (dz - 1) * CHUNK_SIZE) * CHUNK_SIZE
+                offset -= (1 + (dy - 1) * CHUNK_SIZE) * CHUNK_AREA
 
-                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
+                for y in range(bounds[dy], bounds[dy + 1]):
+                    for z in range(bounds[dz], bounds[dz + 1]):
+                        row = PADDED_SIZE * z + PADDED_AREA * y
+                        source_row = CHUNK_SIZE * z + CHUNK_AREA * y + offset
 
-                    v0 = pack_data(x, y + 1, z, block_id, 0, ao[0], flip_id)
-                    v1 = pack_data(x + 1, y + 1, z, block_id, 0, ao[1], flip_id)
-                    v2 = pack_data(x + 1, y + 1, z + 1, block_id, 0, ao[2], flip_id)
-                    v3 = pack_data(x, y + 1, z + 1, block_id, 0, ao[3], flip_id)
+                        for x in range(bounds[dx], bounds[dx + 1]):
+                            # Missing neighbors are solid
+                            if chunk_index == -1:
+                                padded_blocks[row + x] = 1
 
-                    if flip_id:
-                        index = add_data(vertex_data, index, v1, v0, v3, v1, v3, v2)
+                            else:
+                                padded_blocks[row + x] = (
+                                    world_blocks[chunk_index, source_row + x] != 0
+                                )
 
-                    else:
-                        index = add_data(vertex_data, index, v0, v3, v2, v0, v2, v1)
+    return padded_blocks
 
-                # Bottom face
-                if is_void((x, y - 1, z), (wx, wy - 1, wz), world_blocks):
-                    ao = get_ao(
-                        (x, y - 1, z), (wx, wy - 1, wz), world_blocks, plane="Y"
-                    )
 
-                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
+def get_padded_buffer() -> np.array:
+    """
+    Gets the scratch padded blocks of the calling thread, see get_padded_blocks.
+    :return: The scratch padded blocks.
+    """
+    padded_blocks = getattr(mesh_buffers, "padded_blocks", None)
 
-                    v0 = pack_data(x, y, z, block_id, 1, ao[0], flip_id)
-                    v1 = pack_data(x + 1, y, z, block_id, 1, ao[1], flip_id)
-                    v2 = pack_data(x + 1, y, z + 1, block_id, 1, ao[2], flip_id)
-                    v3 = pack_data(x, y, z + 1, block_id, 1, ao[3], flip_id)
+    if padded_blocks is None:
+        padded_blocks = mesh_buffers.padded_blocks = np.empty(
+            PADDED_VOLUME, dtype=np.uint8
+        )
 
-                    if flip_id:
-                        index = add_data(vertex_data, index, v1, v3, v0, v1, v2, v3)
+    return padded_blocks
 
-                    else:
-                        index = add_data(vertex_data, index, v0, v2, v3, v0, v1, v2)
 
-                # Right face
-                if is_void((x + 1, y, z), (wx + 1, wy, wz), world_blocks):
-                    ao = get_ao(
-                        (x + 1, y, z), (wx + 1, wy, wz), world_blocks, plane="X"
-                    )
-                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
+def get_mesh_buffer(format_size) -> np.array:
+    """
+    Gets the scratch vertex data of the calling thread, large enough for any chunk.
+    The meshers build in it and return a copy of the vertices they built, so one
+    buffer is reused by every mesh the thread builds.
+    :param format_size: The format size.
+    :return: The scratch vertex data.
+    """
+    size = CHUNK_VOLUME * 18 * format_size
+    vertex_data = getattr(mesh_buffers, "vertex_data", None)
 
-                    v0 = pack_data(x + 1, y, z, block_id, 2, ao[0], flip_id)
-                    v1 = pack_data(x + 1, y + 1, z, block_id, 2, ao[1], flip_id)
-                    v2 = pack_data(x + 1, y + 1, z + 1, block_id, 2, ao[2], flip_id)
-                    v3 = pack_data(x + 1, y, z + 1, block_id, 2, ao[3], flip_id)
+    if vertex_data is None or len(vertex_data) < size:
+        vertex_data = mesh_buffers.vertex_data = np.empty(size, dtype="uint32")
 
-                    if flip_id:
-                        index = add_data(vertex_data, index, v3, v0, v1, v3, v1, v2)
+    return vertex_data
 
-                    else:
-                        index = add_data(vertex_data, index, v0, v1, v2, v0, v2, v3)
 
-                # Left face
-                if is_void((x - 1, y, z), (wx - 1, wy, wz), world_blocks):
-                    ao = get_ao(
-                        (x - 1, y, z), (wx - 1, wy, wz), world_blocks, plane="X"
-                    )
+@njit(nogil=True)
+def build_chunk_mesh(
+    padded_blocks,
+    format_size,
+    vertex_data=None,
+    per_face=False,
+) -> np.array:
+    """
+    Builds the mesh for the given chunk.
+    :param padded_blocks: The chunk blocks and the border around them, see
+                          get_padded_blocks.
+    :param format_size: The format size.
+    :param vertex_data: Scratch vertex data to build the mesh in, see get_mesh_buffer.
+                        A new one is allocated if None.
+    :param per_face: Whether to build a face record per face, see add_quad, instead
+                     of six vertices.
+    :return: The mesh, a copy with exactly the vertices built.
+    """
+    if vertex_data is None:
+        vertex_data = np.empty(CHUNK_VOLUME * 18 * format_size, dtype="uint32")
+
+    index = 0
+
+    for x in range(CHUNK_SIZE):
+        for y in range(CHUNK_SIZE):
+            for z in range(CHUNK_SIZE):
+                block_index = x + 1 + PADDED_SIZE * (z + 1) + PADDED_AREA * (y + 1)
+                block_id = padded_blocks[block_index]
+
+                if not block_id:
+                    continue
+
+                # Top face
+                neighbor = block_index + PADDED_AREA
+
+                if not padded_blocks[neighbor]:
+                    ao = get_ao(padded_blocks, neighbor, 1, PADDED_SIZE)
                     flip_id = ao[1] + ao[3] > ao[0] + ao[2]
 
-                    v0 = pack_data(x, y, z, block_id, 3, ao[0], flip_id)
-                    v1 = pack_data(x, y + 1, z, block_id, 3, ao[1], flip_id)
-                    v2 = pack_data(x, y + 1, z + 1, block_id, 3, ao[2], flip_id)
-                    v3 = pack_data(x, y, z + 1, block_id, 3, ao[3], flip_id)
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        (x, y, z),
+                        1,
+                        1,
+                        block_id,
+                        0,
+                        ao,
+                        flip_id,
+                        per_face,
+                    )
 
-                    if flip_id:
-                        index = add_data(vertex_data, index, v3, v1, v0, v3, v2, v1)
+                # Bottom face
+                neighbor = block_index - PADDED_AREA
 
-                    else:
-                        index = add_data(vertex_data, index, v0, v2, v1, v0, v3, v2)
+                if not padded_blocks[neighbor]:
+                    ao = get_ao(padded_blocks, neighbor, 1, PADDED_SIZE)
+                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
 
-                # Back face
-                if is_void((x, y, z - 1), (wx, wy, wz - 1), world_blocks):
-                    ao = get_ao(
-                        (x, y, z - 1), (wx, wy, wz - 1), world_blocks, plane="Z"
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        (x, y, z),
+                        1,
+                        1,
+                        block_id,
+                        1,
+                        ao,
+                        flip_id,
+                        per_face,
                     )
 
+                # Right face
+                neighbor = block_index + 1
+
+                if not padded_blocks[neighbor]:
+                    ao = get_ao(padded_blocks, neighbor, PADDED_AREA, PADDED_SIZE)
                     flip_id = ao[1] + ao[3] > ao[0] + ao[2]
 
-                    v0 = pack_data(x, y, z, block_id, 4, ao[0], flip_id)
-                    v1 = pack_data(x, y + 1, z, block_id, 4, ao[1], flip_id)
-                    v2 = pack_data(x + 1, y + 1, z, block_id, 4, ao[2], flip_id)
-                    v3 = pack_data(x + 1, y, z, block_id, 4, ao[3], flip_id)
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        (x, y, z),
+                        1,
+                        1,
+                        block_id,
+                        2,
+                        ao,
+                        flip_id,
+                        per_face,
+                    )
 
-                    if flip_id:
-                        index = add_data(vertex_data, index, v3, v0, v1, v3, v1, v2)
+                # Left face
+                neighbor = block_index - 1
 
-                    else:
-                        index = add_data(vertex_data, index, v0, v1, v2, v0, v2, v3)
+                if not padded_blocks[neighbor]:
+                    ao = get_ao(padded_blocks, neighbor, PADDED_AREA, PADDED_SIZE)
+                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
 
-                    # Front face
-                if is_void((x, y, z + 1), (wx, wy, wz + 1), world_blocks):
-                    ao = get_ao(
-                        (x, y, z + 1), (wx, wy, wz + 1), world_blocks, plane="Z"
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        (x, y, z),
+                        1,
+                        1,
+                        block_id,
+                        3,
+                        ao,
+                        flip_id,
+                        per_face,
                     )
 
+                # Back face
+                neighbor = block_index - PADDED_SIZE
+
+                if not padded_blocks[neighbor]:
+                    ao = get_ao(padded_blocks, neighbor, PADDED_AREA, 1)
                     flip_id = ao[1] + ao[3] > ao[0] + ao[2]
 
-                    v0 = pack_data(x, y, z + 1, block_id, 5, ao[0], flip_id)
-                    v1 = pack_data(x, y + 1, z + 1, block_id, 5, ao[1], flip_id)
-                    v2 = pack_data(x + 1, y + 1, z + 1, block_id, 5, ao[2], flip_id)
-                    v3 = pack_data(x + 1, y, z + 1, block_id, 5, ao[3], flip_id)
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        (x, y, z),
+                        1,
+                        1,
+                        block_id,
+                        4,
+                        ao,
+                        flip_id,
+                        per_face,
+                    )
+
+                # Front face
+                neighbor = block_index + PADDED_SIZE
+
+                if not padded_blocks[neighbor]:
+                    ao = get_ao(padded_blocks, neighbor, PADDED_AREA, 1)
+                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
 
-                    if flip_id:
-                        index = add_data(vertex_data, index, v3, v1, v0, v3, v2, v1)
-                    else:
-                        index = add_data(vertex_data, index, v0, v2, v1, v0, v3, v2)
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        (x, y, z),
+                        1,
+                        1,
+                        block_id,
+                        5,
+                        ao,
+                        flip_id,
+                        per_face,
+                    )
 
-    return vertex_data[: index + 1]
+    return vertex_data[:index].copy()
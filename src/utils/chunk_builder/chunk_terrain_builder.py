@@ -0,0 +1,175 @@
+"""
+@file chunk_terrain_builder.py
+@brief Compiled terrain generation for the chunks of the game.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-04
+"""
+
+# Project files
+from core.constants.settings import CHUNK_SIZE, CHUNK_AREA
+
+# Libraries
+import numpy as np
+from numba import njit, prange
+
+# Noise constants, kept in single precision to match glm.simplex bit for bit
+F32 = np.float32
+SIMPLEX_C_X = F32(0.211324865405187)
+SIMPLEX_C_Y = F32(0.366025403784439)
+SIMPLEX_C_Z = F32(-0.577350269189626)
+SIMPLEX_C_W = F32(0.024390243902439)
+
+NOISE_FREQUENCY = F32(0.01)
+NOISE_AMPLITUDE = 32.0
+
+
+@njit
+def mod_289(x) -> np.float32:
+    """
+    Computes x modulo 289 the same way glm does.
+    :param x: The value.
+    :return: The value modulo 289.
+    """
+    return x - np.floor(x * F32(1.0 / 289.0)) * F32(289.0)
+
+
+@njit
+def permute(x) -> np.float32:
+    """
+    Permutation polynomial used to hash the simplex corners.
+    :param x: The value to permute.
+    :return: The permuted value.
+    """
+    return mod_289((x * F32(34.0) + F32(1.0)) * x)
+
+
+@njit
+def get_corner(p, m, x, y) -> np.float32:
+    """
+    Gets the contribution of a single simplex corner.
+    :param p: The permuted hash of the corner.
+    :param m: The falloff of the corner.
+    :param x: The x offset from the corner.
+    :param y: The y offset from the corner.
+    :return: The contribution of the corner.
+    """
+    m = m * m
+    m = m * m
+
+    px = p * SIMPLEX_C_W
+    gx = F32(2.0) * (px - np.floor(px)) - F32(1.0)
+    h = abs(gx) - F32(0.5)
+    a0 = gx - np.floor(gx + F32(0.5))
+
+    m = m * (F32(1.79284291400159) - F32(0.85373472095314) * (a0 * a0 + h * h))
+    return m * (a0 * x + h * y)
+
+
+@njit
+def simplex(vx, vy) -> np.float32:
+    """
+    2D simplex noise. Port of glm.simplex(glm.vec2) in single precision, so the
+    result is identical to the one produced by PyGLM.
+    :param vx: The x coordinate.
+    :param vy: The y coordinate.
+    :return: The noise value in the range [-1, 1].
+    """
+
+    # First corner
+    skew = vx * SIMPLEX_C_Y + vy * SIMPLEX_C_Y
+    ix = np.floor(vx + skew)
+    iy = np.floor(vy + skew)
+
+    unskew = ix * SIMPLEX_C_X + iy * SIMPLEX_C_X
+    x0 = vx - ix + unskew
+    y0 = vy - iy + unskew
+
+    # Other corners
+    i1x, i1y = (F32(1.0), F32(0.0)) if x0 > y0 else (F32(0.0), F32(1.0))
+
+    x1 = x0 + SIMPLEX_C_X - i1x
+    y1 = y0 + SIMPLEX_C_X - i1y
+    x2 = x0 + SIMPLEX_C_Z
+    y2 = y0 + SIMPLEX_C_Z
+
+    # Permutations
+    ix = ix - F32(289.0) * np.floor(ix / F32(289.0))
+    iy = iy - F32(289.0) * np.floor(iy / F32(289.0))
+
+    p0 = permute(permute(iy) + ix)
+    p1 = permute(permute(iy + i1y) + ix + i1x)
+    p2 = permute(permute(iy + F32(1.0)) + ix + F32(1.0))
+
+    m0 = max(F32(0.5) - (x0 * x0 + y0 * y0), F32(0.0))
+    m1 = max(F32(0.5) - (x1 * x1 + y1 * y1), F32(0.0))
+    m2 = max(F32(0.5) - (x2 * x2 + y2 * y2), F32(0.0))
+
+    noise = F32(0.0)
+    noise += get_corner(p0, m0, x0, y0)
+    noise += get_corner(p1, m1, x1, y1)
+    noise += get_corner(p2, m2, x2, y2)
+
+    return F32(130.0) * noise
+
+
+@njit
+def get_height(wx, wz) -> int:
+    """
+    Gets the terrain height of the given world column.
+    :param wx: The world x position.
+    :param wz: The world z position.
+    :return: The terrain height.
+    """
+    noise = simplex(F32(wx) * NOISE_FREQUENCY, F32(wz) * NOISE_FREQUENCY)
+    return int(np.float64(noise) * NOISE_AMPLITUDE + NOISE_AMPLITUDE)
+
+
+@njit
+def build_chunk_blocks(chunk_blocks, chunk_position) -> bool:
+    """
+    Fills the given chunk blocks with the terrain of the chunk.
+    :param chunk_blocks: The chunk blocks, written in place.
+    :param chunk_position: The chunk position.
+    :return: True if the chunk has at least one solid block.
+    """
+    cx, cy, cz = chunk_position
+    cx, cy, cz = cx * CHUNK_SIZE, cy * CHUNK_SIZE, cz * CHUNK_SIZE
+
+    # Height map
+    heights = np.empty(CHUNK_AREA, dtype=np.int64)
+    max_height = 0
+
+    for z in range(CHUNK_SIZE):
+        for x in range(CHUNK_SIZE):
+            height = get_height(x + cx, z + cz) - cy
+            heights[x + CHUNK_SIZE * z] = height
+            max_height = max(max_height, height)
+
+    # Blocks, written in memory order
+    for y in range(CHUNK_SIZE):
+        block_id = y + cy + 2
+        layer = CHUNK_AREA * y
+
+        for column in range(CHUNK_AREA):
+            if y < heights[column]:
+                chunk_blocks[layer + column] = block_id
+
+            else:
+                chunk_blocks[layer + column] = 0
+
+    return max_height > 0
+
+
+@njit(parallel=True)
+def build_world_blocks(world_blocks, chunk_positions, is_empty) -> None:
+    """
+    Fills the blocks of a batch of chunks in a single call. Chunks are spread
+    over the numba worker threads.
+    :param world_blocks: The blocks of each chunk, one row per chunk.
+    :param chunk_positions: The chunk positions, one row per chunk.
+    :param is_empty: Output flags, True for the chunks without solid blocks.
+    """
+    for i in prange(chunk_positions.shape[0]):
+        position = (chunk_positions[i, 0], chunk_positions[i, 1], chunk_positions[i, 2])
+        is_empty[i] = not build_chunk_blocks(world_blocks[i], position)
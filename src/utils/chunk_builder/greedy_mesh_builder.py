@@ -0,0 +1,162 @@
+"""
+@file greedy_mesh_builder.py
+@brief Greedy mesher, merges coplanar faces of the same block and ambient
+       occlusion into larger quads.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-04
+"""
+
+# Project files
+from core.constants.settings import CHUNK_VOLUME, CHUNK_SIZE
+from utils.chunk_builder.chunk_mesh_builder import (
+    PADDED_AREA,
+    PADDED_SIZE,
+    add_quad,
+    get_ao,
+    get_face_position,
+)
+
+# Libraries
+import numpy as np
+from numba import njit
+
+
+@njit
+def is_row_filled(row, start, end, key) -> bool:
+    """
+    Checks if a row of face keys holds the given key from start to end.
+    :param row: The face keys.
+    :param start: The first position.
+    :param end: The position past the last one.
+    :param key: The key.
+    :return: True if every face in the range has the key.
+    """
+    for i in range(start, end):
+        if row[i] != key:
+            return False
+
+    return True
+
+
+@njit(nogil=True)
+def build_greedy_chunk_mesh(
+    padded_blocks,
+    format_size,
+    vertex_data=None,
+    per_face=False,
+) -> np.array:
+    """
+    Builds the mesh for the given chunk, merging the faces that share a plane,
+    a block id and the ambient occlusion of their corners into larger quads.
+    Faces are only merged along the axes their ambient occlusion does not change
+    on, so the quads shade the same as with build_chunk_mesh. Same arguments and
+    vertex format.
+    :param padded_blocks: The chunk blocks and the border around them, see
+                          get_padded_blocks.
+    :param format_size: The format size.
+    :param vertex_data: Scratch vertex data to build the mesh in, see get_mesh_buffer.
+                        A new one is allocated if None.
+    :param per_face: Whether to build a face record per quad, see add_quad, instead
+                     of six vertices.
+    :return: The mesh, a copy with exactly the vertices built.
+    """
+    if vertex_data is None:
+        vertex_data = np.empty(CHUNK_VOLUME * 18 * format_size, dtype="uint32")
+
+    index = 0
+
+    # Visible faces, indexed by face layer, as the block id and the ambient
+    # occlusion of the four corners packed in 16 bits. 0 is no face
+    face_keys = np.zeros((6, CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE), dtype=np.uint16)
+
+    # Number of faces left on each row of face keys, so the merge only scans the
+    # rows that have faces and stops once a row has no faces left
+    row_faces = np.zeros((6, CHUNK_SIZE, CHUNK_SIZE), dtype=np.int32)
+
+    for x in range(CHUNK_SIZE):
+        for y in range(CHUNK_SIZE):
+            for z in range(CHUNK_SIZE):
+                block_index = x + 1 + PADDED_SIZE * (z + 1) + PADDED_AREA * (y + 1)
+                block_id = padded_blocks[block_index]
+
+                if not block_id:
+                    continue
+
+                for face_id in range(6):
+                    if face_id < 2:
+                        neighbor = block_index + PADDED_AREA * (1 - 2 * face_id)
+                        layer, a, b = y, x, z
+                        step_a, step_b = 1, PADDED_SIZE
+
+                    elif face_id < 4:
+                        neighbor = block_index + 5 - 2 * face_id
+                        layer, a, b = x, y, z
+                        step_a, step_b = PADDED_AREA, PADDED_SIZE
+
+                    else:
+                        neighbor = block_index + PADDED_SIZE * (2 * face_id - 9)
+                        layer, a, b = z, y, x
+                        step_a, step_b = PADDED_AREA, 1
+
+                    if padded_blocks[neighbor]:
+                        continue
+
+                    ao = get_ao(padded_blocks, neighbor, step_a, step_b)
+
+                    face_keys[face_id, layer, a, b] = (
+                        block_id | ao[0] << 8 | ao[1] << 10 | ao[2] << 12 | ao[3] << 14
+                    )
+                    row_faces[face_id, layer, a] += 1
+
+    # Merge the faces of each layer into rectangles
+    for face_id in range(6):
+        for layer in range(CHUNK_SIZE):
+            keys = face_keys[face_id, layer]
+            faces = row_faces[face_id, layer]
+
+            for a in range(CHUNK_SIZE):
+                for b in range(CHUNK_SIZE):
+                    if not faces[a]:
+                        break
+
+                    key = keys[a, b]
+
+                    if not key:
+                        continue
+
+                    ao = (key >> 8 & 3, key >> 10 & 3, key >> 12 & 3, key >> 14 & 3)
+                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
+
+                    # Corners (0, 0), (a, 0), (a, b) and (0, b)
+                    end_b = b + 1
+
+                    if ao[0] == ao[3] and ao[1] == ao[2]:
+                        while end_b < CHUNK_SIZE and keys[a, end_b] == key:
+                            end_b += 1
+
+                    end_a = a + 1
+
+                    if ao[0] == ao[1] and ao[3] == ao[2]:
+                        while end_a < CHUNK_SIZE and is_row_filled(
+                            keys[end_a], b, end_b, key
+                        ):
+                            end_a += 1
+
+                    keys[a:end_a, b:end_b] = 0
+                    faces[a:end_a] -= end_b - b
+
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        get_face_position(face_id, layer, a, b),
+                        end_a - a,
+                        end_b - b,
+                        key & 0xFF,
+                        face_id,
+                        ao,
+                        flip_id,
+                        per_face,
+                    )
+
+    return vertex_data[:index].copy()
@@ -0,0 +1,224 @@
+"""
+@file lod_mesh_builder.py
+@brief Level of detail mesher, builds the mesh of a chunk downsampled into
+       cells of several blocks, for chunks far from the camera.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-14
+"""
+
+# Project files
+from core.constants.settings import CHUNK_AREA, CHUNK_SIZE, CHUNK_VOLUME
+from utils.chunk_builder.chunk_mesh_builder import (
+    PADDED_SIZE,
+    add_quad,
+    get_ao,
+    get_chunk_neighbors,
+)
+
+# Libraries
+import numpy as np
+from numba import njit
+
+# Rows of the chunk neighbors, see get_chunk_neighbors, of the chunk across each
+# face, in face id order: top, bottom, right, left, back and front
+FACE_NEIGHBORS = (22, 4, 14, 12, 10, 16)
+
+
+def clear_padded_faces(padded_blocks, face_ids, padded_size=PADDED_SIZE) -> None:
+    """
+    Makes the border of the padded blocks void on the given faces, so the mesher
+    builds the faces of the chunk against them.
+    :param padded_blocks: The padded blocks, see get_padded_blocks, or the padded
+                          cells, see get_lod_blocks.
+    :param face_ids: The face ids.
+    :param padded_size: The blocks or cells on each side of the padded blocks.
+    """
+    blocks = padded_blocks.reshape(padded_size, padded_size, padded_size)
+    border = padded_size - 1
+
+    # The padded blocks are indexed by y, z and x
+    layers = (
+        (border, slice(None), slice(None)),
+        (0, slice(None), slice(None)),
+        (slice(None), slice(None), border),
+        (slice(None), slice(None), 0),
+        (slice(None), 0, slice(None)),
+        (slice(None), border, slice(None)),
+    )
+
+    for face_id in face_ids:
+        blocks[layers[face_id]] = 0
+
+
+@njit(nogil=True, inline="always")
+def get_cell_block(chunk_blocks, first, scale) -> int:
+    """
+    Gets the block of a cell of scale blocks on each side. A cell is solid if
+    at least half of its blocks are, with the id of a block of its highest solid
+    layer, so the cells on the surface keep the block seen from above.
+    :param chunk_blocks: The chunk blocks.
+    :param first: The local position of the first block of the cell.
+    :param scale: The blocks on each side of the cell.
+    :return: The block id, 0 if the cell is void.
+    """
+    x0, y0, z0 = first
+    solid = 0
+    block_id = 0
+
+    for y in range(y0, y0 + scale):
+        for z in range(z0, z0 + scale):
+            row = CHUNK_SIZE * z + CHUNK_AREA * y
+
+            for x in range(x0, x0 + scale):
+                block = chunk_blocks[row + x]
+
+                if block:
+                    solid += 1
+                    block_id = block
+
+    if 2 * solid < scale * scale * scale:
+        return 0
+
+    return block_id
+
+
+@njit(nogil=True)
+def get_lod_blocks(
+    chunk_position, world_blocks, chunk_positions, scale, lod_blocks=None
+) -> np.array:
+    """
+    Gathers the chunk downsampled into cells of scale blocks on each side, see
+    get_cell_block, with a border of one cell from its neighbors, like
+    get_padded_blocks does with blocks. The border only tells void (0) from
+    solid (1), and the cells of missing neighbors are solid.
+    :param chunk_position: The chunk position.
+    :param world_blocks: The world blocks.
+    :param chunk_positions: The chunk position stored in each row of the world blocks.
+    :param scale: The blocks on each side of a cell.
+    :param lod_blocks: The padded cells to write, CHUNK_SIZE // scale + 2 on each
+                       side, indexed like the padded blocks. Allocated if None.
+    :return: The padded cells.
+    """
+    size = CHUNK_SIZE // scale
+    lod_size = size + 2
+    lod_area = lod_size * lod_size
+
+    if lod_blocks is None:
+        lod_blocks = np.empty(lod_size * lod_area, dtype=np.uint8)
+
+    chunk_neighbors = get_chunk_neighbors(chunk_position, chunk_positions)
+
+    for cell_y in range(lod_size):
+        dy = (cell_y > 0) + (cell_y > size)
+
+        for cell_z in range(lod_size):
+            dz = (cell_z > 0) + (cell_z > size)
+
+            for cell_x in range(lod_size):
+                dx = (cell_x > 0) + (cell_x > size)
+                cell_index = cell_x + lod_size * cell_z + lod_area * cell_y
+                chunk_index = chunk_neighbors[dx + 3 * dz + 9 * dy]
+
+                if chunk_index == -1:
+                    lod_blocks[cell_index] = 1
+                    continue
+
+                # Position of the first block of the cell in the chunk it lies in
+                first = (
+                    (cell_x - 1 - (dx - 1) * size) * scale,
+                    (cell_y - 1 - (dy - 1) * size) * scale,
+                    (cell_z - 1 - (dz - 1) * size) * scale,
+                )
+                block_id = get_cell_block(world_blocks[chunk_index], first, scale)
+
+                if block_id and (dx != 1 or dy != 1 or dz != 1):
+                    block_id = 1
+
+                lod_blocks[cell_index] = block_id
+
+    return lod_blocks
+
+
+@njit(nogil=True)
+def build_lod_chunk_mesh(
+    lod_blocks,
+    scale,
+    format_size,
+    vertex_data=None,
+    per_face=False,
+) -> np.array:
+    """
+    Builds the mesh for the given chunk at a lower level of detail, a quad of
+    scale by scale blocks per visible cell face. Same vertex format as
+    build_chunk_mesh.
+    :param lod_blocks: The chunk cells and the border around them, see
+                       get_lod_blocks.
+    :param scale: The blocks on each side of a cell.
+    :param format_size: The format size.
+    :param vertex_data: Scratch vertex data to build the mesh in, see get_mesh_buffer.
+                        A new one is allocated if None.
+    :param per_face: Whether to build a face record per quad, see add_quad, instead
+                     of six vertices.
+    :return: The mesh, a copy with exactly the vertices built.
+    """
+    if vertex_data is None:
+        vertex_data = np.empty(CHUNK_VOLUME * 18 * format_size, dtype="uint32")
+
+    index = 0
+
+    size = CHUNK_SIZE // scale
+    lod_size = size + 2
+    lod_area = lod_size * lod_size
+
+    for x in range(size):
+        for y in range(size):
+            for z in range(size):
+                cell_index = x + 1 + lod_size * (z + 1) + lod_area * (y + 1)
+                block_id = lod_blocks[cell_index]
+
+                if not block_id:
+                    continue
+
+                for face_id in range(6):
+                    # The quads of the top, right and front faces start on the last
+                    # block of the cell along the face normal
+                    position_x = x * scale
+                    position_y = y * scale
+                    position_z = z * scale
+
+                    if face_id < 2:
+                        neighbor = cell_index + lod_area * (1 - 2 * face_id)
+                        step_a, step_b = 1, lod_size
+                        position_y += (1 - face_id) * (scale - 1)
+
+                    elif face_id < 4:
+                        neighbor = cell_index + 5 - 2 * face_id
+                        step_a, step_b = lod_area, lod_size
+                        position_x += (3 - face_id) * (scale - 1)
+
+                    else:
+                        neighbor = cell_index + lod_size * (2 * face_id - 9)
+                        step_a, step_b = lod_area, 1
+                        position_z += (face_id - 4) * (scale - 1)
+
+                    if lod_blocks[neighbor]:
+                        continue
+
+                    ao = get_ao(lod_blocks, neighbor, step_a, step_b)
+                    flip_id = ao[1] + ao[3] > ao[0] + ao[2]
+
+                    index = add_quad(
+                        vertex_data,
+                        index,
+                        (position_x, position_y, position_z),
+                        scale,
+                        scale,
+                        block_id,
+                        face_id,
+                        ao,
+                        flip_id,
+                        per_face,
+                    )
+
+    return vertex_data[:index].copy()
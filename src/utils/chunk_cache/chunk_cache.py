@@ -0,0 +1,169 @@
+"""
+@file chunk_cache.py
+@brief Disk cache of the generated chunk blocks and of the built chunk meshes.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-12
+"""
+
+# Libraries
+import hashlib
+import os
+import shutil
+import threading
+
+import numpy as np
+
+# Project files
+from core.constants.settings import CHUNK_SIZE
+from utils.chunk_builder import (
+    binary_mesh_builder,
+    chunk_mesh_builder,
+    chunk_terrain_builder,
+    greedy_mesh_builder,
+    lod_mesh_builder,
+)
+
+
+def get_version(modules, *settings) -> str:
+    """
+    Gets the version of the output of the given modules, a hash of their source
+    code and of the settings the output depends on. Any change to the code gives
+    a new version.
+    :param modules: The modules.
+    :param settings: The settings.
+    :return: The version.
+    """
+    version = hashlib.blake2b(repr(settings).encode(), digest_size=8)
+
+    for module in modules:
+        with open(module.__file__, "rb") as file:
+            version.update(file.read())
+
+    return version.hexdigest()
+
+
+class ChunkCache:
+    def __init__(self, path, mesher, chunk_format) -> None:
+        """
+        Initializes the cache. Blocks are stored by chunk position and meshes by a
+        hash of everything the mesher sees, each under the version of the code
+        that built them. Entries of other versions are removed.
+        :param path: The folder of the cache, created if missing
+        :param mesher: The mesher the meshes are built with
+        :param chunk_format: The vertex format of the meshes
+        """
+        blocks_version = get_version([chunk_terrain_builder], CHUNK_SIZE)
+        meshes_version = get_version(
+            [
+                chunk_mesh_builder,
+                greedy_mesh_builder,
+                binary_mesh_builder,
+                lod_mesh_builder,
+            ],
+            CHUNK_SIZE,
+        )
+
+        for name, version in (("blocks", blocks_version), ("meshes", meshes_version)):
+            versions_path = os.path.join(path, name)
+            os.makedirs(os.path.join(versions_path, version), exist_ok=True)
+
+            for other_version in os.listdir(versions_path):
+                if other_version != version:
+                    shutil.rmtree(os.path.join(versions_path, other_version))
+
+        self.blocks_path = os.path.join(path, "blocks", blocks_version)
+        self.meshes_path = os.path.join(
+            path, "meshes", meshes_version, f"{mesher}-{chunk_format}"
+        )
+        os.makedirs(self.meshes_path, exist_ok=True)
+
+    def save(self, path, array) -> None:
+        """
+        Saves the raw data of an entry. The entry is written to a temporary file
+        first, so a partial write is never read and threads saving the same entry
+        do not clash
+        :param path: The path of the entry
+        :param array: The entry
+        """
+        temporary_path = f"{path}.{threading.get_ident()}.tmp"
+
+        with open(temporary_path, "wb") as file:
+            file.write(array)
+
+        os.replace(temporary_path, path)
+
+    def get_blocks_path(self, chunk_position) -> str:
+        """
+        Gets the path of the blocks of the given chunk
+        :param chunk_position: The chunk position
+        :return: The path
+        """
+        cx, cy, cz = (int(value) for value in chunk_position)
+
+        return os.path.join(self.blocks_path, f"{cx}.{cy}.{cz}")
+
+    def load_blocks(self, chunk_position, chunk_blocks) -> bool:
+        """
+        Loads the generated blocks of the given chunk
+        :param chunk_position: The chunk position
+        :param chunk_blocks: The chunk blocks, written in place
+        :return: True if the blocks were cached
+        """
+        path = self.get_blocks_path(chunk_position)
+
+        if not os.path.exists(path):
+            return False
+
+        with open(path, "rb", buffering=0) as file:
+            return file.readinto(chunk_blocks) == chunk_blocks.nbytes
+
+    def save_blocks(self, chunk_position, chunk_blocks) -> None:
+        """
+        Saves the generated blocks of the given chunk
+        :param chunk_position: The chunk position
+        :param chunk_blocks: The chunk blocks
+        """
+        self.save(self.get_blocks_path(chunk_position), chunk_blocks)
+
+    def get_mesh_key(self, padded_blocks, lod=0) -> str:
+        """
+        Gets the key of the mesh of a chunk, a hash of its padded blocks: the
+        chunk blocks and which blocks around it are void, all the mesher sees,
+        and of its level of detail. Meshes are in chunk space, so chunks with the
+        same blocks and surroundings share their mesh
+        :param padded_blocks: The padded blocks of the chunk, see get_padded_blocks,
+                              or its padded cells at a lower level of detail, see
+                              get_lod_blocks
+        :param lod: The level of detail of the chunk
+        :return: The key
+        """
+        key = hashlib.sha256(padded_blocks)
+        key.update(bytes([lod]))
+
+        return key.hexdigest()[:32]
+
+    def load_mesh(self, key) -> np.array:
+        """
+        Loads the vertex data of a mesh, memory mapped to be uploaded as is
+        :param key: The mesh key
+        :return: The vertex data, None if it is not cached
+        """
+        path = os.path.join(self.meshes_path, key)
+
+        if not os.path.exists(path):
+            return None
+
+        # Empty files can not be mapped, chunks with every face hidden have them
+        if not os.path.getsize(path):
+            return np.empty(0, dtype=np.uint32)
+
+        return np.memmap(path, dtype=np.uint32, mode="r")
+
+    def save_mesh(self, key, vertex_data) -> None:
+        """
+        Saves the vertex data of a mesh
+        :param key: The mesh key
+        :param vertex_data: The vertex data
+        """
+        self.save(os.path.join(self.meshes_path, key), vertex_data)
@@ -0,0 +1,111 @@
+"""
+@file chunk_occupancy.py
+@brief Counts of the solid blocks of each chunk and of each of its faces, kept
+       up to date by the block writes so no chunk has to be scanned to know if
+       it is empty, full or enclosed.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-13
+"""
+
+# Libraries
+import numpy as np
+from numba import njit
+
+# Project files
+from core.constants.settings import CHUNK_AREA, CHUNK_SIZE, CHUNK_VOLUME
+from utils.chunk_builder.chunk_mesh_builder import get_chunk_index
+
+# Faces of a chunk, the first and last layer of blocks along x, y and z, and
+# the axis of the chunk blocks, indexed by y, z and x, each face is across
+FACES = 6
+FACE_AXES = (2, 2, 0, 0, 1, 1)
+
+
+def get_face_layer(blocks, face) -> np.array:
+    """
+    Gets the layer of blocks of the given face.
+    :param blocks: The chunk blocks, indexed by y, z and x.
+    :param face: The face, 2 * axis for the first layer along x, y or z and
+                 2 * axis + 1 for the last one.
+    :return: The layer.
+    """
+    layer = [slice(None)] * 3
+    layer[FACE_AXES[face]] = -(face % 2)
+
+    return blocks[tuple(layer)]
+
+
+def get_occupancy(chunk_blocks) -> tuple:
+    """
+    Counts the solid blocks of the given chunk.
+    :param chunk_blocks: The chunk blocks.
+    :return: The solid blocks of the chunk, and of each of its faces.
+    """
+    blocks = chunk_blocks.reshape(CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+    face_counts = [
+        np.count_nonzero(get_face_layer(blocks, face)) for face in range(FACES)
+    ]
+
+    return np.count_nonzero(chunk_blocks), face_counts
+
+
+def update_face_counts(face_counts, chunk_blocks, first, last) -> None:
+    """
+    Counts again the solid blocks of the faces the given box of the chunk lies
+    on, after the box was written.
+    :param face_counts: The solid blocks of each face, updated in place.
+    :param chunk_blocks: The chunk blocks.
+    :param first: The local position of the first corner of the box.
+    :param last: The local position past the last corner of the box.
+    """
+    blocks = chunk_blocks.reshape(CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+
+    for axis in range(3):
+        if first[axis] == 0:
+            face_counts[2 * axis] = np.count_nonzero(get_face_layer(blocks, 2 * axis))
+
+        if last[axis] == CHUNK_SIZE:
+            face = 2 * axis + 1
+            face_counts[face] = np.count_nonzero(get_face_layer(blocks, face))
+
+
+@njit
+def get_hidden_chunks(chunk_positions, solid_counts, face_counts) -> np.array:
+    """
+    Finds the full chunks whose neighbors have full faces against them, which
+    have no visible face. Missing neighbors are solid to the meshers, so they
+    hide the faces of the chunk as well.
+    :param chunk_positions: The chunk position stored in each row of the world blocks.
+    :param solid_counts: The solid blocks of each chunk.
+    :param face_counts: The solid blocks of each face of each chunk.
+    :return: True for the hidden chunks.
+    """
+    is_hidden = np.zeros(len(chunk_positions), dtype=np.bool_)
+
+    for chunk_index in range(len(chunk_positions)):
+        if solid_counts[chunk_index] != CHUNK_VOLUME:
+            continue
+
+        is_hidden[chunk_index] = True
+
+        for face in range(FACES):
+            axis = face // 2
+            side = face % 2
+            neighbor_position = chunk_positions[chunk_index] * CHUNK_SIZE
+            neighbor_position[axis] += CHUNK_SIZE if side else -CHUNK_SIZE
+
+            neighbor_index = get_chunk_index(
+                (neighbor_position[0], neighbor_position[1], neighbor_position[2]),
+                chunk_positions,
+            )
+
+            # The neighbor face against this one is on the other side
+            if (
+                neighbor_index != -1
+                and face_counts[neighbor_index, face ^ 1] != CHUNK_AREA
+            ):
+                is_hidden[chunk_index] = False
+                break
+
+    return is_hidden
@@ -0,0 +1,188 @@
+"""
+@file chunk_storage.py
+@brief Palette compression of the chunk blocks, for chunks with few kinds of
+       blocks.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-12
+"""
+
+# Libraries
+import mmap
+import sys
+
+import numpy as np
+from numba import njit
+
+# Project files
+from core.constants.settings import MAX_PALETTE_SIZE
+
+# Private anonymous pages read as zeros again once given back with MADV_DONTNEED.
+# Only Linux guarantees it, elsewhere the released rows are cleared instead
+RELEASE_PAGES = sys.platform.startswith("linux") and hasattr(mmap, "MADV_DONTNEED")
+
+
+def get_block_memory(row_count, row_size) -> tuple:
+    """
+    Allocates zeroed blocks in anonymous memory, one row per chunk, so the rows
+    of compact chunks can be given back to the system, see release_row.
+    :param row_count: The number of rows.
+    :param row_size: The number of blocks of each row.
+    :return: The memory map and the blocks.
+    """
+    size = row_count * row_size
+
+    # A shared mapping keeps its pages, and what they hold, on MADV_DONTNEED
+    if RELEASE_PAGES:
+        memory = mmap.mmap(-1, size, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS)
+
+    else:
+        memory = mmap.mmap(-1, size)
+
+    blocks = np.frombuffer(memory, dtype=np.uint8).reshape(row_count, row_size)
+
+    return memory, blocks
+
+
+def release_row(memory, blocks, row) -> None:
+    """
+    Gives the memory of the given row of the blocks back to the system. The row
+    reads as air afterwards.
+    :param memory: The memory map of the blocks, see get_block_memory.
+    :param blocks: The blocks.
+    :param row: The row.
+    """
+    row_size = blocks.shape[1]
+
+    # Whole pages only, a partial page would clear the next row as well
+    if RELEASE_PAGES and row_size % mmap.PAGESIZE == 0:
+        memory.madvise(mmap.MADV_DONTNEED, row * row_size, row_size)
+
+    else:
+        blocks[row] = 0
+
+
+def get_palette(chunk_blocks) -> np.array:
+    """
+    Gets the palette of the given chunk blocks, the block ids in the chunk.
+    :param chunk_blocks: The chunk blocks.
+    :return: The block ids, sorted.
+    """
+    return np.flatnonzero(np.bincount(chunk_blocks, minlength=256)).astype(np.uint8)
+
+
+def get_index_bits(palette) -> int:
+    """
+    Gets the bits of the palette index of each block. Indices are packed into
+    bytes, so the size is rounded up to a divisor of 8.
+    :param palette: The palette.
+    :return: The bits, 0 for chunks of a single block id. None if the palette is
+             too large to compress the chunk.
+    """
+    if len(palette) > MAX_PALETTE_SIZE:
+        return None
+
+    for bits in (0, 1, 2, 4):
+        if len(palette) <= 1 << bits:
+            return bits
+
+    return 8
+
+
+def pack_blocks(chunk_blocks, palette) -> np.array:
+    """
+    Packs the palette index of each block, the lowest bits of each byte hold the
+    first block.
+    :param chunk_blocks: The chunk blocks.
+    :param palette: The palette of the chunk blocks.
+    :return: The packed indices, empty for chunks of a single block id.
+    """
+    bits = get_index_bits(palette)
+
+    if not bits:
+        return np.empty(0, dtype=np.uint8)
+
+    lookup = np.zeros(256, dtype=np.uint8)
+    lookup[palette] = np.arange(len(palette))
+    packed_blocks = np.empty(len(chunk_blocks) * bits // 8, dtype=np.uint8)
+    pack_indices(chunk_blocks, lookup, bits, packed_blocks)
+
+    return packed_blocks
+
+
+@njit(cache=True)
+def pack_indices(chunk_blocks, lookup, bits, packed_blocks) -> None:
+    """
+    Packs the palette index of each block.
+    :param chunk_blocks: The chunk blocks.
+    :param lookup: The palette index of each block id.
+    :param bits: The bits of each index.
+    :param packed_blocks: The packed indices, written in place.
+    """
+    blocks_per_byte = 8 // bits
+
+    for byte_index in range(len(packed_blocks)):
+        packed = 0
+        first = byte_index * blocks_per_byte
+
+        for offset in range(blocks_per_byte):
+            packed |= lookup[chunk_blocks[first + offset]] << (offset * bits)
+
+        packed_blocks[byte_index] = packed
+
+
+@njit(cache=True)
+def unpack_indices(packed_blocks, palette, bits, chunk_blocks) -> None:
+    """
+    Unpacks the palette index of each block into its block id.
+    :param packed_blocks: The packed indices.
+    :param palette: The palette.
+    :param bits: The bits of each index.
+    :param chunk_blocks: The chunk blocks, written in place.
+    """
+    blocks_per_byte = 8 // bits
+    mask = (1 << bits) - 1
+
+    for byte_index in range(len(packed_blocks)):
+        packed = packed_blocks[byte_index]
+        first = byte_index * blocks_per_byte
+
+        for offset in range(blocks_per_byte):
+            chunk_blocks[first + offset] = palette[(packed >> (offset * bits)) & mask]
+
+
+def unpack_blocks(packed_blocks, palette, chunk_blocks) -> None:
+    """
+    Unpacks the blocks packed with pack_blocks.
+    :param packed_blocks: The packed indices.
+    :param palette: The palette.
+    :param chunk_blocks: The chunk blocks, written in place.
+    """
+    bits = get_index_bits(palette)
+
+    if not bits:
+        chunk_blocks[:] = palette[0]
+
+        return
+
+    unpack_indices(packed_blocks, palette, bits, chunk_blocks)
+
+
+def get_packed_block(packed_blocks, palette, block_index) -> int:
+    """
+    Gets a single block of the blocks packed with pack_blocks.
+    :param packed_blocks: The packed indices.
+    :param palette: The palette.
+    :param block_index: The block index.
+    :return: The block id.
+    """
+    bits = get_index_bits(palette)
+
+    if not bits:
+        return palette[0]
+
+    blocks_per_byte = 8 // bits
+    packed = packed_blocks[block_index // blocks_per_byte]
+    shift = block_index % blocks_per_byte * bits
+
+    return palette[(packed >> shift) & ((1 << bits) - 1)]
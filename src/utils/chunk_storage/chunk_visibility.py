@@ -0,0 +1,211 @@
+"""
+@file chunk_visibility.py
+@brief Which faces of each chunk see each other through air, and the chunks
+       the camera can see through them, found by a search that only crosses
+       chunks from a face to a face connected through air.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-14
+"""
+
+# Libraries
+import numpy as np
+from numba import njit
+
+# Project files
+from core.constants.settings import CHUNK_AREA, CHUNK_SIZE, CHUNK_VOLUME
+from utils.chunk_builder.chunk_mesh_builder import (
+    PADDED_AREA,
+    PADDED_SIZE,
+    PADDED_VOLUME,
+    get_chunk_index,
+)
+from utils.chunk_storage.chunk_occupancy import FACES
+
+# Connections of a chunk, bit FACES * a + b is set when faces a and b are joined
+# through air. Faces follow the occupancy order, 2 * axis for the first layer
+# along x, y or z and 2 * axis + 1 for the last one
+ALL_CONNECTIONS = (1 << FACES * FACES) - 1
+
+
+@njit(nogil=True)
+def get_face_connections(chunk_blocks) -> int:
+    """
+    Finds the pairs of faces of the given chunk joined through air, with a flood
+    fill of each region of connected void blocks. Releases the GIL, so chunks
+    meshed on worker threads flood fill in parallel.
+    :param chunk_blocks: The chunk blocks.
+    :return: The connections, see ALL_CONNECTIONS.
+    """
+    # The blocks with a border of one cell, laid out like the padded blocks. Void
+    # blocks are 0, solid or filled blocks 1, and the border cells of each face
+    # hold 2 plus the face, so the fill finds the faces it reaches without
+    # computing the position of each block
+    cells = np.empty(PADDED_VOLUME, dtype=np.uint8)
+
+    for y in range(PADDED_SIZE):
+        for z in range(PADDED_SIZE):
+            for x in range(PADDED_SIZE):
+                position = (x, y, z)
+                cell = 1
+
+                for axis in range(3):
+                    if position[axis] == 0:
+                        cell = 2 + 2 * axis
+                        break
+
+                    if position[axis] == PADDED_SIZE - 1:
+                        cell = 3 + 2 * axis
+                        break
+
+                else:
+                    block_index = x - 1 + CHUNK_SIZE * (z - 1) + CHUNK_AREA * (y - 1)
+                    cell = chunk_blocks[block_index] != 0
+
+                cells[x + PADDED_SIZE * z + PADDED_AREA * y] = cell
+
+    steps = (-1, 1, -PADDED_AREA, PADDED_AREA, -PADDED_SIZE, PADDED_SIZE)
+    stack = np.empty(CHUNK_VOLUME, dtype=np.int64)
+    connections = 0
+
+    for start in range(PADDED_VOLUME):
+        if cells[start]:
+            continue
+
+        # The faces the region touches
+        faces = 0
+        cells[start] = 1
+        stack[0] = start
+        top = 1
+
+        while top:
+            top -= 1
+            cell_index = stack[top]
+
+            for step in steps:
+                neighbor = cell_index + step
+                cell = cells[neighbor]
+
+                if not cell:
+                    cells[neighbor] = 1
+                    stack[top] = neighbor
+                    top += 1
+
+                elif cell > 1:
+                    faces |= 1 << (cell - 2)
+
+        for face in range(FACES):
+            if faces >> face & 1:
+                connections |= faces << FACES * face
+
+    return connections
+
+
+@njit
+def get_visible_chunks(
+    chunk_positions, connections, on_frustum, camera_position
+) -> np.array:
+    """
+    Finds the chunks the camera can see through air. A breadth first search
+    from the chunk of the camera goes from a chunk to its neighbor on the
+    frustum across each face joined through air to the face it entered by, and
+    never back towards the camera. A camera outside the loaded chunks starts
+    from the faces of the border chunks that look at it.
+    :param chunk_positions: The chunk position stored in each row of the world blocks.
+    :param connections: The connections of each chunk, see get_face_connections.
+    :param on_frustum: True for the chunks on the frustum.
+    :param camera_position: The world position of the camera, in blocks.
+    :return: True for the visible chunks.
+    """
+    is_visible = np.zeros(len(chunk_positions), dtype=np.bool_)
+
+    # Queued chunks, the face each one was entered by, -1 for the chunk of the
+    # camera, and the directions travelled to reach it
+    queue = np.empty(len(chunk_positions), dtype=np.int64)
+    entry_faces = np.empty(len(chunk_positions), dtype=np.int64)
+    directions = np.empty(len(chunk_positions), dtype=np.int64)
+    head = 0
+    tail = 0
+
+    camera = np.floor(camera_position).astype(np.int64)
+    start = get_chunk_index((camera[0], camera[1], camera[2]), chunk_positions)
+
+    if start != -1:
+        is_visible[start] = True
+        queue[0] = start
+        entry_faces[0] = -1
+        directions[0] = 0
+        tail = 1
+
+    else:
+        for chunk_index in range(len(chunk_positions)):
+            if not on_frustum[chunk_index]:
+                continue
+
+            for face in range(FACES):
+                axis = face // 2
+                side = face % 2
+                neighbor_position = chunk_positions[chunk_index] * CHUNK_SIZE
+
+                # The camera is past the face, and nothing is loaded between them
+                if side and camera[axis] < neighbor_position[axis] + CHUNK_SIZE:
+                    continue
+
+                if not side and camera[axis] >= neighbor_position[axis]:
+                    continue
+
+                neighbor_position[axis] += CHUNK_SIZE if side else -CHUNK_SIZE
+                neighbor_index = get_chunk_index(
+                    (neighbor_position[0], neighbor_position[1], neighbor_position[2]),
+                    chunk_positions,
+                )
+
+                if neighbor_index != -1:
+                    continue
+
+                is_visible[chunk_index] = True
+                queue[tail] = chunk_index
+                entry_faces[tail] = face
+                directions[tail] = 1 << (face ^ 1)
+                tail += 1
+                break
+
+    while head < tail:
+        chunk_index = queue[head]
+        entry_face = entry_faces[head]
+        direction = directions[head]
+        head += 1
+
+        for face in range(FACES):
+            if direction >> (face ^ 1) & 1:
+                continue
+
+            if entry_face != -1 and not (
+                connections[chunk_index] >> (FACES * entry_face + face) & 1
+            ):
+                continue
+
+            axis = face // 2
+            neighbor_position = chunk_positions[chunk_index] * CHUNK_SIZE
+            neighbor_position[axis] += CHUNK_SIZE if face % 2 else -CHUNK_SIZE
+
+            neighbor_index = get_chunk_index(
+                (neighbor_position[0], neighbor_position[1], neighbor_position[2]),
+                chunk_positions,
+            )
+
+            if (
+                neighbor_index == -1
+                or is_visible[neighbor_index]
+                or not on_frustum[neighbor_index]
+            ):
+                continue
+
+            # The neighbor is entered by the face against this one
+            is_visible[neighbor_index] = True
+            queue[tail] = neighbor_index
+            entry_faces[tail] = face ^ 1
+            directions[tail] = direction | 1 << face
+            tail += 1
+
+    return is_visible
@@ -0,0 +1,184 @@
+"""
+@file frame_profiler.py
+@brief Frame profiler, times named phases of each frame into a ring buffer of
+       the last frames and reports their percentiles.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-14
+"""
+
+# Libraries
+import csv
+import json
+import time
+
+import numpy as np
+
+# Percentiles reported for the frame and each phase
+PERCENTILES = (50, 95, 99)
+
+
+class ProfilerScope:
+    def __init__(self, profiler, column) -> None:
+        """
+        Initializes a timing scope of the profiler, used as a context manager
+        around the code of a phase
+        :param profiler: The frame profiler
+        :param column: The column of the phase in the ring buffer
+        """
+        self.profiler = profiler
+        self.column = column
+        self.start = 0.0
+
+    def __enter__(self) -> "ProfilerScope":
+        """
+        Starts timing the phase, pausing the enclosing scope
+        :return: The scope
+        """
+        now = time.perf_counter()
+        stack = self.profiler.stack
+
+        if stack:
+            stack[-1].stop(now)
+
+        stack.append(self)
+        self.start = now
+
+        return self
+
+    def __exit__(self, *args) -> None:
+        """
+        Stops timing the phase, resuming the enclosing scope
+        """
+        now = time.perf_counter()
+        stack = self.profiler.stack
+        self.stop(now)
+        stack.pop()
+
+        if stack:
+            stack[-1].start = now
+
+    def stop(self, now) -> None:
+        """
+        Adds the time since the scope started or resumed to its phase
+        :param now: The current time
+        """
+        self.profiler.current[self.column] += now - self.start
+
+
+class FrameProfiler:
+    def __init__(self, phases, size) -> None:
+        """
+        Initializes the frame profiler. The time of each phase only counts the
+        time spent outside the scopes nested in it
+        :param phases: The names of the phases
+        :param size: The number of frames kept
+        """
+        self.phases = tuple(phases)
+        self.columns = {phase: column for column, phase in enumerate(self.phases)}
+        self.scopes = {
+            phase: ProfilerScope(self, column) for phase, column in self.columns.items()
+        }
+        self.stack = []
+
+        # Milliseconds of each phase, and of the whole frame in the last column,
+        # for the last frames
+        self.frames = np.zeros([size, len(self.phases) + 1], dtype=np.float64)
+        self.frame_count = 0
+        self.current = np.zeros(len(self.phases) + 1, dtype=np.float64)
+        self.frame_start = time.perf_counter()
+
+    def scope(self, phase) -> ProfilerScope:
+        """
+        Gets the timing scope of the given phase
+        :param phase: The phase
+        :return: The scope
+        """
+        return self.scopes[phase]
+
+    def start(self) -> None:
+        """
+        Starts timing the first frame, leaving out the loading before it
+        """
+        self.current[:] = 0.0
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self) -> None:
+        """
+        Stores the times of the frame that ends and starts the next one
+        """
+        now = time.perf_counter()
+        self.current[-1] = now - self.frame_start
+        self.frame_start = now
+
+        self.frames[self.frame_count % len(self.frames)] = self.current * 1000
+        self.frame_count += 1
+        self.current[:] = 0.0
+
+    def get_frames(self) -> np.array:
+        """
+        Gets the times of the frames kept, oldest first
+        :return: The milliseconds of each phase and of the frame, one row per frame
+        """
+        size = len(self.frames)
+
+        if self.frame_count <= size:
+            return self.frames[: self.frame_count]
+
+        return np.roll(self.frames, -(self.frame_count % size), axis=0)
+
+    def get_percentiles(self) -> dict:
+        """
+        Gets the percentiles of the frame and phase times of the frames kept
+        :return: The percentiles of each phase and of the frame, in milliseconds
+        """
+        frames = self.get_frames()
+
+        if not len(frames):
+            return {}
+
+        percentiles = np.percentile(frames, PERCENTILES, axis=0)
+
+        return {
+            name: {f"p{p}": float(value) for p, value in zip(PERCENTILES, column)}
+            for name, column in zip(self.phases + ("frame",), percentiles.T)
+        }
+
+    def get_summary(self) -> list:
+        """
+        Gets a line of text per phase and for the frame with its percentiles
+        :return: The lines
+        """
+        return [
+            f"{name:8s} "
+            + " ".join(f"{key} {value:6.2f}" for key, value in percentiles.items())
+            for name, percentiles in self.get_percentiles().items()
+        ]
+
+    def export(self, path) -> None:
+        """
+        Writes the times of the frames kept to a CSV file, or to a JSON file with
+        their percentiles if the path ends in .json
+        :param path: The path of the file
+        """
+        frames = self.get_frames()
+        names = self.phases + ("frame",)
+
+        if path.endswith(".json"):
+            with open(path, "w") as file:
+                json.dump(
+                    {
+                        "phases": names,
+                        "percentiles": self.get_percentiles(),
+                        "frames": frames.tolist(),
+                    },
+                    file,
+                    indent=2,
+                )
+
+            return
+
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(names)
+            writer.writerows(frames.round(4).tolist())
@@ -0,0 +1,80 @@
+"""
+@file profiler_overlay.py
+@brief On screen overlay with the percentiles of the frame profiler, redrawn
+       into a texture a few times per second.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-14
+"""
+
+# Libraries
+import moderngl as mg
+import pygame as pg
+
+# Project files
+from core.constants.settings import PROFILER_OVERLAY_SIZE, PROFILER_REPORT_INTERVAL
+from graphics.meshes.overlay_mesh import OverlayMesh
+
+
+class ProfilerOverlay:
+    def __init__(self, app, profiler, is_visible=False) -> None:
+        """
+        Initializes the profiler overlay
+        :param app: The main application
+        :param profiler: The frame profiler
+        :param is_visible: Whether the overlay starts visible
+        """
+        self.app = app
+        self.ctx = app.ctx
+        self.profiler = profiler
+        self.is_visible = is_visible
+
+        self.font = pg.font.Font(None, 20)
+        self.surface = pg.Surface(PROFILER_OVERLAY_SIZE, flags=pg.SRCALPHA)
+        self.texture = self.ctx.texture(PROFILER_OVERLAY_SIZE, components=4)
+        self.texture.filter = (mg.NEAREST, mg.NEAREST)
+        self.mesh = OverlayMesh(app, (8, 8), PROFILER_OVERLAY_SIZE)
+        self.update_time = 0.0
+
+    def toggle(self) -> None:
+        """
+        Shows or hides the overlay
+        """
+        self.is_visible = not self.is_visible
+
+    def update_texture(self) -> None:
+        """
+        Draws the percentiles of the profiler into the texture
+        """
+        self.surface.fill((0, 0, 0, 160))
+        lines = ["Frame times (ms)"] + self.profiler.get_summary()
+
+        for line_index, line in enumerate(lines):
+            text = self.font.render(line, True, (255, 255, 255))
+            self.surface.blit(text, (6, 4 + 16 * line_index))
+
+        self.texture.write(pg.image.tostring(self.surface, "RGBA", True))
+
+    def render(self) -> None:
+        """
+        Renders the overlay over the frame, refreshing its text every
+        PROFILER_REPORT_INTERVAL seconds
+        """
+        if not self.is_visible:
+            return
+
+        if self.app.time - self.update_time > PROFILER_REPORT_INTERVAL:
+            self.update_time = self.app.time
+            self.update_texture()
+
+        self.ctx.disable(mg.DEPTH_TEST)
+        self.texture.use(location=2)
+        self.mesh.vao.render()
+        self.ctx.enable(mg.DEPTH_TEST)
+
+    def release(self) -> None:
+        """
+        Releases the texture and the mesh of the overlay
+        """
+        self.texture.release()
+        self.mesh.release()
@@ -0,0 +1,171 @@
+"""
+@file input_recorder.py
+@brief Player input of each simulation tick, the movement keys held, the mouse
+       motion and the mouse buttons pressed. Read live from pygame and
+       optionally recorded to a compressed file, or replayed from one.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-14
+"""
+
+# Libraries
+import glm
+import numpy as np
+import pygame as pg
+
+# Bits of the movement keys held on a tick
+KEY_FORWARD = 1
+KEY_BACKWARD = 2
+KEY_LEFT = 4
+KEY_RIGHT = 8
+
+# Keys held and mouse motion of each tick
+TICK_DTYPE = np.dtype([("keys", np.uint8), ("mouse", np.int16, 2)])
+
+# Mouse buttons pressed, and the tick they were handled on
+EVENT_DTYPE = np.dtype([("tick", np.uint32), ("button", np.uint8)])
+
+
+class InputRecorder:
+    def __init__(self, path=None) -> None:
+        """
+        Initializes the live input, read from pygame
+        :param path: File the input is recorded to on save, None to not record it
+        """
+        self.path = path
+        self.tick = 0
+        self.buttons = []
+
+        # Recorded input, the start pose of the player, x, y, z, yaw and pitch,
+        # and the input of each tick
+        self.start_pose = np.zeros(5, dtype=np.float64)
+        self.ticks = []
+        self.events = []
+
+    def start(self, player) -> None:
+        """
+        Keeps the pose the player starts from
+        :param player: The player
+        """
+        self.start_pose[:] = (*player.position, player.yaw, player.pitch)
+
+    def handle_event(self, event) -> None:
+        """
+        Keeps the mouse buttons pressed until the next tick handles them
+        :param event: The pygame event
+        """
+        if event.type == pg.MOUSEBUTTONDOWN:
+            self.buttons.append(event.button)
+
+    def get_buttons(self) -> list:
+        """
+        Gets the mouse buttons pressed since the last tick, in order
+        :return: The buttons
+        """
+        if self.path is not None:
+            self.events += [(self.tick, button) for button in self.buttons]
+
+        return self.buttons
+
+    def get_state(self) -> tuple:
+        """
+        Gets the movement keys held, and the mouse motion since the last tick
+        :return: The key bits, see KEY_FORWARD, and the mouse motion in pixels
+        """
+        key_state = pg.key.get_pressed()
+        keys = (
+            KEY_FORWARD * key_state[pg.K_w]
+            | KEY_BACKWARD * key_state[pg.K_s]
+            | KEY_LEFT * key_state[pg.K_a]
+            | KEY_RIGHT * key_state[pg.K_d]
+        )
+        mouse_delta = pg.mouse.get_rel()
+
+        if self.path is not None:
+            self.ticks.append((keys, mouse_delta))
+
+        return keys, mouse_delta
+
+    def end_tick(self) -> None:
+        """
+        Moves on to the next tick
+        """
+        self.tick += 1
+        self.buttons = []
+
+    def save(self) -> None:
+        """
+        Writes the recorded input to a compressed numpy file
+        """
+        if self.path is None:
+            return
+
+        np.savez_compressed(
+            self.path,
+            start_pose=self.start_pose,
+            ticks=np.array(self.ticks, dtype=TICK_DTYPE),
+            events=np.array(self.events, dtype=EVENT_DTYPE),
+        )
+
+
+class InputReplay:
+    def __init__(self, path) -> None:
+        """
+        Initializes the replay of the input recorded to the given file
+        :param path: The file written by InputRecorder.save
+        """
+        with np.load(path) as recording:
+            self.start_pose = recording["start_pose"]
+            self.ticks = recording["ticks"]
+            events = recording["events"]
+
+        # Buttons handled on each tick, in order
+        self.buttons = [[] for _ in range(len(self.ticks))]
+
+        for tick, button in events.tolist():
+            self.buttons[tick].append(button)
+
+        self.tick = 0
+
+    def start(self, player) -> None:
+        """
+        Moves the player to the pose the recording started from
+        :param player: The player
+        """
+        x, y, z, yaw, pitch = self.start_pose.tolist()
+        player.position = glm.vec3(x, y, z)
+        player.yaw = yaw
+        player.pitch = pitch
+
+    def handle_event(self, event) -> None:
+        """
+        Ignores the live input
+        :param event: The pygame event
+        """
+
+    def get_buttons(self) -> list:
+        """
+        Gets the mouse buttons recorded on this tick, in order
+        :return: The buttons
+        """
+        return self.buttons[self.tick]
+
+    def get_state(self) -> tuple:
+        """
+        Gets the movement keys held and the mouse motion recorded on this tick
+        :return: The key bits, see KEY_FORWARD, and the mouse motion in pixels
+        """
+        keys, mouse_delta = self.ticks[self.tick].tolist()
+
+        return keys, mouse_delta
+
+    def end_tick(self) -> None:
+        """
+        Moves on to the next recorded tick
+        """
+        self.tick += 1
+
+    def save(self) -> None:
+        """
+        Nothing to write, the replay is not recorded again
+        """
@@ -0,0 +1,303 @@
+"""
+@file region_storage.py
+@brief Saves and loads the chunk blocks in compressed region files.
+@author Carlos Salguero
+@version 1.0
+@date 2023-07-11
+"""
+
+# Libraries
+import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from numba import njit
+
+# Project files
+from core.constants.settings import REGION_SIZE, SAVE_COMPRESSION, WORLD_HEIGHT
+
+# Region files start with a tag, the region size and world height the file was
+# written with, which set the slot of each chunk, and the index of the chunks of
+# the region, the offset, size and capacity of the compressed blocks of each
+# chunk. An offset of 0 marks a chunk that was never saved
+REGION_TAG = b"VXR2"
+REGION_LAYOUT = np.array([REGION_SIZE, WORLD_HEIGHT], dtype="<u4").tobytes()
+REGION_CHUNKS = REGION_SIZE * REGION_SIZE * WORLD_HEIGHT
+
+
+def get_region(chunk_position) -> tuple:
+    """
+    Gets the region of the given chunk and the slot of the chunk in its index.
+    :param chunk_position: The chunk position.
+    :return: The x and z positions of the region and the slot.
+    """
+    cx, cy, cz = (int(value) for value in chunk_position)
+    slot = cx % REGION_SIZE + REGION_SIZE * (cz % REGION_SIZE)
+
+    return (cx // REGION_SIZE, cz // REGION_SIZE), slot + REGION_SIZE**2 * cy
+
+
+def encode_blocks(chunk_blocks) -> bytes:
+    """
+    Compresses the given chunk blocks. The blocks are split in runs of the same
+    block, which the terrain layers keep long, and the runs are compressed with
+    zlib.
+    :param chunk_blocks: The chunk blocks.
+    :return: The length of each run, the block of each run, compressed.
+    """
+    starts = np.flatnonzero(chunk_blocks[1:] != chunk_blocks[:-1]) + 1
+    starts = np.concatenate(([0], starts))
+    lengths = np.diff(starts, append=len(chunk_blocks)).astype("<u4")
+
+    return zlib.compress(
+        lengths.tobytes() + chunk_blocks[starts].tobytes(), SAVE_COMPRESSION
+    )
+
+
+@njit(cache=True)
+def decode_runs(lengths, values, chunk_blocks) -> None:
+    """
+    Writes the given runs of blocks to the chunk blocks.
+    :param lengths: The length of each run.
+    :param values: The block of each run.
+    :param chunk_blocks: The chunk blocks, written in place.
+    """
+    index = 0
+
+    for run in range(len(values)):
+        chunk_blocks[index : index + lengths[run]] = values[run]
+        index += lengths[run]
+
+
+def decode_blocks(data, chunk_blocks) -> None:
+    """
+    Decompresses blocks compressed with encode_blocks.
+    :param data: The compressed blocks.
+    :param chunk_blocks: The chunk blocks, written in place.
+    """
+    runs = zlib.decompress(data)
+    run_count = len(runs) // 5
+    lengths = np.frombuffer(runs, dtype="<u4", count=run_count)
+    values = np.frombuffer(runs, dtype=np.uint8, offset=4 * run_count)
+
+    if lengths.sum() != len(chunk_blocks):
+        raise ValueError("Saved blocks do not match the chunk size")
+
+    decode_runs(lengths, values, chunk_blocks)
+
+
+class RegionStorage:
+    def __init__(self, path) -> None:
+        """
+        Initializes the storage. Saves run on a background thread, one batch
+        after another, so they never block the render loop.
+        :param path: The folder of the region files, created if missing
+        """
+        self.path = path
+        os.makedirs(self.path, exist_ok=True)
+
+        # Index of each region, read once and kept in sync with the files
+        self.headers = {}
+
+        # Blocks queued to be saved by chunk position, loads read them first
+        self.pending = {}
+
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.futures = []
+
+    def get_region_path(self, region) -> str:
+        """
+        Gets the path of the file of the given region
+        :param region: The x and z positions of the region
+        :return: The path
+        """
+        return os.path.join(self.path, f"r.{region[0]}.{region[1]}.region")
+
+    def get_header(self, region) -> np.array:
+        """
+        Gets the index of the given region, empty if the region has no file.
+        Files written with another region size or world height are rejected,
+        their chunks would load in the wrong slots.
+        :param region: The x and z positions of the region
+        :return: The offset, size and capacity of each chunk
+        """
+        if region not in self.headers:
+            header = np.zeros([REGION_CHUNKS, 3], dtype="<u4")
+            path = self.get_region_path(region)
+
+            if os.path.exists(path):
+                with open(path, "rb") as file:
+                    if file.read(len(REGION_TAG)) != REGION_TAG:
+                        raise ValueError(f"{path} is not a region file of this version")
+
+                    layout = file.read(len(REGION_LAYOUT))
+
+                    if layout != REGION_LAYOUT:
+                        region_size, world_height = np.frombuffer(layout, dtype="<u4")
+                        raise ValueError(
+                            f"{path} was saved with REGION_SIZE {region_size} and "
+                            f"WORLD_HEIGHT {world_height}, the settings have "
+                            f"{REGION_SIZE} and {WORLD_HEIGHT}"
+                        )
+
+                    header[:] = np.frombuffer(
+                        file.read(header.nbytes), dtype="<u4"
+                    ).reshape(header.shape)
+
+            self.headers[region] = header
+
+        return self.headers[region]
+
+    def load_chunk(self, chunk_position, chunk_blocks) -> bool:
+        """
+        Loads the saved blocks of the given chunk
+        :param chunk_position: The chunk position
+        :param chunk_blocks: The chunk blocks, written in place
+        :return: True if the chunk was saved, False if it was left untouched
+        """
+        key = tuple(int(value) for value in chunk_position)
+        region, slot = get_region(key)
+
+        with self.lock:
+            if key in self.pending:
+                chunk_blocks[:] = self.pending[key]
+
+                return True
+
+            offset, size, _ = self.get_header(region)[slot]
+
+            if not offset:
+                return False
+
+            with open(self.get_region_path(region), "rb") as file:
+                file.seek(offset)
+                data = file.read(size)
+
+        decode_blocks(data, chunk_blocks)
+
+        return True
+
+    def load_chunks(self, world_blocks, chunk_positions) -> np.array:
+        """
+        Loads the saved blocks of a batch of chunks, reading each region file
+        once
+        :param world_blocks: The blocks of each chunk, one row per chunk
+        :param chunk_positions: The chunk positions, one row per chunk
+        :return: True for the chunks that were loaded
+        """
+        is_loaded = np.zeros(len(chunk_positions), dtype=np.bool_)
+        regions = {}
+
+        for chunk_index, position in enumerate(chunk_positions):
+            region, slot = get_region(position)
+            regions.setdefault(region, []).append((chunk_index, slot))
+
+        for region, chunks in regions.items():
+            path = self.get_region_path(region)
+
+            if not os.path.exists(path):
+                continue
+
+            with self.lock, open(path, "rb") as file:
+                header = self.get_header(region)
+                data = []
+
+                for chunk_index, slot in chunks:
+                    offset, size, _ = header[slot]
+
+                    if offset:
+                        file.seek(offset)
+                        data.append((chunk_index, file.read(size)))
+
+            for chunk_index, chunk_data in data:
+                decode_blocks(chunk_data, world_blocks[chunk_index])
+                is_loaded[chunk_index] = True
+
+        # Blocks still waiting to be written are newer than the files
+        with self.lock:
+            for chunk_index, position in enumerate(chunk_positions):
+                key = tuple(int(value) for value in position)
+
+                if key in self.pending:
+                    world_blocks[chunk_index] = self.pending[key]
+                    is_loaded[chunk_index] = True
+
+        return is_loaded
+
+    def save_chunks(self, chunks) -> None:
+        """
+        Queues the blocks of the given chunks to be saved in the background
+        :param chunks: The chunk position and a copy of the blocks of each chunk,
+                       the copy must not change after the call
+        """
+        if not chunks:
+            return
+
+        with self.lock:
+            for position, chunk_blocks in chunks:
+                self.pending[tuple(int(value) for value in position)] = chunk_blocks
+
+        self.futures = [future for future in self.futures if not future.done()]
+        self.futures.append(self.executor.submit(self.write_chunks, chunks))
+
+    def write_chunks(self, chunks) -> None:
+        """
+        Compresses and writes the blocks of the given chunks to their region
+        files. Blocks that fit in the space of their last save are written in
+        place, the rest at the end of the file
+        :param chunks: The chunk position and the blocks of each chunk
+        """
+        for position, chunk_blocks in chunks:
+            key = tuple(int(value) for value in position)
+            region, slot = get_region(key)
+            data = encode_blocks(chunk_blocks)
+
+            with self.lock:
+                header = self.get_header(region)
+                path = self.get_region_path(region)
+
+                if not os.path.exists(path):
+                    with open(path, "wb") as file:
+                        file.write(REGION_TAG)
+                        file.write(REGION_LAYOUT)
+                        file.write(header.tobytes())
+
+                with open(path, "r+b") as file:
+                    offset, _, capacity = header[slot]
+
+                    if not offset or len(data) > capacity:
+                        offset = file.seek(0, os.SEEK_END)
+                        capacity = len(data)
+
+                    file.seek(offset)
+                    file.write(data)
+
+                    header[slot] = offset, len(data), capacity
+                    file.seek(
+                        len(REGION_TAG)
+                        + len(REGION_LAYOUT)
+                        + slot * header.itemsize * 3
+                    )
+                    file.write(header[slot].tobytes())
+
+                if self.pending.get(key) is chunk_blocks:
+                    del self.pending[key]
+
+    def wait(self) -> None:
+        """
+        Waits for the queued saves to be written
+        """
+        for future in self.futures:
+            future.result()
+
+        self.futures.clear()
+
+    def close(self) -> None:
+        """
+        Writes the queued saves and stops the background thread
+        """
+        self.wait()
+        self.executor.shutdown()
@@ -5,8 +5,9 @@
 @version 1.0
 @date 2023-07-04
 """
+
 # Project files
-from core.constants.settings import SHADERS_PATH
+from core.constants.settings import SHADERS_PATH, WIN_RES
 
 # Libraries
 import moderngl as mg
@@ -23,23 +24,35 @@ class ShaderProgram:
         self.ctx = app.ctx
         self.player = app.player
 
-        # Shaders
-        self.chunk = self.get_program(shader_name="chunk")
+        # Shaders, the face format expands face records in its own vertex shader
+        if app.chunk_format == "face":
+            self.chunk = self.get_program(
+                shader_name="chunk_face", fragment_shader_name="chunk"
+            )
+
+        else:
+            self.chunk = self.get_program(shader_name="chunk")
+
         self.block_marker = self.get_program(shader_name="block_marker")
+        self.overlay = self.get_program(shader_name="overlay")
 
         # Uniforms
         self.set_uniforms_on_init()
 
-    def get_program(self, shader_name) -> mg.Program:
+    def get_program(self, shader_name, fragment_shader_name=None) -> mg.Program:
         """
         Gets the shader program
         :param shader_name: The name of the shader program
+        :param fragment_shader_name: The name of the fragment shader, if it is not
+                                     the one of the shader program
         :return: The shader program
         """
         with open(f"{SHADERS_PATH}/{shader_name}.vert", "r") as file:
             vertex_shader = file.read()
 
-        with open(f"{SHADERS_PATH}/{shader_name}.frag", "r") as file:
+        fragment_shader_name = fragment_shader_name or shader_name
+
+        with open(f"{SHADERS_PATH}/{fragment_shader_name}.frag", "r") as file:
             fragment_shader = file.read()
 
         return self.ctx.program(
@@ -61,9 +74,14 @@ class ShaderProgram:
         self.block_marker["m_model"].write(glm.mat4(1.0))
         self.block_marker["u_texture_0"].value = 0
 
+        # Overlay
+        self.overlay["u_resolution"].value = tuple(WIN_RES)
+        self.overlay["u_texture_0"].value = 2
+
     def update(self) -> None:
         """
         Updates the shader program
         """
-        self.chunk["m_view"].write(self.player.m_view)
-        self.block_marker["m_view"].write(self.player.m_view)
+        m_view = self.player.render_camera.m_view
+        self.chunk["m_view"].write(m_view)
+        self.block_marker["m_view"].write(m_view)